@@ -1,11 +1,26 @@
-from . import user_routes, balance_routes, categories_routes, goals_routes, auth_routes, transactions_routes
+"""Routers da API, carregados sob demanda."""
+import importlib
 
 
-__all__ = [""
-    "user_routes,"
-    "balance_routes,"
-    "categories_routes,"
+__all__ = [
+    "user_routes",
+    "balance_routes",
+    "categories_routes",
     "goals_routes",
     "auth_routes",
-    "transactions_routes"
-]
\ No newline at end of file
+    "transactions_routes",
+    "admin_routes",
+    "batch_routes",
+    "dashboard_routes",
+    "funding_rules_routes",
+]
+
+
+def __getattr__(name: str):
+    # Importa o módulo do router só quando ele é acessado, para que importar
+    # um router isolado (scripts, testes) não carregue todos os outros.
+    if name in __all__:
+        module = importlib.import_module(f"{__name__}.{name}")
+        globals()[name] = module
+        return module
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
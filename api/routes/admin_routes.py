@@ -0,0 +1,166 @@
+"""Rotas administrativas (protegidas por X-Admin-Token)."""
+from typing import Literal
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import PlainTextResponse
+from sqlalchemy.orm import Session
+from config import get_db, settings
+from controllers.categories_controller import CategoriesController
+from controllers.user_controller import UserController
+from models.purge_jobs import PurgeJobOut
+from utils.cache import response_cache
+from utils.permissions import verify_admin_token
+from utils.memory import memory_tracker
+from utils.profiler import profile_store
+from utils.slow_queries import slow_query_log
+
+
+router = APIRouter(
+    prefix="/admin",
+    tags=["Admin"],
+    dependencies=[Depends(verify_admin_token)]
+)
+
+
+@router.get("/cache")
+async def get_cache_stats():
+    """
+    Retorna hits, misses e hit ratio do cache de leituras por recurso.
+    """
+    return response_cache.stats()
+
+
+@router.delete("/cache", status_code=204)
+async def clear_cache():
+    """
+    Limpa o cache de leituras e zera as estatísticas.
+    """
+    response_cache.clear()
+
+
+@router.get("/purge-jobs/{job_id}", response_model=PurgeJobOut)
+async def get_purge_job(job_id: int, db: Session = Depends(get_db)):
+    """
+    Retorna o status e o progresso de um job de remoção de conta.
+    """
+    return UserController.get_purge_job(job_id=job_id, db=db)
+
+
+@router.post("/categories/rebuild-closure")
+async def rebuild_category_closure(db: Session = Depends(get_db)):
+    """
+    Reconstrói a closure table das categorias a partir de parent_id, para
+    bancos com categorias criadas antes da hierarquia (sem ela, os rollups
+    dessas categorias retornam zero). Pode ser executada mais de uma vez.
+    """
+    return CategoriesController.rebuild_closure(db=db)
+
+
+@router.get("/slow-queries")
+async def get_slow_queries(
+    limit: int = Query(20, ge=1, le=100),
+    sort_by: Literal["total_ms", "count", "max_ms", "mean_ms"] = "total_ms"
+):
+    """
+    Retorna as consultas lentas deste worker, agrupadas por SQL normalizado e
+    ordenadas por `sort_by`, com rotas de origem, formato dos parâmetros e o
+    plano de execução (EXPLAIN).
+    """
+    return slow_query_log.top(limit=limit, sort_by=sort_by)
+
+
+@router.delete("/slow-queries", status_code=204)
+async def clear_slow_queries():
+    """
+    Limpa o log de consultas lentas.
+    """
+    slow_query_log.clear()
+
+
+@router.get("/profiles")
+async def list_profiles():
+    """
+    Lista os perfis guardados neste worker (requisições com o header
+    X-Profile e janelas do modo periódico), do mais recente ao mais antigo.
+    """
+    return profile_store.list()
+
+
+@router.get("/profiles/{profile_id}", response_class=PlainTextResponse)
+async def get_profile(profile_id: str):
+    """
+    Retorna o perfil no formato de stacks colapsadas (uma linha
+    `frame;frame;... contagem`), aceito por flamegraph.pl e speedscope.
+    """
+    profile = profile_store.get(profile_id)
+    if profile is None:
+        raise HTTPException(status_code=404, detail="Profile not found")
+    return PlainTextResponse(profile["collapsed"])
+
+
+@router.get("/memory")
+async def get_memory_status():
+    """
+    Retorna o RSS do worker, a memória rastreada pelo tracemalloc e o pico
+    de alocação por rota (média e máximo desde que foi ligado).
+    """
+    return memory_tracker.status()
+
+
+@router.post("/memory/tracemalloc/start")
+async def start_tracemalloc(frames: int = Query(settings.TRACEMALLOC_FRAMES, ge=1, le=100)):
+    """
+    Liga o tracemalloc neste worker, guardando `frames` frames por alocação.
+    """
+    memory_tracker.start(frames)
+    return memory_tracker.status()
+
+
+@router.post("/memory/tracemalloc/stop")
+async def stop_tracemalloc():
+    """
+    Desliga o tracemalloc e descarta o snapshot de referência.
+    """
+    memory_tracker.stop()
+    memory_tracker.reset_requests()
+    return memory_tracker.status()
+
+
+def _require_tracing():
+    if not memory_tracker.is_tracing():
+        raise HTTPException(status_code=400, detail="tracemalloc is not running")
+
+
+@router.get("/memory/top")
+async def get_top_allocations(
+    limit: int = Query(20, ge=1, le=200),
+    group_by: Literal["lineno", "filename", "traceback"] = "lineno"
+):
+    """
+    Retorna os locais com mais memória alocada e ainda viva.
+    """
+    _require_tracing()
+    return memory_tracker.top(limit=limit, group_by=group_by)
+
+
+@router.post("/memory/snapshot")
+async def take_memory_snapshot():
+    """
+    Guarda um snapshot de referência para GET /admin/memory/diff.
+    """
+    _require_tracing()
+    return {"taken_at": memory_tracker.take_baseline()}
+
+
+@router.get("/memory/diff")
+async def get_memory_diff(
+    limit: int = Query(20, ge=1, le=200),
+    group_by: Literal["lineno", "filename", "traceback"] = "lineno"
+):
+    """
+    Retorna os locais que mais cresceram desde o snapshot de referência.
+    """
+    _require_tracing()
+    diff = memory_tracker.diff(limit=limit, group_by=group_by)
+    if diff is None:
+        raise HTTPException(status_code=400, detail="No memory snapshot to compare against")
+    return diff
@@ -1,5 +1,6 @@
 """Rotas relacionadas a balances."""
-from fastapi import APIRouter, Depends
+from typing import Optional
+from fastapi import APIRouter, Depends, Header, Response
 from controllers.balances_controller import BalanceController
 from models.balances import BalanceOut
 from models.users import User
@@ -17,10 +18,14 @@ router = APIRouter(
 @router.get("/{user_id}", response_model=BalanceOut)
 async def get_user_balance(
     user_id: int,
+    response: Response,
+    if_none_match: Optional[str] = Header(None),
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_active_user_dependency)
 ):
     """
     Recupera o balance de um usuário.
+
+    Suporta GET condicional: envie o ETag recebido em `If-None-Match` para obter 304 se nada mudou.
     """
-    return BalanceController.get_user_balance(user_id=user_id, db=db)
+    return BalanceController.get_user_balance(user_id=user_id, response=response, if_none_match=if_none_match, db=db)
@@ -0,0 +1,39 @@
+"""Rota de batch de requisições."""
+from fastapi import APIRouter, Depends, Request
+from controllers.batch_controller import BatchController
+from models.batch import BatchRequest, BatchResponse
+from models.users import User
+from sqlalchemy.orm import Session
+from config import get_db
+from auth import get_current_active_user_dependency
+
+
+router = APIRouter(
+    tags=["Batch"]
+)
+
+
+@router.post("/batch", response_model=BatchResponse)
+async def execute_batch(
+    batch_request: BatchRequest,
+    request: Request,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_active_user_dependency)
+):
+    """
+    Executa várias operações da API em uma única chamada.
+
+    A autenticação e a sessão do banco são feitas uma vez e compartilhadas por
+    todas as operações. GETs consecutivos rodam concorrentemente; escritas rodam
+    na ordem enviada. Cada operação tem seu próprio status e corpo no resultado;
+    as operações não formam uma transação (uma falha não desfaz as anteriores).
+
+    Exemplo:
+    ```json
+    {"operations": [
+        {"id": "balance", "method": "GET", "path": "/balances/1"},
+        {"id": "goals", "method": "GET", "path": "/goals/user/1?fields=name,percent_complete"}
+    ]}
+    ```
+    """
+    return await BatchController.execute_batch(batch_request=batch_request, request=request, current_user=current_user, db=db)
@@ -1,7 +1,9 @@
 """Rotas relacionadas a categorias."""
-from fastapi import APIRouter, Depends, Query
+from datetime import datetime
+from typing import Optional
+from fastapi import APIRouter, Depends, Query, Header, Response
 from controllers.categories_controller import CategoriesController
-from models.categories import CategoryCreate, CategoryUpdate, CategoryOut
+from models.categories import CategoryCreate, CategoryBulkCreate, CategoryUpdate, CategoryOut, CategoryTreeNode, CategoryRollup, CategoryMerge, CategoryMergeResult
 from models.users import User
 from sqlalchemy.orm import Session
 from config import get_db
@@ -26,28 +28,73 @@ async def create_category(
     return CategoriesController.create_category(category_create=category_create, user_id=current_user.id, db=db)
 
 
+@router.post("/bulk", response_model=list[CategoryOut], status_code=201)
+async def create_categories(
+    category_bulk_create: CategoryBulkCreate,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_active_user_dependency)
+):
+    """
+    Cria várias categorias em uma única transação (até 100 por chamada).
+    Se algum nome já existir, nenhuma categoria é criada.
+    """
+    return CategoriesController.create_categories(category_bulk_create=category_bulk_create, user_id=current_user.id, db=db)
+
+
+@router.get("/tree", response_model=list[CategoryTreeNode])
+async def get_category_tree(
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_active_user_dependency)
+):
+    """
+    Recupera as categorias ativas do usuário organizadas em árvore (subcategorias em `children`).
+    """
+    return CategoriesController.get_category_tree(user_id=current_user.id, db=db)
+
+
+@router.get("/{category_id}/rollup", response_model=CategoryRollup)
+async def get_category_rollup(
+    category_id: int,
+    start: Optional[datetime] = Query(None, description="Início do período (inclusivo)"),
+    end: Optional[datetime] = Query(None, description="Fim do período (exclusivo)"),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_active_user_dependency)
+):
+    """
+    Recupera os totais de receitas e despesas da categoria somando toda a sua
+    subárvore, além dos totais de cada subcategoria direta.
+    """
+    return CategoriesController.get_category_rollup(category_id=category_id, user_id=current_user.id, start=start, end=end, db=db)
+
+
 @router.get("/{category_id}", response_model=CategoryOut)
 async def get_category(
     category_id: int,
+    fields: Optional[str] = Query(None, description="Campos a retornar, separados por vírgula (ex.: 'id,name')"),
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_active_user_dependency)
 ):
     """
     Recupera uma categoria pelo ID (apenas do usuário autenticado).
     """
-    return CategoriesController.get_category(category_id=category_id, user_id=current_user.id, db=db)
+    return CategoriesController.get_category(category_id=category_id, user_id=current_user.id, fields=fields, db=db)
 
 
 @router.get("/", response_model=list[CategoryOut])
 async def get_all_categories(
+    response: Response,
     category_type: str = Query(None, description="Filtrar por tipo: 'income' ou 'expense'"),
+    fields: Optional[str] = Query(None, description="Campos a retornar, separados por vírgula (ex.: 'id,name')"),
+    if_none_match: Optional[str] = Header(None),
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_active_user_dependency)
 ):
     """
     Recupera todas as categorias do usuário, opcionalmente filtradas por tipo.
+
+    Suporta GET condicional: envie o ETag recebido em `If-None-Match` para obter 304 se nada mudou.
     """
-    return CategoriesController.get_all_categories(user_id=current_user.id, category_type=category_type, db=db)
+    return CategoriesController.get_all_categories(user_id=current_user.id, category_type=category_type, response=response, if_none_match=if_none_match, fields=fields, db=db)
 
 
 @router.put("/{category_id}", response_model=CategoryOut)
@@ -73,3 +120,20 @@ async def delete_category(
     Deleta uma categoria (soft delete) do usuário autenticado.
     """
     return CategoriesController.delete_category(category_id=category_id, user_id=current_user.id, db=db)
+
+
+@router.post("/{category_id}/merge", response_model=CategoryMergeResult)
+async def merge_category(
+    category_id: int,
+    category_merge: CategoryMerge,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_active_user_dependency)
+):
+    """
+    Mescla a categoria em `target_category_id`: move todas as transações (em lotes),
+    passa as subcategorias para o destino e remove a categoria de origem.
+
+    Também aceita categorias já removidas, para reatribuir transações que
+    ficaram apontando para elas. Retorna o número de transações movidas.
+    """
+    return CategoriesController.merge_category(category_id=category_id, user_id=current_user.id, category_merge=category_merge, db=db)
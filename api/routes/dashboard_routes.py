@@ -0,0 +1,31 @@
+"""Rota do dashboard."""
+from typing import Optional
+from fastapi import APIRouter, Depends, Header, Query
+from controllers.dashboard_controller import DashboardController
+from models.dashboard import DashboardOut
+from models.users import User
+from sqlalchemy.orm import Session
+from config import get_db
+from auth import get_current_active_user_dependency
+
+
+router = APIRouter(
+    prefix="/dashboard",
+    tags=["Dashboard"]
+)
+
+
+@router.get("/", response_model=DashboardOut)
+async def get_dashboard(
+    recent: int = Query(10, ge=1, le=50, description="Quantidade de transações recentes"),
+    if_none_match: Optional[str] = Header(None),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_active_user_dependency)
+):
+    """
+    Recupera, em uma única chamada, o balance, as metas ativas, as categorias,
+    as últimas transações e o resumo por categoria do mês atual.
+
+    Suporta GET condicional: envie o ETag recebido em `If-None-Match` para obter 304 se nada mudou.
+    """
+    return DashboardController.get_dashboard(user_id=current_user.id, recent=recent, if_none_match=if_none_match, db=db)
@@ -0,0 +1,50 @@
+"""Rotas relacionadas às regras de financiamento automático de metas."""
+from fastapi import APIRouter, Depends
+from controllers.funding_rules_controller import FundingRulesController
+from models.funding_rules import GoalFundingRuleCreate, GoalFundingRuleOut
+from models.users import User
+from sqlalchemy.orm import Session
+from config import get_db
+from auth import get_current_active_user_dependency
+
+
+router = APIRouter(
+    prefix="/funding-rules",
+    tags=["Funding Rules"]
+)
+
+
+@router.post("/", response_model=GoalFundingRuleOut, status_code=201)
+async def create_rule(
+    rule_create: GoalFundingRuleCreate,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_active_user_dependency)
+):
+    """
+    Cria uma regra que direciona uma porcentagem de cada receita (ou só das
+    receitas de uma categoria) para uma meta.
+    """
+    return FundingRulesController.create_rule(rule_create=rule_create, user_id=current_user.id, db=db)
+
+
+@router.get("/", response_model=list[GoalFundingRuleOut])
+async def get_rules(
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_active_user_dependency)
+):
+    """
+    Lista as regras do usuário autenticado.
+    """
+    return FundingRulesController.get_rules(user_id=current_user.id, db=db)
+
+
+@router.delete("/{rule_id}", status_code=204)
+async def delete_rule(
+    rule_id: int,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_active_user_dependency)
+):
+    """
+    Remove uma regra do usuário autenticado.
+    """
+    return FundingRulesController.delete_rule(rule_id=rule_id, user_id=current_user.id, db=db)
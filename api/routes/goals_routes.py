@@ -1,7 +1,8 @@
 """Rotas relacionadas a metas (goals)."""
-from fastapi import APIRouter, Depends, Body
+from typing import Literal, Optional
+from fastapi import APIRouter, Depends, Body, Header, Query, Response
 from controllers.goals_controller import GoalsController
-from models.goals import GoalCreate, GoalUpdate, GoalOut
+from models.goals import GoalCreate, GoalListQuery, GoalUpdate, GoalOut, GoalProgress
 from models.users import User
 from sqlalchemy.orm import Session
 from config import get_db
@@ -29,25 +30,61 @@ async def create_goal(
 @router.get("/{goal_id}", response_model=GoalOut)
 async def get_goal(
     goal_id: int,
+    fields: Optional[str] = Query(None, description="Campos a retornar, separados por vírgula (ex.: 'id,name')"),
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_active_user_dependency)
 ):
     """
     Recupera uma meta pelo ID.
     """
-    return GoalsController.get_goal(goal_id=goal_id, db=db)
+    return GoalsController.get_goal(goal_id=goal_id, fields=fields, db=db)
+
+
+@router.get("/{goal_id}/progress", response_model=GoalProgress)
+async def get_goal_progress(
+    goal_id: int,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_active_user_dependency)
+):
+    """
+    Recupera o progresso diário da meta (contribuições e saldo ao fim de cada dia),
+    o ritmo médio por dia e a data estimada de conclusão.
+    """
+    return GoalsController.get_goal_progress(goal_id=goal_id, db=db)
 
 
 @router.get("/user/{user_id}", response_model=list[GoalOut])
 async def get_user_goals(
     user_id: int,
+    response: Response,
+    fields: Optional[str] = Query(None, description="Campos a retornar, separados por vírgula (ex.: 'id,name')"),
+    sort_by: Optional[Literal["name", "created_at", "target_amount", "percent_complete", "remaining_amount"]] = Query(None, description="Campo de ordenação"),
+    order: Literal["asc", "desc"] = Query("asc", description="Direção da ordenação"),
+    min_percent_complete: Optional[float] = Query(None, ge=0, le=100, description="Apenas metas com pelo menos esta porcentagem concluída"),
+    max_remaining_amount: Optional[float] = Query(None, ge=0, description="Apenas metas que faltam no máximo este valor"),
+    skip: int = Query(0, ge=0, description="Quantidade de metas a pular"),
+    limit: Optional[int] = Query(None, ge=1, le=100, description="Quantidade máxima de metas (padrão: todas)"),
+    if_none_match: Optional[str] = Header(None),
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_active_user_dependency)
 ):
     """
-    Recupera todas as metas de um usuário.
+    Recupera as metas ativas de um usuário.
+
+    Filtros, ordenação (inclusive por `percent_complete` e `remaining_amount`) e
+    paginação são aplicados pelo banco.
+
+    Suporta GET condicional: envie o ETag recebido em `If-None-Match` para obter 304 se nada mudou.
     """
-    return GoalsController.get_user_goals(user_id=user_id, db=db)
+    query = GoalListQuery(
+        sort_by=sort_by,
+        order=order,
+        min_percent_complete=min_percent_complete,
+        max_remaining_amount=max_remaining_amount,
+        skip=skip,
+        limit=limit
+    )
+    return GoalsController.get_user_goals(user_id=user_id, response=response, if_none_match=if_none_match, fields=fields, query=query, db=db)
 
 
 @router.put("/{goal_id}", response_model=GoalOut)
@@ -1,7 +1,8 @@
 """Rotas relacionadas a transações."""
-from fastapi import APIRouter, Depends
+from typing import Optional
+from fastapi import APIRouter, Depends, Query
 from controllers.transactions_controller import TransactionsController
-from models.transactions import TransactionCreate, TransactionUpdate, TransactionOut, PaginatedTransactionResponse
+from models.transactions import TransactionCreate, TransactionBulkCreate, TransactionUpdate, TransactionOut, PaginatedTransactionResponse
 from models.users import User
 from sqlalchemy.orm import Session
 from config import get_db
@@ -26,30 +27,46 @@ async def create_transaction(
     return TransactionsController.create_transaction(transaction_create=transaction_create, user_id=current_user.id, db=db)
 
 
+@router.post("/bulk", response_model=list[TransactionOut], status_code=201)
+async def create_transactions(
+    transaction_bulk: TransactionBulkCreate,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_active_user_dependency)
+):
+    """
+    Importa várias transações do usuário autenticado de uma vez (até 500).
+    """
+    return TransactionsController.create_transactions(transaction_bulk=transaction_bulk, user_id=current_user.id, db=db)
+
+
 @router.get("/{transaction_id}", response_model=TransactionOut)
 async def get_transaction(
     transaction_id: int,
+    fields: Optional[str] = Query(None, description="Campos a retornar, separados por vírgula (ex.: 'id,name')"),
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_active_user_dependency)
 ):
     """
     Recupera uma transação pelo ID (apenas do usuário autenticado).
     """
-    return TransactionsController.get_transaction(transaction_id=transaction_id, user_id=current_user.id, db=db)
+    return TransactionsController.get_transaction(transaction_id=transaction_id, user_id=current_user.id, fields=fields, db=db)
 
 
 @router.get("/", response_model=PaginatedTransactionResponse)
 async def get_paginated_transactions(
     page: int = 1,
     limit: int = 10,
+    fields: Optional[str] = Query(None, description="Campos a retornar, separados por vírgula (ex.: 'id,name')"),
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_active_user_dependency)
 ):
     """
     Recupera uma lista paginada de transações do usuário autenticado.
+
+    Use `fields` para receber apenas alguns campos (ex.: `?fields=id,description,amount,date`).
     """
     skip = (page - 1) * limit
-    return TransactionsController.get_paginated_transactions(skip=skip, limit=limit, user_id=current_user.id, page=page, db=db)
+    return TransactionsController.get_paginated_transactions(skip=skip, limit=limit, user_id=current_user.id, page=page, fields=fields, db=db)
 
 
 @router.put("/{transaction_id}", response_model=TransactionOut)
@@ -1,7 +1,7 @@
-from fastapi import APIRouter, Depends
-from fastapi.responses import Response
+from fastapi import APIRouter, BackgroundTasks, Depends
 from controllers.user_controller import UserController
 from models.users import UserCreate, UserUpdate, UserOut, User
+from models.purge_jobs import PurgeJobOut
 from sqlalchemy.orm import Session
 from config import get_db
 from auth import get_current_active_user_dependency
@@ -13,6 +13,18 @@ router = APIRouter(prefix="/users", tags=["users"])
 async def create_user(user_create: UserCreate, db: Session = Depends(get_db)) -> UserOut:
     return UserController.create_user(user_create, db)
 
+@router.get("/me/export")
+async def export_user(
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_active_user_dependency)
+):
+    """
+    Exporta todos os dados do usuário autenticado (perfil, balance, categorias,
+    metas, contribuições, regras de financiamento e transações) em um ZIP com
+    membros JSON e CSV, gerado em streaming.
+    """
+    return UserController.export_user(current_user.id, db)
+
 @router.put("/{user_id}", response_model=UserOut)
 async def update_user(
     user_id: int,
@@ -22,12 +34,17 @@ async def update_user(
 ) -> UserOut:
     return UserController.update_user(user_id, user_update, db)
 
-@router.delete("/{user_id}", status_code=204)
+@router.delete("/{user_id}", response_model=PurgeJobOut, status_code=202)
 async def delete_user(
     user_id: int,
+    background_tasks: BackgroundTasks,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_active_user_dependency)
-) -> Response:
-    return UserController.delete_user(user_id, db)
+) -> PurgeJobOut:
+    """
+    Remove o usuário. A conta é desativada imediatamente e os dados são
+    removidos em segundo plano; acompanhe o job em GET /admin/purge-jobs/{id}.
+    """
+    return UserController.delete_user(user_id, background_tasks, db)
     
 
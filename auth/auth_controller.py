@@ -1,5 +1,5 @@
 """Controlador de autenticação."""
-from fastapi import Depends, HTTPException, status
+from fastapi import Depends, HTTPException, Request, status
 from fastapi.security import OAuth2PasswordBearer, OAuth2PasswordRequestForm
 from sqlalchemy.orm import Session
 from auth.login_service import LoginService
@@ -70,18 +70,26 @@ class AuthController:
 
 # Dependency para usar em rotas protegidas
 def get_current_user_dependency(
+    request: Request,
     token: str = Depends(oauth2_scheme),
     db: Session = Depends(get_db)
 ) -> User:
     """
     Dependency que pode ser usada em qualquer rota para obter o usuário autenticado.
+    Em sub-requisições de POST /batch, o usuário já autenticado na requisição
+    principal é reutilizado (sem decodificar o token novamente).
     
     Usage:
         @router.get("/protected")
         def protected_route(current_user: User = Depends(get_current_user_dependency)):
             return {"user": current_user.email}
     """
-    return AuthController.get_current_user(token, db)
+    user = getattr(request.state, "batch_user", None)
+    if user is None:
+        user = AuthController.get_current_user(token, db)
+    # Identifica o usuário no access log
+    request.state.user_id = user.id
+    return user
 
 
 def get_current_active_user_dependency(
@@ -1,7 +1,6 @@
 """Serviço de autenticação e login com JWT."""
 from datetime import datetime, timedelta, timezone
 from typing import Optional
-import jwt
 from fastapi import HTTPException, status
 from sqlalchemy.orm import Session
 from models.users import User
@@ -51,6 +50,8 @@ class LoginService:
         Returns:
             Token JWT como string
         """
+        import jwt
+
         to_encode = data.copy()
         
         if expires_delta:
@@ -75,6 +76,10 @@ class LoginService:
         Raises:
             HTTPException: Se o token for inválido ou expirado
         """
+        # PyJWT (e cryptography/bcrypt, que ele arrasta) é importado sob demanda
+        # para não pesar no boot dos workers.
+        import jwt
+
         credentials_exception = HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Could not validate credentials",
@@ -0,0 +1,124 @@
+"""
+Benchmark de banda e latência da compressão de respostas.
+
+Para payloads representativos (página de transações, listagem de categorias,
+export CSV), mede o tamanho comprimido, o tempo de compressão e a latência
+estimada de entrega (compressão + transferência) em diferentes larguras de banda.
+
+Uso:
+    python benchmarks/bench_compression.py [--repeat 20] [--json]
+"""
+import argparse
+import csv
+import io
+import json
+import statistics
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from utils.compression import StreamCompressor, available_encodings
+
+# Larguras de banda (Mbit/s) usadas na estimativa de latência
+BANDWIDTHS_MBPS = {"3g": 1.5, "4g": 10.0, "wifi": 50.0}
+LEVELS = {"gzip": (1, 6, 9), "br": (4, 11), "zstd": (3, 10)}
+
+
+def _transactions(count: int) -> list[dict]:
+    now = datetime.now(timezone.utc)
+    return [
+        {
+            "id": i,
+            "user_id": 1,
+            "description": f"Transaction {i} at store #{i % 37}",
+            "amount": round((i * 7.31) % 900 + 0.99, 2),
+            "transaction_type": "expense" if i % 4 else "income",
+            "category_id": 1 + i % 12,
+            "date": (now - timedelta(hours=i)).isoformat(),
+            "created_at": (now - timedelta(hours=i)).isoformat(),
+            "updated_at": (now - timedelta(hours=i)).isoformat(),
+            "deleted_at": None,
+        }
+        for i in range(count)
+    ]
+
+
+def payloads() -> dict[str, bytes]:
+    transactions = _transactions(1000)
+    categories = [
+        {"id": i, "name": f"Category {i}", "category_type": "expense", "color": "#FF5722", "icon": "tag",
+         "created_at": transactions[0]["created_at"], "updated_at": None, "deleted_at": None}
+        for i in range(40)
+    ]
+    export = io.StringIO()
+    writer = csv.DictWriter(export, fieldnames=list(transactions[0]))
+    writer.writeheader()
+    writer.writerows(_transactions(10000))
+    return {
+        "transactions page (100)": json.dumps({"items": transactions[:100], "total": 1000, "page": 1, "limit": 100}).encode(),
+        "transactions page (1000)": json.dumps({"items": transactions, "total": 1000, "page": 1, "limit": 1000}).encode(),
+        "categories (40)": json.dumps(categories).encode(),
+        "export csv (10k rows)": export.getvalue().encode(),
+    }
+
+
+def _compress(encoding: str, level: int, data: bytes) -> bytes:
+    compressor = StreamCompressor(encoding, level)
+    return compressor.compress(data) + compressor.flush()
+
+
+def run(repeat: int) -> list[dict]:
+    results = []
+    for name, data in payloads().items():
+        variants = [("identity", 0)] + [(encoding, level) for encoding in available_encodings() for level in LEVELS[encoding]]
+        for encoding, level in variants:
+            if encoding == "identity":
+                size, compress_ms = len(data), 0.0
+            else:
+                samples = []
+                for _ in range(repeat):
+                    start = time.perf_counter()
+                    compressed = _compress(encoding, level, data)
+                    samples.append((time.perf_counter() - start) * 1000)
+                size, compress_ms = len(compressed), statistics.median(samples)
+
+            result = {
+                "payload": name,
+                "encoding": encoding,
+                "level": level,
+                "bytes": size,
+                "ratio": round(len(data) / size, 2),
+                "compress_ms": round(compress_ms, 3),
+            }
+            for label, mbps in BANDWIDTHS_MBPS.items():
+                transfer_ms = size * 8 / (mbps * 1_000_000) * 1000
+                result[f"latency_{label}_ms"] = round(compress_ms + transfer_ms, 2)
+            results.append(result)
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--json", action="store_true", help="Imprime os resultados em JSON")
+    args = parser.parse_args()
+
+    results = run(args.repeat)
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+
+    header = f"{'payload':<26} {'encoding':<9} {'lvl':>3} {'bytes':>9} {'ratio':>6} {'cpu ms':>8}"
+    header += "".join(f" {label + ' ms':>9}" for label in BANDWIDTHS_MBPS)
+    print(header)
+    for r in results:
+        line = f"{r['payload']:<26} {r['encoding']:<9} {r['level']:>3} {r['bytes']:>9} {r['ratio']:>6} {r['compress_ms']:>8.2f}"
+        line += "".join(f" {r[f'latency_{label}_ms']:>9.2f}" for label in BANDWIDTHS_MBPS)
+        print(line)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,160 @@
+"""
+Benchmark do caminho rápido de serialização JSON (FAST_JSON_RESPONSES).
+
+Compara, para payloads de 1k linhas, o caminho padrão (objetos ORM +
+model_validate por linha + response_model + encoder da stdlib) com o
+caminho rápido (colunas explícitas + TypeAdapter.dump_json direto nos bytes).
+
+Uso:
+    python benchmarks/bench_serialization.py [--rows 1000] [--repeat 30] [--json]
+"""
+import argparse
+import json
+import os
+import statistics
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+os.environ.setdefault("TESTING", "true")
+os.environ.setdefault("DEBUG", "true")
+os.environ["CACHE_BACKEND"] = "none"
+
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from auth import get_current_active_user_dependency
+from config import Base, get_db, settings
+from main import app
+from models.categories import Category
+from models.transactions import Transaction
+from models.users import User
+from services.categories_service import CategoriesService
+from services.transactions_service import TransactionsService
+
+
+def _seed(session, rows: int) -> User:
+    user = User(email="bench@example.com", first_name="Bench", last_name="User", hashed_password="x")
+    session.add(user)
+    session.flush()
+    now = datetime.now(timezone.utc)
+    session.add_all([
+        Category(user_id=user.id, name=f"Category {i}", category_type="expense", color="#FF5722", icon="tag")
+        for i in range(rows)
+    ])
+    session.flush()
+    session.add_all([
+        Transaction(
+            user_id=user.id,
+            description=f"Transaction {i}",
+            amount=float(i % 500) + 0.99,
+            transaction_type="expense" if i % 3 else "income",
+            category_id=1 + i % rows,
+            date=now - timedelta(minutes=i),
+        )
+        for i in range(rows)
+    ])
+    session.commit()
+    return user
+
+
+def _timeit(func, repeat: int) -> float:
+    """Mediana em milissegundos."""
+    func()
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        samples.append((time.perf_counter() - start) * 1000)
+    return statistics.median(samples)
+
+
+def run(rows: int, repeat: int) -> list[dict]:
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(bind=engine)
+    SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+    session = SessionLocal()
+    user = _seed(session, rows)
+
+    def override_get_db():
+        db = SessionLocal()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    app.dependency_overrides[get_db] = override_get_db
+    app.dependency_overrides[get_current_active_user_dependency] = lambda: user
+    client = TestClient(app)
+
+    cases = {
+        "categories (http)": lambda: client.get("/categories/"),
+        "transactions page (http)": lambda: client.get(f"/transactions/?page=1&limit={rows}"),
+    }
+    results = []
+    for name, call in cases.items():
+        settings.FAST_JSON_RESPONSES = False
+        standard = _timeit(call, repeat)
+        settings.FAST_JSON_RESPONSES = True
+        fast = _timeit(call, repeat)
+        results.append({"case": name, "rows": rows, "standard_ms": standard, "fast_ms": fast})
+
+    service_session = SessionLocal()
+    categories = CategoriesService(service_session)
+    transactions = TransactionsService(service_session)
+
+    def standard_categories():
+        items = categories.get_all_categories(user.id)
+        return json.dumps([item.model_dump(mode="json") for item in items]).encode()
+
+    def standard_transactions():
+        page = transactions.get_paginated_transactions(0, rows, user.id, 1)
+        page["items"] = [item.model_dump(mode="json") for item in page["items"]]
+        return json.dumps(page).encode()
+
+    results.append({
+        "case": "categories (service)",
+        "rows": rows,
+        "standard_ms": _timeit(standard_categories, repeat),
+        "fast_ms": _timeit(lambda: categories.get_all_categories_json(user.id), repeat),
+    })
+    results.append({
+        "case": "transactions page (service)",
+        "rows": rows,
+        "standard_ms": _timeit(standard_transactions, repeat),
+        "fast_ms": _timeit(lambda: transactions.get_paginated_transactions_json(0, rows, user.id, 1), repeat),
+    })
+
+    service_session.close()
+    session.close()
+    app.dependency_overrides.clear()
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=1000)
+    parser.add_argument("--repeat", type=int, default=30)
+    parser.add_argument("--json", action="store_true", help="Imprime os resultados em JSON")
+    args = parser.parse_args()
+
+    results = run(args.rows, args.repeat)
+    for result in results:
+        result["speedup"] = round(result["standard_ms"] / result["fast_ms"], 2)
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+
+    print(f"{'case':<30} {'rows':>6} {'standard (ms)':>14} {'fast (ms)':>10} {'speedup':>8}")
+    for result in results:
+        print(f"{result['case']:<30} {result['rows']:>6} {result['standard_ms']:>14.2f} {result['fast_ms']:>10.2f} {result['speedup']:>7.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,288 @@
+"""
+Micro-benchmarks dos services (transações, categorias, metas, balance e login).
+
+Popula um usuário com N transações (escalas 1k, 100k e 1m) em SQLite (arquivo
+temporário) ou, opcionalmente, em um MySQL local, e mede a mediana, o p95 e o
+mínimo de cada método. Os resultados saem em JSON e podem ser comparados com
+um baseline salvo: uma regressão acima da tolerância faz o comando terminar
+com código 1, para ser usado como contrato de performance.
+
+No MySQL os dados são criados para um usuário próprio do benchmark e
+removidos ao final pelo job de remoção de contas; use um banco descartável.
+
+Uso:
+    python benchmarks/bench_services.py [--scales 1k,100k] [--backend sqlite|mysql] [--repeat 20]
+        [--output results.json] [--baseline baseline.json] [--save-baseline baseline.json] [--tolerance 0.2] [--min-delta-ms 0.5]
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+os.environ.setdefault("TESTING", "true")
+os.environ["CACHE_BACKEND"] = "none"
+
+import sqlalchemy
+from sqlalchemy import create_engine, insert
+from sqlalchemy.orm import sessionmaker
+
+from auth.login_service import LoginService
+from config import Base, settings
+from models.categories import CategoryCreate
+from models.goals import GoalCreate, GoalListQuery
+from models.transactions import Transaction, TransactionCreate, TransactionUpdate
+from models.users import User
+from services.balances_service import BalanceService
+from services.categories_service import CategoriesService
+from services.goals_service import GoalsService
+from services.purge_service import run_purge_job
+from services.transactions_service import TransactionsService
+from services.uers_service import UserService, hash_password
+
+SCALES = {"1k": 1_000, "100k": 100_000, "1m": 1_000_000}
+SEED_CHUNK_SIZE = 10_000
+CATEGORIES = 20
+GOALS = 20
+CONTRIBUTIONS_PER_GOAL = 10
+PASSWORD = "benchmark-password"
+
+
+def _seed(session, rows: int) -> dict:
+    """Cria o usuário, categorias, metas com histórico e `rows` transações."""
+    user = User(
+        email=f"bench-{time.time_ns()}@example.com",
+        first_name="Bench",
+        last_name="User",
+        hashed_password=hash_password(PASSWORD)
+    )
+    session.add(user)
+    session.commit()
+
+    categories = CategoriesService(session).create_categories([
+        CategoryCreate(name=f"Category {i}", category_type="expense" if i % 4 else "income", color="#FF5722")
+        for i in range(CATEGORIES)
+    ], user.id)
+
+    goals_service = GoalsService(session)
+    goals = [
+        goals_service.create_goal(GoalCreate(user_id=user.id, name=f"Goal {i}", target_amount=1000.0 * (i + 1), color="#2196F3"))
+        for i in range(GOALS)
+    ]
+    for goal in goals:
+        for _ in range(CONTRIBUTIONS_PER_GOAL):
+            goals_service.add_amount_to_goal(goal.id, 10.0)
+
+    now = datetime.now(timezone.utc)
+    for offset in range(0, rows, SEED_CHUNK_SIZE):
+        session.execute(insert(Transaction), [
+            {
+                "user_id": user.id,
+                "description": f"Transaction {i}",
+                "amount": float(i % 500) + 0.99,
+                "transaction_type": categories[i % CATEGORIES].category_type,
+                "category_id": categories[i % CATEGORIES].id,
+                "date": now - timedelta(minutes=i),
+                "created_at": now,
+                "updated_at": now,
+            }
+            for i in range(offset, min(offset + SEED_CHUNK_SIZE, rows))
+        ])
+        session.commit()
+
+    # Uma transação pelo caminho normal cria o balance do usuário
+    transaction = TransactionsService(session).create_transaction(TransactionCreate(
+        description="Seed", amount=1.0, transaction_type="expense",
+        category_id=categories[1].id, date=now
+    ), user.id)
+    return {"user": user, "categories": categories, "goals": goals, "transaction": transaction}
+
+
+def _measure(func, repeat: int) -> dict:
+    """Mediana, p95 e mínimo em milissegundos (após uma execução de aquecimento)."""
+    func()
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        samples.append((time.perf_counter() - start) * 1000)
+    p95 = statistics.quantiles(samples, n=20)[18] if len(samples) >= 2 else samples[0]
+    return {
+        "median_ms": round(statistics.median(samples), 4),
+        "p95_ms": round(p95, 4),
+        "min_ms": round(min(samples), 4),
+        "runs": repeat,
+    }
+
+
+def _cases(session, data: dict, rows: int) -> dict:
+    user_id = data["user"].id
+    email = data["user"].email
+    category = data["categories"][1]
+    goal = data["goals"][0]
+    transaction_id = data["transaction"].id
+    now = datetime.now(timezone.utc)
+    month_start = now.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+
+    transactions = TransactionsService(session)
+    categories = CategoriesService(session)
+    goals = GoalsService(session)
+    balances = BalanceService(session)
+    login = LoginService(session)
+    token = login.create_access_token({"sub": str(user_id), "email": email})
+    sorted_goals = GoalListQuery(sort_by="percent_complete", order="desc")
+    new_transaction = TransactionCreate(
+        description="Benchmark", amount=9.99, transaction_type="expense", category_id=category.id, date=now
+    )
+
+    return {
+        "TransactionsService.get_paginated_transactions (first page)": lambda: transactions.get_paginated_transactions(0, 50, user_id, 1),
+        "TransactionsService.get_paginated_transactions (middle page)": lambda: transactions.get_paginated_transactions(rows // 2, 50, user_id, rows // 100 + 1),
+        "TransactionsService.get_paginated_transactions_json": lambda: transactions.get_paginated_transactions_json(0, 50, user_id, 1),
+        "TransactionsService.get_recent_transactions": lambda: transactions.get_recent_transactions(user_id),
+        "TransactionsService.get_category_breakdown": lambda: transactions.get_category_breakdown(user_id, month_start, now + timedelta(days=1)),
+        "TransactionsService.get_transaction": lambda: transactions.get_transaction(transaction_id, user_id),
+        "TransactionsService.create_transaction": lambda: transactions.create_transaction(new_transaction, user_id),
+        "TransactionsService.update_transaction": lambda: transactions.update_transaction(transaction_id, user_id, TransactionUpdate(amount=2.0)),
+        "CategoriesService.get_all_categories": lambda: categories.get_all_categories(user_id),
+        "CategoriesService.get_all_categories_json": lambda: categories.get_all_categories_json(user_id),
+        "CategoriesService.get_category": lambda: categories.get_category(category.id, user_id),
+        "GoalsService.get_user_goals": lambda: goals.get_user_goals(user_id),
+        "GoalsService.get_user_goals (sorted by progress)": lambda: goals.get_user_goals(user_id, sorted_goals),
+        "GoalsService.get_goal_progress": lambda: goals.get_goal_progress(goal.id),
+        "GoalsService.add_amount_to_goal": lambda: goals.add_amount_to_goal(goal.id, 1.0),
+        "BalanceService.get_user_balance": lambda: balances.get_user_balance(user_id),
+        "LoginService.authenticate_user": lambda: login.authenticate_user(email, PASSWORD),
+        "LoginService.create_access_token": lambda: login.create_access_token({"sub": str(user_id), "email": email}),
+        "LoginService.get_current_user": lambda: login.get_current_user(token),
+    }
+
+
+def run_scale(url: str, backend: str, scale: str, repeat: int) -> list[dict]:
+    engine = create_engine(url)
+    Base.metadata.create_all(bind=engine)
+    SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    rows = SCALES[scale]
+
+    session = SessionLocal()
+    started = time.perf_counter()
+    data = _seed(session, rows)
+    print(f"[{backend} {scale}] {rows} transações populadas em {time.perf_counter() - started:.1f}s", file=sys.stderr)
+
+    results = []
+    for case, call in _cases(session, data, rows).items():
+        results.append({"backend": backend, "scale": scale, "case": case, **_measure(call, repeat)})
+        session.rollback()
+
+    if backend == "mysql":
+        # Mesmo caminho do DELETE /users/{id}: o job é gravado (commit) antes de rodar
+        job = UserService(session).delete_user(data["user"].id)
+        run_purge_job(engine, job.id)
+    session.close()
+    engine.dispose()
+    return results
+
+
+def compare(results: list[dict], baseline: list[dict], tolerance: float, min_delta_ms: float = 0.5) -> list[dict]:
+    """
+    Compara as medianas com o baseline (mesmo backend, escala e caso). Uma
+    variação só conta se passar da tolerância relativa e de `min_delta_ms`,
+    para que o ruído dos casos abaixo de 1 ms não vire regressão.
+    """
+    reference = {(item["backend"], item["scale"], item["case"]): item for item in baseline}
+    comparison = []
+    for result in results:
+        previous = reference.get((result["backend"], result["scale"], result["case"]))
+        if previous is None:
+            comparison.append({**result, "baseline_ms": None, "ratio": None, "status": "new"})
+            continue
+        ratio = result["median_ms"] / previous["median_ms"] if previous["median_ms"] else 1.0
+        delta = abs(result["median_ms"] - previous["median_ms"])
+        if delta < min_delta_ms:
+            status = "ok"
+        elif ratio > 1 + tolerance:
+            status = "regression"
+        elif ratio < 1 - tolerance:
+            status = "improvement"
+        else:
+            status = "ok"
+        comparison.append({**result, "baseline_ms": previous["median_ms"], "ratio": round(ratio, 3), "status": status})
+    return comparison
+
+
+def _metadata(backend: str, repeat: int) -> dict:
+    return {
+        "created_at": datetime.now(timezone.utc).isoformat(),
+        "backend": backend,
+        "repeat": repeat,
+        "python": platform.python_version(),
+        "sqlalchemy": sqlalchemy.__version__,
+        "platform": platform.platform(),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scales", default="1k", help="Escalas separadas por vírgula: 1k, 100k, 1m")
+    parser.add_argument("--backend", choices=("sqlite", "mysql"), default="sqlite")
+    parser.add_argument("--mysql-url", default=None, help="URL do MySQL (padrão: configuração DB_* do .env)")
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--output", help="Grava os resultados (JSON) neste arquivo")
+    parser.add_argument("--baseline", help="Compara com um baseline salvo com --save-baseline")
+    parser.add_argument("--save-baseline", help="Grava os resultados como baseline neste arquivo")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="Variação aceita da mediana (0.2 = 20%%)")
+    parser.add_argument("--min-delta-ms", type=float, default=0.5, help="Diferença mínima da mediana para contar como variação")
+    parser.add_argument("--json", action="store_true", help="Imprime os resultados em JSON")
+    args = parser.parse_args()
+
+    scales = [scale.strip().lower() for scale in args.scales.split(",") if scale.strip()]
+    unknown = [scale for scale in scales if scale not in SCALES]
+    if unknown:
+        parser.error(f"escalas desconhecidas: {', '.join(unknown)}")
+    if args.baseline and not Path(args.baseline).exists():
+        # Falha antes de popular e medir tudo
+        parser.error(f"baseline {args.baseline} não encontrado; rode `make bench-baseline` (ou --save-baseline) primeiro")
+
+    results = []
+    for scale in scales:
+        if args.backend == "mysql":
+            results += run_scale(args.mysql_url or settings.get_database_url(), "mysql", scale, args.repeat)
+            continue
+        with tempfile.TemporaryDirectory() as directory:
+            results += run_scale(f"sqlite:///{Path(directory) / 'bench.db'}", "sqlite", scale, args.repeat)
+
+    document = {"metadata": _metadata(args.backend, args.repeat), "results": results}
+    for path in filter(None, (args.output, args.save_baseline)):
+        Path(path).write_text(json.dumps(document, indent=2) + "\n")
+
+    comparison = None
+    if args.baseline:
+        baseline = json.loads(Path(args.baseline).read_text())["results"]
+        comparison = compare(results, baseline, args.tolerance, args.min_delta_ms)
+        document["comparison"] = comparison
+
+    if args.json:
+        print(json.dumps(document, indent=2))
+    else:
+        rows = comparison or results
+        print(f"{'case':<64} {'scale':>5} {'median (ms)':>12} {'p95 (ms)':>10}" + (f" {'baseline':>10} {'ratio':>7} status" if comparison else ""))
+        for row in rows:
+            line = f"{row['case']:<64} {row['scale']:>5} {row['median_ms']:>12.3f} {row['p95_ms']:>10.3f}"
+            if comparison:
+                baseline_ms = f"{row['baseline_ms']:.3f}" if row["baseline_ms"] is not None else "-"
+                ratio = f"{row['ratio']:.2f}x" if row["ratio"] is not None else "-"
+                line += f" {baseline_ms:>10} {ratio:>7} {row['status']}"
+            print(line)
+
+    if comparison and any(row["status"] == "regression" for row in comparison):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
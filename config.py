@@ -1,6 +1,7 @@
 from sqlalchemy import create_engine
 from sqlalchemy.orm import declarative_base, sessionmaker
 from dotenv import load_dotenv
+from starlette.requests import Request
 import os
 from typing import List
 
@@ -19,6 +20,11 @@ class Settings:
     DB_USERNAME: str = os.getenv("DB_USERNAME", "root")
     DB_PASSWORD: str = os.getenv("DB_PASSWORD", "")
 
+    # Pool de conexões: DB_POOL_WARMUP conexões são abertas antes do worker aceitar tráfego
+    DB_POOL_SIZE: int = int(os.getenv("DB_POOL_SIZE", 5))
+    DB_MAX_OVERFLOW: int = int(os.getenv("DB_MAX_OVERFLOW", 10))
+    DB_POOL_WARMUP: int = int(os.getenv("DB_POOL_WARMUP", 0))
+
     @classmethod
     def get_database_url(cls) -> str:
         """Retorna a URL de conexão do banco de dados."""
@@ -33,6 +39,77 @@ class Settings:
     JWT_SECRET_KEY: str = os.getenv("JWT_SECRET_KEY", "")
     JWT_ALGORITHM: str = os.getenv("JWT_ALGORITHM", "HS256")
 
+    # Cache das leituras por usuário: 'memory' (LRU por processo), 'redis' ou 'none'
+    CACHE_BACKEND: str = os.getenv("CACHE_BACKEND", "memory").lower()
+    CACHE_MAX_ENTRIES: int = int(os.getenv("CACHE_MAX_ENTRIES", 10000))
+    CACHE_TTL_SECONDS: int = int(os.getenv("CACHE_TTL_SECONDS", 300))
+    REDIS_URL: str = os.getenv("REDIS_URL", "redis://localhost:6379/0")
+
+    # Caminho rápido de JSON nas listagens (colunas explícitas + serialização pelo pydantic-core)
+    FAST_JSON_RESPONSES: bool = os.getenv("FAST_JSON_RESPONSES", "False").lower() == "true"
+
+    # Compressão de respostas (gzip; brotli/zstd se os pacotes estiverem instalados)
+    COMPRESSION_ENABLED: bool = os.getenv("COMPRESSION_ENABLED", "True").lower() == "true"
+    COMPRESSION_MINIMUM_SIZE: int = int(os.getenv("COMPRESSION_MINIMUM_SIZE", 1024))
+    COMPRESSION_LEVEL: int = int(os.getenv("COMPRESSION_LEVEL", 6))
+
+    # Número máximo de operações aceitas por chamada de POST /batch
+    BATCH_MAX_OPERATIONS: int = int(os.getenv("BATCH_MAX_OPERATIONS", 20))
+
+    # Transações movidas por UPDATE (e por commit) ao mesclar categorias
+    CATEGORY_MERGE_CHUNK_SIZE: int = int(os.getenv("CATEGORY_MERGE_CHUNK_SIZE", 5000))
+
+    # Threads para as consultas paralelas do GET /dashboard (1 = sequencial)
+    DASHBOARD_MAX_WORKERS: int = int(os.getenv("DASHBOARD_MAX_WORKERS", 4))
+
+    # Linhas removidas por DELETE (e por commit) na remoção de contas em segundo plano
+    PURGE_CHUNK_SIZE: int = int(os.getenv("PURGE_CHUNK_SIZE", 1000))
+
+    # Linhas lidas do cursor (e enviadas ao ZIP) por vez na exportação da conta
+    EXPORT_CHUNK_SIZE: int = int(os.getenv("EXPORT_CHUNK_SIZE", 1000))
+
+    # Métricas (GET /metrics, formato Prometheus)
+    METRICS_ENABLED: bool = os.getenv("METRICS_ENABLED", "True").lower() == "true"
+    # Diretório compartilhado onde cada worker grava seu snapshot (vazio = só o processo atual)
+    METRICS_DIR: str = os.getenv("METRICS_DIR", "")
+
+    # Em modo debug, avisa quando o mesmo statement se repete esta quantidade de vezes na requisição (N+1)
+    QUERY_REPEAT_THRESHOLD: int = int(os.getenv("QUERY_REPEAT_THRESHOLD", 5))
+
+    # Consultas acima deste tempo (ms) entram no log de consultas lentas (0 = desativado)
+    SLOW_QUERY_THRESHOLD_MS: float = float(os.getenv("SLOW_QUERY_THRESHOLD_MS", 200))
+    # Consultas distintas mantidas no log (as de menor tempo total saem primeiro)
+    SLOW_QUERY_LOG_SIZE: int = int(os.getenv("SLOW_QUERY_LOG_SIZE", 500))
+    # Captura o plano (EXPLAIN) de cada consulta lenta em uma conexão separada
+    SLOW_QUERY_EXPLAIN: bool = os.getenv("SLOW_QUERY_EXPLAIN", "True").lower() == "true"
+
+    # Profiler por amostragem: intervalo das amostras de uma requisição com X-Profile e perfis guardados
+    PROFILE_SAMPLE_INTERVAL_MS: float = float(os.getenv("PROFILE_SAMPLE_INTERVAL_MS", 5))
+    PROFILE_STORE_SIZE: int = int(os.getenv("PROFILE_STORE_SIZE", 50))
+    # Modo periódico: amostra o processo inteiro e guarda um perfil a cada janela
+    PROFILER_PERIODIC_ENABLED: bool = os.getenv("PROFILER_PERIODIC_ENABLED", "False").lower() == "true"
+    PROFILER_PERIODIC_INTERVAL_MS: float = float(os.getenv("PROFILER_PERIODIC_INTERVAL_MS", 50))
+    PROFILER_PERIODIC_WINDOW_SECONDS: float = float(os.getenv("PROFILER_PERIODIC_WINDOW_SECONDS", 60))
+
+    # tracemalloc: ligado desde o início do worker (senão, pela API admin) e frames por traceback
+    TRACEMALLOC_ENABLED: bool = os.getenv("TRACEMALLOC_ENABLED", "False").lower() == "true"
+    TRACEMALLOC_FRAMES: int = int(os.getenv("TRACEMALLOC_FRAMES", 10))
+    # Prefixos das rotas com pico de alocação medido por requisição (com o tracemalloc ligado)
+    MEMORY_TRACKED_PREFIXES: List[str] = os.getenv("MEMORY_TRACKED_PREFIXES", "/transactions,/dashboard,/balances,/categories").split(",")
+
+    # Tracing (spans de rota, controller, service e SQL): exporter "none", "stdout" ou "file"
+    TRACING_EXPORTER: str = os.getenv("TRACING_EXPORTER", "none").lower()
+    TRACING_FILE: str = os.getenv("TRACING_FILE", "traces.jsonl")
+    # Fração das requisições sem traceparent que são amostradas (0.0 a 1.0)
+    TRACING_SAMPLE_RATE: float = float(os.getenv("TRACING_SAMPLE_RATE", 0.1))
+
+    # Access log em JSON (uma linha por requisição), escrito fora do event loop; arquivo vazio = stdout
+    ACCESS_LOG_ENABLED: bool = os.getenv("ACCESS_LOG_ENABLED", "True").lower() == "true"
+    ACCESS_LOG_FILE: str = os.getenv("ACCESS_LOG_FILE", "")
+    # Fração das respostas 2xx registradas nas rotas amostradas (templates separados por vírgula; vazio = todas)
+    ACCESS_LOG_SAMPLE_RATE: float = float(os.getenv("ACCESS_LOG_SAMPLE_RATE", 1.0))
+    ACCESS_LOG_SAMPLED_ROUTES: List[str] = [route for route in os.getenv("ACCESS_LOG_SAMPLED_ROUTES", "").split(",") if route]
+
     @classmethod
     def validate(cls) -> None:
         """Valida as configurações essenciais."""
@@ -43,6 +120,12 @@ class Settings:
         if "*" in cls.ALLOWED_ORIGINS and not cls.DEBUG:
             raise ValueError("ALLOWED_ORIGINS cannot be '*' in production mode")
 
+        if cls.CACHE_BACKEND not in ("memory", "redis", "none"):
+            raise ValueError("CACHE_BACKEND must be 'memory', 'redis' or 'none'")
+
+        if cls.TRACING_EXPORTER not in ("none", "stdout", "file"):
+            raise ValueError("TRACING_EXPORTER must be 'none', 'stdout' or 'file'")
+
     @classmethod
     def get_info(cls) -> dict:
         """Retorna informações sobre as configurações"""
@@ -53,6 +136,40 @@ class Settings:
             "jwt_algorithm": cls.JWT_ALGORITHM,
             "allowed_origins": cls.ALLOWED_ORIGINS,
             "log_level": cls.LOG_LEVEL,
+            "db_pool_size": cls.DB_POOL_SIZE,
+            "db_max_overflow": cls.DB_MAX_OVERFLOW,
+            "db_pool_warmup": cls.DB_POOL_WARMUP,
+            "cache_backend": cls.CACHE_BACKEND,
+            "cache_ttl_seconds": cls.CACHE_TTL_SECONDS,
+            "fast_json_responses": cls.FAST_JSON_RESPONSES,
+            "compression_enabled": cls.COMPRESSION_ENABLED,
+            "compression_minimum_size": cls.COMPRESSION_MINIMUM_SIZE,
+            "batch_max_operations": cls.BATCH_MAX_OPERATIONS,
+            "dashboard_max_workers": cls.DASHBOARD_MAX_WORKERS,
+            "category_merge_chunk_size": cls.CATEGORY_MERGE_CHUNK_SIZE,
+            "purge_chunk_size": cls.PURGE_CHUNK_SIZE,
+            "export_chunk_size": cls.EXPORT_CHUNK_SIZE,
+            "metrics_enabled": cls.METRICS_ENABLED,
+            "metrics_dir": cls.METRICS_DIR,
+            "query_repeat_threshold": cls.QUERY_REPEAT_THRESHOLD,
+            "slow_query_threshold_ms": cls.SLOW_QUERY_THRESHOLD_MS,
+            "slow_query_log_size": cls.SLOW_QUERY_LOG_SIZE,
+            "slow_query_explain": cls.SLOW_QUERY_EXPLAIN,
+            "profile_sample_interval_ms": cls.PROFILE_SAMPLE_INTERVAL_MS,
+            "profile_store_size": cls.PROFILE_STORE_SIZE,
+            "profiler_periodic_enabled": cls.PROFILER_PERIODIC_ENABLED,
+            "profiler_periodic_interval_ms": cls.PROFILER_PERIODIC_INTERVAL_MS,
+            "profiler_periodic_window_seconds": cls.PROFILER_PERIODIC_WINDOW_SECONDS,
+            "tracemalloc_enabled": cls.TRACEMALLOC_ENABLED,
+            "tracemalloc_frames": cls.TRACEMALLOC_FRAMES,
+            "memory_tracked_prefixes": cls.MEMORY_TRACKED_PREFIXES,
+            "tracing_exporter": cls.TRACING_EXPORTER,
+            "tracing_file": cls.TRACING_FILE,
+            "tracing_sample_rate": cls.TRACING_SAMPLE_RATE,
+            "access_log_enabled": cls.ACCESS_LOG_ENABLED,
+            "access_log_file": cls.ACCESS_LOG_FILE,
+            "access_log_sample_rate": cls.ACCESS_LOG_SAMPLE_RATE,
+            "access_log_sampled_routes": cls.ACCESS_LOG_SAMPLED_ROUTES,
         }
 
 settings = Settings()
@@ -71,13 +188,43 @@ def init_db():
         engine = create_engine(
             settings.get_database_url(),
             pool_pre_ping=True,
+            pool_size=settings.DB_POOL_SIZE,
+            max_overflow=settings.DB_MAX_OVERFLOW,
             echo=settings.DEBUG
         )
         SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
     return engine
 
-def get_db():
-    """Dependency para obter sessão do banco."""
+def warm_up_pool(bind, size: int) -> int:
+    """
+    Abre `size` conexões no pool e as devolve em seguida, para que as primeiras
+    requisições do worker não paguem o custo de conexão com o banco.
+
+    Retorna o número de conexões efetivamente abertas.
+    """
+    connections = []
+    try:
+        for _ in range(size):
+            connection = bind.connect()
+            connection.exec_driver_sql("SELECT 1")
+            connections.append(connection)
+    except Exception as e:
+        print(f"Aquecimento do pool interrompido após {len(connections)} conexão(ões): {str(e)}")
+    finally:
+        for connection in connections:
+            connection.close()
+    return len(connections)
+
+def get_db(request: Request):
+    """
+    Dependency para obter sessão do banco.
+    Sub-requisições de POST /batch reutilizam a sessão da requisição principal.
+    """
+    shared = getattr(request.state, "batch_db", None)
+    if shared is not None:
+        yield shared
+        return
+
     if SessionLocal is None:
         init_db()
     db = SessionLocal()
@@ -3,6 +3,9 @@ from .balances_controller import BalanceController
 from .categories_controller import CategoriesController
 from .goals_controller import GoalsController
 from .transactions_controller import TransactionsController
+from .batch_controller import BatchController
+from .dashboard_controller import DashboardController
+from .funding_rules_controller import FundingRulesController
 
 
 __all__ = [
@@ -11,5 +14,8 @@ __all__ = [
     "CategoriesController",
     "GoalsController",
     "TransactionsController",
+    "BatchController",
+    "DashboardController",
+    "FundingRulesController",
 
     ]
\ No newline at end of file
@@ -1,19 +1,34 @@
 """Controlador para rotas relacionadas a balances."""
+from typing import Optional
 from fastapi import Depends
+from fastapi.responses import Response
 from services.balances_service import BalanceService
+from services.resource_versions_service import ResourceVersionService, BALANCES
 from models.balances import BalanceOut
 from sqlalchemy.orm import Session
 from config import get_db
+from utils.etag import build_etag, etag_matches, not_modified
+from utils.tracing import traced
 
 
+@traced("controller")
 class BalanceController:
     """
     Controlador para rotas relacionadas a balances.
     """
     @staticmethod
-    def get_user_balance(user_id: int, db: Session = Depends(get_db)) -> BalanceOut:
+    def get_user_balance(user_id: int, response: Response = None, if_none_match: Optional[str] = None, db: Session = Depends(get_db)) -> BalanceOut:
         """
         Rota para recuperar o balance de um usuário.
+        Responde 304 quando o If-None-Match corresponde à versão atual.
         """
+        version = ResourceVersionService(db).get_version(user_id, BALANCES)
+        etag = build_etag(BALANCES, user_id, version)
+        if etag_matches(if_none_match, etag):
+            return not_modified(etag)
+
         balance_service = BalanceService(db)
-        return balance_service.get_user_balance(user_id)
+        balance = balance_service.get_user_balance(user_id)
+        if response is not None:
+            response.headers["ETag"] = etag
+        return balance
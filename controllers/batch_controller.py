@@ -0,0 +1,23 @@
+"""Controlador para a rota de batch de requisições."""
+from fastapi import Depends, Request
+from services.batch_service import BatchService
+from models.batch import BatchRequest, BatchResponse
+from models.users import User
+from sqlalchemy.orm import Session
+from config import get_db
+from utils.tracing import traced
+
+
+@traced("controller")
+class BatchController:
+    """
+    Controlador para a rota de batch de requisições.
+    """
+    @staticmethod
+    async def execute_batch(batch_request: BatchRequest, request: Request, current_user: User, db: Session = Depends(get_db)) -> BatchResponse:
+        """
+        Rota para executar várias operações em uma única chamada.
+        """
+        batch_service = BatchService(db)
+        results = await batch_service.execute(request.app, batch_request.operations, current_user, request.scope)
+        return BatchResponse(results=results)
@@ -1,12 +1,21 @@
 """Controlador para rotas relacionadas a categorias."""
+from datetime import datetime
+from typing import Optional
 from fastapi import Depends
 from fastapi.responses import Response
 from services.categories_service import CategoriesService
-from models.categories import CategoryCreate, CategoryUpdate, CategoryOut
+from services.category_tree_service import CategoryTreeService
+from services.resource_versions_service import ResourceVersionService, CATEGORIES
+from models.categories import Category, CategoryCreate, CategoryBulkCreate, CategoryUpdate, CategoryOut, CategoryTreeNode, CategoryRollup, CategoryMerge, CategoryMergeResult
 from sqlalchemy.orm import Session
-from config import get_db
+from config import get_db, settings
+from utils.etag import build_etag, etag_matches, not_modified
+from utils.fieldsets import parse_fieldset
+from utils.serialization import json_response
+from utils.tracing import traced
 
 
+@traced("controller")
 class CategoriesController:
     """
     Controlador para rotas relacionadas a categorias.
@@ -20,20 +29,68 @@ class CategoriesController:
         return categories_service.create_category(category_create, user_id)
 
     @staticmethod
-    def get_category(category_id: int, user_id: int, db: Session = Depends(get_db)) -> CategoryOut:
+    def create_categories(category_bulk_create: CategoryBulkCreate, user_id: int, db: Session = Depends(get_db)) -> list[CategoryOut]:
+        """
+        Rota para criar várias categorias de uma vez.
+        """
+        categories_service = CategoriesService(db)
+        return categories_service.create_categories(category_bulk_create.categories, user_id)
+
+    @staticmethod
+    def get_category(category_id: int, user_id: int, fields: Optional[str] = None, db: Session = Depends(get_db)) -> CategoryOut:
         """
         Rota para recuperar uma categoria pelo ID.
         """
         categories_service = CategoriesService(db)
+        fieldset = parse_fieldset(fields, Category, CategoryOut)
+        if fieldset:
+            return json_response(categories_service.get_category_json(category_id, user_id, fieldset))
         return categories_service.get_category(category_id, user_id)
 
     @staticmethod
-    def get_all_categories(user_id: int, category_type: str = None, db: Session = Depends(get_db)) -> list[CategoryOut]:
+    def get_all_categories(user_id: int, category_type: str = None, response: Response = None, if_none_match: Optional[str] = None, fields: Optional[str] = None, db: Session = Depends(get_db)) -> list[CategoryOut]:
         """
         Rota para recuperar todas as categorias do usuário.
+        Responde 304 quando o If-None-Match corresponde à versão atual.
         """
+        fieldset = parse_fieldset(fields, Category, CategoryOut)
+        version = ResourceVersionService(db).get_version(user_id, CATEGORIES)
+        etag = build_etag(CATEGORIES, user_id, version)
+        if etag_matches(if_none_match, etag):
+            return not_modified(etag)
+
         categories_service = CategoriesService(db)
-        return categories_service.get_all_categories(user_id, category_type)
+        if fieldset or settings.FAST_JSON_RESPONSES:
+            return json_response(categories_service.get_all_categories_json(user_id, category_type, fieldset), headers={"ETag": etag})
+
+        categories = categories_service.get_all_categories(user_id, category_type)
+        if response is not None:
+            response.headers["ETag"] = etag
+        return categories
+
+    @staticmethod
+    def get_category_tree(user_id: int, db: Session = Depends(get_db)) -> list[CategoryTreeNode]:
+        """
+        Rota para recuperar as categorias do usuário em árvore.
+        """
+        category_tree_service = CategoryTreeService(db)
+        return category_tree_service.get_tree(user_id)
+
+    @staticmethod
+    def rebuild_closure(db: Session = Depends(get_db)) -> dict:
+        """
+        Rota administrativa para reconstruir a closure table de todos os usuários.
+        """
+        category_tree_service = CategoryTreeService(db)
+        return {"users": category_tree_service.rebuild_all()}
+
+    @staticmethod
+    def get_category_rollup(category_id: int, user_id: int, start: Optional[datetime] = None, end: Optional[datetime] = None, db: Session = Depends(get_db)) -> CategoryRollup:
+        """
+        Rota para recuperar os totais de uma categoria somando suas subcategorias.
+        """
+        category_tree_service = CategoryTreeService(db)
+        return category_tree_service.get_rollup(category_id, user_id, start, end)
 
     @staticmethod
     def update_category(category_id: int, user_id: int, category_update: CategoryUpdate, db: Session = Depends(get_db)) -> CategoryOut:
@@ -50,4 +107,12 @@ class CategoriesController:
         """
         categories_service = CategoriesService(db)
         categories_service.delete_category(category_id, user_id)
-        return Response(status_code=204)
\ No newline at end of file
+        return Response(status_code=204)
+
+    @staticmethod
+    def merge_category(category_id: int, user_id: int, category_merge: CategoryMerge, db: Session = Depends(get_db)) -> CategoryMergeResult:
+        """
+        Rota para mesclar uma categoria em outra.
+        """
+        categories_service = CategoriesService(db)
+        return categories_service.merge_category(category_id, user_id, category_merge.target_category_id)
@@ -0,0 +1,33 @@
+"""Controlador para a rota do dashboard."""
+from datetime import datetime, timezone
+from typing import Optional
+from fastapi import Depends
+from services.dashboard_service import DashboardService, month_bounds
+from services.resource_versions_service import BALANCES, CATEGORIES, GOALS, DASHBOARD
+from models.dashboard import DashboardOut
+from sqlalchemy.orm import Session
+from config import get_db
+from utils.etag import build_etag, etag_matches, not_modified
+from utils.serialization import json_response
+from utils.tracing import traced
+
+
+@traced("controller")
+class DashboardController:
+    """
+    Controlador para a rota do dashboard.
+    """
+    @staticmethod
+    def get_dashboard(user_id: int, recent: int = 10, if_none_match: Optional[str] = None, db: Session = Depends(get_db)) -> DashboardOut:
+        """
+        Rota para recuperar o dashboard do usuário.
+        Responde 304 quando o If-None-Match corresponde às versões atuais.
+        """
+        dashboard_service = DashboardService(db)
+        versions = dashboard_service.get_versions(user_id)
+        month_start, _ = month_bounds(datetime.now(timezone.utc))
+        etag = build_etag(DASHBOARD, user_id, f"{month_start:%Y%m}.{versions[BALANCES]}.{versions[CATEGORIES]}.{versions[GOALS]}.{recent}")
+        if etag_matches(if_none_match, etag):
+            return not_modified(etag)
+
+        return json_response(dashboard_service.get_dashboard_json(user_id, recent), headers={"ETag": etag})
@@ -0,0 +1,39 @@
+"""Controlador para rotas relacionadas às regras de financiamento de metas."""
+from fastapi import Depends
+from fastapi.responses import Response
+from services.funding_rules_service import FundingRulesService
+from models.funding_rules import GoalFundingRuleCreate, GoalFundingRuleOut
+from sqlalchemy.orm import Session
+from config import get_db
+from utils.tracing import traced
+
+
+@traced("controller")
+class FundingRulesController:
+    """
+    Controlador para rotas relacionadas às regras de financiamento de metas.
+    """
+    @staticmethod
+    def create_rule(rule_create: GoalFundingRuleCreate, user_id: int, db: Session = Depends(get_db)) -> GoalFundingRuleOut:
+        """
+        Rota para criar uma nova regra.
+        """
+        funding_rules_service = FundingRulesService(db)
+        return funding_rules_service.create_rule(rule_create, user_id)
+
+    @staticmethod
+    def get_rules(user_id: int, db: Session = Depends(get_db)) -> list[GoalFundingRuleOut]:
+        """
+        Rota para recuperar as regras do usuário.
+        """
+        funding_rules_service = FundingRulesService(db)
+        return funding_rules_service.get_rules(user_id)
+
+    @staticmethod
+    def delete_rule(rule_id: int, user_id: int, db: Session = Depends(get_db)) -> Response:
+        """
+        Rota para remover uma regra.
+        """
+        funding_rules_service = FundingRulesService(db)
+        funding_rules_service.delete_rule(rule_id, user_id)
+        return Response(status_code=204)
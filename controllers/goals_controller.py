@@ -1,12 +1,19 @@
 """Controlador para rotas relacionadas a metas (goals)."""
+from typing import Optional
 from fastapi import Depends
 from fastapi.responses import Response
 from services.goals_service import GoalsService
-from models.goals import GoalCreate, GoalUpdate, GoalOut
+from services.resource_versions_service import ResourceVersionService, GOALS
+from models.goals import Goal, GoalCreate, GoalListQuery, GoalUpdate, GoalOut, GoalProgress
 from sqlalchemy.orm import Session
-from config import get_db
+from config import get_db, settings
+from utils.etag import build_etag, etag_matches, not_modified
+from utils.fieldsets import parse_fieldset
+from utils.serialization import json_response
+from utils.tracing import traced
 
 
+@traced("controller")
 class GoalsController:
     """
     Controlador para rotas relacionadas a metas.
@@ -20,20 +27,36 @@ class GoalsController:
         return goals_service.create_goal(goal_create)
 
     @staticmethod
-    def get_goal(goal_id: int, db: Session = Depends(get_db)) -> GoalOut:
+    def get_goal(goal_id: int, fields: Optional[str] = None, db: Session = Depends(get_db)) -> GoalOut:
         """
         Rota para recuperar uma meta pelo ID.
         """
         goals_service = GoalsService(db)
+        fieldset = parse_fieldset(fields, Goal, GoalOut)
+        if fieldset:
+            return json_response(goals_service.get_goal_json(goal_id, fieldset))
         return goals_service.get_goal(goal_id)
 
     @staticmethod
-    def get_user_goals(user_id: int, db: Session = Depends(get_db)) -> list[GoalOut]:
+    def get_user_goals(user_id: int, response: Response = None, if_none_match: Optional[str] = None, fields: Optional[str] = None, query: Optional[GoalListQuery] = None, db: Session = Depends(get_db)) -> list[GoalOut]:
         """
         Rota para recuperar todas as metas de um usuário.
+        Responde 304 quando o If-None-Match corresponde à versão atual.
         """
+        fieldset = parse_fieldset(fields, Goal, GoalOut)
+        version = ResourceVersionService(db).get_version(user_id, GOALS)
+        etag = build_etag(GOALS, user_id, version)
+        if etag_matches(if_none_match, etag):
+            return not_modified(etag)
+
         goals_service = GoalsService(db)
-        return goals_service.get_user_goals(user_id)
+        if fieldset or settings.FAST_JSON_RESPONSES:
+            return json_response(goals_service.get_user_goals_json(user_id, fieldset, query), headers={"ETag": etag})
+
+        goals = goals_service.get_user_goals(user_id, query)
+        if response is not None:
+            response.headers["ETag"] = etag
+        return goals
 
     @staticmethod
     def update_goal(goal_id: int, goal_update: GoalUpdate, db: Session = Depends(get_db)) -> GoalOut:
@@ -59,3 +82,11 @@ class GoalsController:
         """
         goals_service = GoalsService(db)
         return goals_service.add_amount_to_goal(goal_id, amount)
+
+    @staticmethod
+    def get_goal_progress(goal_id: int, db: Session = Depends(get_db)) -> GoalProgress:
+        """
+        Rota para recuperar a série de progresso e a projeção de uma meta.
+        """
+        goals_service = GoalsService(db)
+        return goals_service.get_goal_progress(goal_id)
@@ -1,11 +1,16 @@
+from typing import Optional
 from fastapi import Depends
 from fastapi.responses import Response
 from services.transactions_service import TransactionsService
-from models.transactions import TransactionCreate, TransactionUpdate, TransactionOut
+from models.transactions import Transaction, TransactionCreate, TransactionBulkCreate, TransactionUpdate, TransactionOut
 from sqlalchemy.orm import Session
-from config import get_db
+from config import get_db, settings
+from utils.fieldsets import parse_fieldset
+from utils.serialization import json_response
+from utils.tracing import traced
 
 
+@traced("controller")
 class TransactionsController:
     """
     Controlador para rotas relacionadas a transações.
@@ -19,19 +24,34 @@ class TransactionsController:
         return transactions_service.create_transaction(transaction_create, user_id)
 
     @staticmethod
-    def get_transaction(transaction_id: int, user_id: int, db: Session = Depends(get_db)) -> TransactionOut:
+    def create_transactions(transaction_bulk: TransactionBulkCreate, user_id: int, db: Session = Depends(get_db)) -> list[TransactionOut]:
+        """
+        Rota para importar várias transações de uma vez.
+        """
+        transactions_service = TransactionsService(db)
+        return transactions_service.create_transactions(transaction_bulk.transactions, user_id)
+
+    @staticmethod
+    def get_transaction(transaction_id: int, user_id: int, fields: Optional[str] = None, db: Session = Depends(get_db)) -> TransactionOut:
         """
         Rota para recuperar uma transação pelo ID.
         """
         transactions_service = TransactionsService(db)
+        fieldset = parse_fieldset(fields, Transaction, TransactionOut)
+        if fieldset:
+            return json_response(transactions_service.get_transaction_json(transaction_id, user_id, fieldset))
         return transactions_service.get_transaction(transaction_id, user_id)
 
     @staticmethod
-    def get_paginated_transactions(skip: int = 0, limit: int = 10, user_id: int = None, page: int = 1, db: Session = Depends(get_db)) -> dict:
+    def get_paginated_transactions(skip: int = 0, limit: int = 10, user_id: int = None, page: int = 1, fields: Optional[str] = None, db: Session = Depends(get_db)) -> dict:
         """
         Rota para recuperar uma lista paginada de transações do usuário.
         """
         transactions_service = TransactionsService(db)
+        fieldset = parse_fieldset(fields, Transaction, TransactionOut)
+        if fieldset or settings.FAST_JSON_RESPONSES:
+            return json_response(transactions_service.get_paginated_transactions_json(skip, limit, user_id, page, fieldset))
+
         return transactions_service.get_paginated_transactions(skip, limit, user_id, page)
 
     @staticmethod
@@ -1,11 +1,16 @@
-from fastapi import Depends
-from fastapi.responses import Response
+from fastapi import BackgroundTasks, Depends
+from fastapi.responses import StreamingResponse
 from services.uers_service import UserService
+from services.purge_service import PurgeService, run_purge_job
+from services.export_service import stream_account_export
+from models.purge_jobs import PurgeJobOut
 from models.users import UserCreate, UserUpdate, UserOut
 from sqlalchemy.orm import Session
 from config import get_db
+from utils.tracing import traced
 
 
+@traced("controller")
 class UserController:
     """
     Controlador para rotas relacionadas a usuários.
@@ -27,11 +32,32 @@ class UserController:
         return user_service.update_user(user_id, user_update)
 
     @staticmethod
-    def delete_user(user_id: int, db: Session = Depends(get_db)) -> Response:
+    def delete_user(user_id: int, background_tasks: BackgroundTasks, db: Session = Depends(get_db)) -> PurgeJobOut:
         """
-        Rota para deletar um usuário.
+        Rota para deletar um usuário. A remoção dos dados roda em segundo plano,
+        depois que a resposta é enviada.
         """
         user_service = UserService(db)
-        user_service.delete_user(user_id)
-        return Response(status_code=204)
-    
\ No newline at end of file
+        job = user_service.delete_user(user_id)
+        if job.status in ("pending", "failed"):
+            background_tasks.add_task(run_purge_job, db.get_bind(), job.id)
+        return job
+
+    @staticmethod
+    def get_purge_job(job_id: int, db: Session = Depends(get_db)) -> PurgeJobOut:
+        """
+        Rota para acompanhar um job de remoção de conta.
+        """
+        purge_service = PurgeService(db)
+        return purge_service.get_job(job_id)
+
+    @staticmethod
+    def export_user(user_id: int, db: Session = Depends(get_db)) -> StreamingResponse:
+        """
+        Rota para exportar todos os dados do usuário em um arquivo ZIP.
+        """
+        return StreamingResponse(
+            stream_account_export(db.get_bind(), user_id),
+            media_type="application/zip",
+            headers={"Content-Disposition": f'attachment; filename="expense-tracker-export-{user_id}.zip"'}
+        )
@@ -1,9 +1,19 @@
+from contextlib import asynccontextmanager
 from fastapi import FastAPI, Depends
+from fastapi.responses import PlainTextResponse
 from fastapi.middleware.cors import CORSMiddleware
-from api.routes import user_routes, balance_routes, categories_routes, goals_routes, transactions_routes, auth_routes
-import uvicorn
+from api.routes import user_routes, balance_routes, categories_routes, goals_routes, transactions_routes, auth_routes, admin_routes, batch_routes, dashboard_routes, funding_rules_routes
 from config import settings, Base
 from utils.permissions import verify_admin_token
+from utils.compression import CompressionMiddleware
+from utils.metrics import MetricsMiddleware, install_db_hooks, metrics
+from utils.query_budget import QueryDebugMiddleware
+from utils.slow_queries import SlowQueryMiddleware
+from utils.profiler import ProfilerMiddleware, periodic_profiler, profile_store
+from utils.memory import MemoryPeakMiddleware, memory_tracker
+from utils.tracing import TracingMiddleware, install_tracing_hooks, tracer
+from utils.access_log import AccessLogMiddleware, setup_access_log
+from services.dashboard_service import DASHBOARD_THREAD_PREFIX
 import os
 
 
@@ -19,6 +29,31 @@ if os.getenv("TESTING") != "true":
     engine = init_db()
     Base.metadata.create_all(bind=engine)
 
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Prepara o worker antes de aceitar tráfego."""
+    # Substitui um snapshot antigo com o mesmo pid (ex.: após restart do container)
+    metrics.maybe_flush(force=True)
+    if os.getenv("TESTING") != "true" and settings.DB_POOL_WARMUP > 0:
+        from config import init_db, warm_up_pool
+        warm_up_pool(init_db(), min(settings.DB_POOL_WARMUP, settings.DB_POOL_SIZE))
+    if settings.PROFILER_PERIODIC_ENABLED:
+        periodic_profiler.start()
+    if settings.TRACEMALLOC_ENABLED:
+        memory_tracker.start(settings.TRACEMALLOC_FRAMES)
+    access_log_listener = setup_access_log(settings.ACCESS_LOG_FILE) if settings.ACCESS_LOG_ENABLED else None
+    if tracer.enabled:
+        tracer.start()
+    yield
+    periodic_profiler.stop()
+    # Exporta os traces ainda na fila
+    tracer.stop()
+    if access_log_listener is not None:
+        # Escreve o que ainda estiver na fila antes de encerrar
+        access_log_listener.stop()
+
+
 app = FastAPI(
     title="Expense Tracker API",
     description="API para gerenciamento de despesas pessoais.",
@@ -28,6 +63,7 @@ app = FastAPI(
     redoc_url="/redoc" if settings.DEBUG else None,
     openapi_url="/openapi.json",
     dependencies=[Depends(verify_admin_token)] if not settings.DEBUG else [],
+    lifespan=lifespan,
 )
 
 app.add_middleware(
@@ -38,12 +74,54 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+if settings.COMPRESSION_ENABLED:
+    app.add_middleware(
+        CompressionMiddleware,
+        minimum_size=settings.COMPRESSION_MINIMUM_SIZE,
+        level=settings.COMPRESSION_LEVEL,
+    )
+
+if settings.METRICS_ENABLED or settings.DEBUG or settings.SLOW_QUERY_THRESHOLD_MS > 0 or settings.ACCESS_LOG_ENABLED:
+    install_db_hooks()
+
+if settings.SLOW_QUERY_THRESHOLD_MS > 0:
+    app.add_middleware(SlowQueryMiddleware)
+
+app.add_middleware(MemoryPeakMiddleware, tracker=memory_tracker, prefixes=tuple(settings.MEMORY_TRACKED_PREFIXES))
+app.add_middleware(
+    ProfilerMiddleware,
+    store=profile_store,
+    interval=settings.PROFILE_SAMPLE_INTERVAL_MS / 1000,
+    worker_threads=(DASHBOARD_THREAD_PREFIX,)
+)
+
+if settings.DEBUG:
+    app.add_middleware(QueryDebugMiddleware, repeat_threshold=settings.QUERY_REPEAT_THRESHOLD)
+
+if settings.ACCESS_LOG_ENABLED:
+    app.add_middleware(
+        AccessLogMiddleware,
+        sample_rate=settings.ACCESS_LOG_SAMPLE_RATE,
+        sampled_routes=set(settings.ACCESS_LOG_SAMPLED_ROUTES),
+    )
+
+install_tracing_hooks()
+app.add_middleware(TracingMiddleware, tracer=tracer)
+
+# Adicionado por último para ser o middleware mais externo e medir a requisição inteira
+if settings.METRICS_ENABLED:
+    app.add_middleware(MetricsMiddleware)
+
 app.include_router(auth_routes.router)
 app.include_router(user_routes.router)
 app.include_router(balance_routes.router)
 app.include_router(categories_routes.router)
 app.include_router(goals_routes.router)
 app.include_router(transactions_routes.router)
+app.include_router(admin_routes.router)
+app.include_router(batch_routes.router)
+app.include_router(dashboard_routes.router)
+app.include_router(funding_rules_routes.router)
 
 @app.get("/")
 async def root():
@@ -57,11 +135,18 @@ async def root():
 async def health_check(admin: bool = Depends(verify_admin_token)):
     return {"status": "healthy"}
 
+@app.get("/metrics", response_class=PlainTextResponse)
+async def get_metrics(admin: bool = Depends(verify_admin_token)):
+    """Métricas de todos os workers no formato de exposição do Prometheus."""
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4; charset=utf-8")
+
 @app.get("/config")
 async def get_config(admin: bool = Depends(verify_admin_token)):
     return settings.get_info()
 
 if __name__ == "__main__":
+    import uvicorn
+
     print("Starting Expense Tracker API...")
     print(f"Host: {settings.APP_HOST}, Port: {settings.APP_PORT}, Debug: {settings.DEBUG}")
 
@@ -70,5 +155,6 @@ if __name__ == "__main__":
         host=settings.APP_HOST,
         port=settings.APP_PORT,
         reload=settings.DEBUG,
-        log_level=settings.LOG_LEVEL
+        log_level=settings.LOG_LEVEL,
+        access_log=not settings.ACCESS_LOG_ENABLED
     )
\ No newline at end of file
@@ -1,14 +1,28 @@
 from .users import User, UserCreate, UserOut, UserUpdate
-from .categories import Category, CategoryCreate, CategoryOut, CategoryUpdate
-from .goals import Goal, GoalCreate, GoalOut, GoalUpdate
-from .transactions import Transaction, TransactionCreate, TransactionOut, TransactionUpdate
+from .categories import (
+    Category, CategoryClosure, CategoryCreate, CategoryBulkCreate, CategoryOut, CategoryUpdate,
+    CategoryTreeNode, CategoryRollup, CategoryRollupItem, CategoryMerge, CategoryMergeResult
+)
+from .goals import Goal, GoalContribution, GoalCreate, GoalListQuery, GoalOut, GoalUpdate, GoalProgress, GoalProgressPoint
+from .transactions import Transaction, TransactionCreate, TransactionBulkCreate, TransactionOut, TransactionUpdate
 from .balances import Balance, BalanceOut
+from .resource_versions import ResourceVersion
+from .dashboard import CategoryBreakdownItem, DashboardOut
+from .batch import BatchOperation, BatchRequest, BatchResult, BatchResponse
+from .funding_rules import GoalFundingRule, GoalFundingRuleCreate, GoalFundingRuleOut
+from .purge_jobs import PurgeJob, PurgeJobOut
 
 
 __all__ = [
     "User", "UserCreate", "UserOut", "UserUpdate",
-    "Category", "CategoryCreate", "CategoryOut", "CategoryUpdate",
-    "Goal", "GoalCreate", "GoalOut", "GoalUpdate",
-    "Transaction", "TransactionCreate", "TransactionOut", "TransactionUpdate", 
-    "Balance", "BalanceOut"   
+    "Category", "CategoryClosure", "CategoryCreate", "CategoryBulkCreate", "CategoryOut", "CategoryUpdate",
+    "CategoryTreeNode", "CategoryRollup", "CategoryRollupItem", "CategoryMerge", "CategoryMergeResult",
+    "Goal", "GoalContribution", "GoalCreate", "GoalListQuery", "GoalOut", "GoalUpdate", "GoalProgress", "GoalProgressPoint",
+    "Transaction", "TransactionCreate", "TransactionBulkCreate", "TransactionOut", "TransactionUpdate", 
+    "Balance", "BalanceOut",
+    "ResourceVersion",
+    "CategoryBreakdownItem", "DashboardOut",
+    "BatchOperation", "BatchRequest", "BatchResult", "BatchResponse",
+    "GoalFundingRule", "GoalFundingRuleCreate", "GoalFundingRuleOut",
+    "PurgeJob", "PurgeJobOut",
 ]
\ No newline at end of file
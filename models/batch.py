@@ -0,0 +1,32 @@
+from typing import Any, Literal, Optional
+from pydantic import BaseModel, field_validator
+
+
+class BatchOperation(BaseModel):
+    id: Optional[str] = None  # Identificador livre, devolvido no resultado
+    method: Literal["GET", "POST", "PUT", "PATCH", "DELETE"]
+    path: str  # e.g., '/categories/?category_type=expense'
+    body: Optional[Any] = None
+    headers: Optional[dict[str, str]] = None
+
+    @field_validator("path")
+    @classmethod
+    def path_must_be_relative(cls, value: str) -> str:
+        if not value.startswith("/"):
+            raise ValueError("path must start with '/'")
+        return value
+
+
+class BatchRequest(BaseModel):
+    operations: list[BatchOperation]
+
+
+class BatchResult(BaseModel):
+    id: Optional[str] = None
+    status: int
+    headers: dict[str, str] = {}
+    body: Optional[Any] = None
+
+
+class BatchResponse(BaseModel):
+    results: list[BatchResult]
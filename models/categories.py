@@ -1,16 +1,21 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 from typing import Optional
 from datetime import datetime, timezone
-from sqlalchemy import Column, Integer, String, DateTime, ForeignKey
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, UniqueConstraint
 from sqlalchemy.orm import relationship
 from config import Base
 
 
 class Category(Base):
     __tablename__ = "categories"
+    __table_args__ = (
+        # Nomes únicos por usuário (inclui categorias com soft delete)
+        UniqueConstraint("user_id", "name", name="uq_categories_user_name"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    parent_id = Column(Integer, ForeignKey("categories.id"), nullable=True, index=True)  # Categoria pai (None = raiz)
     name = Column(String(100), nullable=False)
     category_type = Column(String(50), nullable=False)  # e.g., 'income' or 'expense'
     color = Column(String(7), nullable=False)  # e.g., Hex color code
@@ -24,22 +29,52 @@ class Category(Base):
     transactions = relationship("Transaction", back_populates="category_rel")
 
 
+class CategoryClosure(Base):
+    """
+    Tabela de fechamento (closure table) da hierarquia de categorias.
+    Uma linha para cada par ancestral/descendente, incluindo o próprio nó
+    (depth 0), mantida nas escritas de categorias. Permite somar uma subárvore
+    inteira com um único join, sem consultas recursivas.
+    """
+    __tablename__ = "category_closure"
+
+    ancestor_id = Column(Integer, ForeignKey("categories.id"), primary_key=True)
+    descendant_id = Column(Integer, ForeignKey("categories.id"), primary_key=True, index=True)
+    depth = Column(Integer, nullable=False)
+
+
 class CategoryBase(BaseModel):
     name: str
     category_type: str  # e.g., 'income' or 'expense'
     color: str  # e.g., Hex color code
     icon: Optional[str] = None  # e.g., icon name or path
+    parent_id: Optional[int] = None  # Categoria pai (None = raiz)
 
 
 class CategoryCreate(CategoryBase):
     pass
 
 
+class CategoryBulkCreate(BaseModel):
+    categories: list[CategoryCreate] = Field(..., min_length=1, max_length=100)
+
+
 class CategoryUpdate(BaseModel):
     name: Optional[str] = None
     category_type: Optional[str] = None  # e.g., 'income' or 'expense'
     color: Optional[str] = None  # e.g., Hex color code
     icon: Optional[str] = None  # e.g., icon name or path
+    parent_id: Optional[int] = None  # Enviar null explicitamente move para a raiz
+
+
+class CategoryMerge(BaseModel):
+    target_category_id: int  # Categoria que recebe as transações
+
+
+class CategoryMergeResult(BaseModel):
+    source_category_id: int
+    target_category_id: int
+    moved_transactions: int
 
 
 class CategoryOut(CategoryBase):
@@ -52,4 +87,21 @@ class CategoryOut(CategoryBase):
     updated_at: Optional[datetime] = None
     deleted_at: Optional[datetime] = None
 
-    model_config = {"from_attributes": True}
\ No newline at end of file
+    model_config = {"from_attributes": True}
+
+
+class CategoryTreeNode(CategoryOut):
+    children: list["CategoryTreeNode"] = []
+
+
+class CategoryRollupItem(BaseModel):
+    category_id: int
+    name: str
+    total_income: float
+    total_expenses: float
+    transaction_count: int
+
+
+class CategoryRollup(CategoryRollupItem):
+    # Totais de cada subcategoria direta (cada um já inclui a própria subárvore)
+    children: list[CategoryRollupItem] = []
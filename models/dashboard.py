@@ -0,0 +1,23 @@
+from pydantic import BaseModel
+from typing import Optional
+from models.balances import BalanceOut
+from models.categories import CategoryOut
+from models.goals import GoalOut
+from models.transactions import TransactionOut
+
+
+class CategoryBreakdownItem(BaseModel):
+    category_id: int
+    category_name: str
+    transaction_type: str  # e.g., 'income' or 'expense'
+    total: float
+    count: int
+
+
+class DashboardOut(BaseModel):
+    balance: Optional[BalanceOut] = None  # None até a primeira transação do usuário
+    goals: list[GoalOut]
+    categories: list[CategoryOut]
+    recent_transactions: list[TransactionOut]
+    category_breakdown: list[CategoryBreakdownItem]
+    month: str  # Mês do breakdown, e.g., '2024-01'
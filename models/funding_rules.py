@@ -0,0 +1,34 @@
+from pydantic import BaseModel, Field
+from typing import Optional
+from datetime import datetime, timezone
+from sqlalchemy import Column, Integer, Float, DateTime, ForeignKey
+from config import Base
+
+
+class GoalFundingRule(Base):
+    """
+    Regra de financiamento automático: uma porcentagem de cada receita
+    (opcionalmente só das receitas de uma categoria) é somada à meta.
+    """
+    __tablename__ = "goal_funding_rules"
+
+    id = Column(Integer, primary_key=True, index=True)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False, index=True)
+    goal_id = Column(Integer, ForeignKey("goals.id"), nullable=False)
+    category_id = Column(Integer, ForeignKey("categories.id"), nullable=True)  # None = qualquer receita
+    percentage = Column(Float, nullable=False)  # e.g., 10.0 para 10%
+    created_at = Column(DateTime, default=lambda: datetime.now(timezone.utc))
+
+
+class GoalFundingRuleCreate(BaseModel):
+    goal_id: int
+    category_id: Optional[int] = None
+    percentage: float = Field(gt=0, le=100)
+
+
+class GoalFundingRuleOut(GoalFundingRuleCreate):
+    id: int
+    user_id: int
+    created_at: datetime
+
+    model_config = {"from_attributes": True}
@@ -1,13 +1,17 @@
 from pydantic import BaseModel, computed_field
-from typing import Optional
-from datetime import datetime, timezone
-from sqlalchemy import Column, Integer, Float, String, DateTime, ForeignKey
+from typing import Literal, Optional
+from datetime import date, datetime, timezone
+from sqlalchemy import Column, Computed, Integer, Float, String, DateTime, ForeignKey, Index
 from sqlalchemy.orm import relationship
 from config import Base
 
 
 class Goal(Base):
     __tablename__ = "goals"
+    __table_args__ = (
+        # Ordenação e filtro por progresso sem carregar todas as metas
+        Index("ix_goals_user_progress", "user_id", "progress"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
@@ -16,6 +20,11 @@ class Goal(Base):
     current_amount = Column(Float, default=0.0, nullable=False)
     color = Column(String(7), nullable=False)  # e.g., Hex color code
     icon = Column(String(100), nullable=True)  # e.g., icon name or
+    # Fração concluída (0 a 1), calculada pelo banco a cada escrita
+    progress = Column(Float, Computed(
+        "CASE WHEN target_amount > 0 THEN current_amount / target_amount ELSE 0 END",
+        persisted=True
+    ))
     created_at = Column(DateTime, default=lambda: datetime.now(timezone.utc))
     updated_at = Column(DateTime, default=lambda: datetime.now(timezone.utc), onupdate=lambda: datetime.now(timezone.utc))
     deleted_at = Column(DateTime, nullable=True)
@@ -24,6 +33,25 @@ class Goal(Base):
     user = relationship("User", back_populates="goals")
 
 
+class GoalContribution(Base):
+    """
+    Histórico de contribuições das metas (somente inserção).
+    Cada linha guarda o valor enviado e o saldo da meta logo após a contribuição;
+    alterações manuais de current_amount entram como ajustes (valor pode ser negativo).
+    """
+    __tablename__ = "goal_contributions"
+    __table_args__ = (
+        Index("ix_goal_contributions_goal_created", "goal_id", "created_at"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    goal_id = Column(Integer, ForeignKey("goals.id"), nullable=False)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    amount = Column(Float, nullable=False)
+    balance_after = Column(Float, nullable=False)  # current_amount após a contribuição (já limitado ao target)
+    created_at = Column(DateTime, default=lambda: datetime.now(timezone.utc), nullable=False)
+
+
 class GoalBase(BaseModel):
     user_id: int
     name: str
@@ -45,11 +73,21 @@ class GoalUpdate(BaseModel):
     icon: Optional[str] = None  # e.g., icon name or path
 
 
+class GoalListQuery(BaseModel):
+    sort_by: Optional[Literal["name", "created_at", "target_amount", "percent_complete", "remaining_amount"]] = None
+    order: Literal["asc", "desc"] = "asc"
+    min_percent_complete: Optional[float] = None  # e.g., 80 para metas quase concluídas
+    max_remaining_amount: Optional[float] = None
+    skip: int = 0
+    limit: Optional[int] = None  # None = todas
+
+
 class GoalOut(GoalBase):
     id: int
     created_at: datetime
     updated_at: Optional[datetime] = None
     deleted_at: Optional[datetime] = None
+    projected_completion_date: Optional[date] = None  # Estimativa pelo ritmo das contribuições
 
     @computed_field
     @property
@@ -58,4 +96,19 @@ class GoalOut(GoalBase):
             return 0.0
         return round((self.current_amount / self.target_amount) * 100, 2)
 
-    model_config = {"from_attributes": True}
\ No newline at end of file
+    model_config = {"from_attributes": True}
+
+
+class GoalProgressPoint(BaseModel):
+    date: date
+    contributed: float  # Soma das contribuições (e ajustes) do dia
+    balance: float  # Saldo da meta ao fim do dia
+
+
+class GoalProgress(BaseModel):
+    goal_id: int
+    target_amount: float
+    current_amount: float
+    points: list[GoalProgressPoint]
+    daily_rate: Optional[float] = None  # Inclinação da regressão (valor por dia)
+    projected_completion_date: Optional[date] = None
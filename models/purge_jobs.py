@@ -0,0 +1,37 @@
+from pydantic import BaseModel
+from typing import Optional
+from datetime import datetime, timezone
+from sqlalchemy import Column, Integer, String, DateTime
+from config import Base
+
+
+class PurgeJob(Base):
+    """
+    Remoção de conta em segundo plano. Sem FK para users: o registro
+    sobrevive à remoção do usuário para consulta do resultado.
+    """
+    __tablename__ = "purge_jobs"
+
+    id = Column(Integer, primary_key=True, index=True)
+    user_id = Column(Integer, nullable=False, index=True)
+    status = Column(String(20), default="pending", nullable=False)  # pending, running, completed ou failed
+    current_table = Column(String(50), nullable=True)  # Tabela sendo removida no momento
+    deleted_rows = Column(Integer, default=0, nullable=False)
+    error = Column(String(255), nullable=True)
+    created_at = Column(DateTime, default=lambda: datetime.now(timezone.utc))
+    updated_at = Column(DateTime, default=lambda: datetime.now(timezone.utc), onupdate=lambda: datetime.now(timezone.utc))
+    finished_at = Column(DateTime, nullable=True)
+
+
+class PurgeJobOut(BaseModel):
+    id: int
+    user_id: int
+    status: str
+    current_table: Optional[str] = None
+    deleted_rows: int
+    error: Optional[str] = None
+    created_at: datetime
+    updated_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+
+    model_config = {"from_attributes": True}
@@ -0,0 +1,17 @@
+from datetime import datetime, timezone
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey
+from config import Base
+
+
+class ResourceVersion(Base):
+    """
+    Contador de alterações por usuário e recurso (balances, categories, goals).
+    Incrementado na mesma transação de cada escrita; usado para gerar ETags
+    sem consultar as tabelas principais.
+    """
+    __tablename__ = "resource_versions"
+
+    user_id = Column(Integer, ForeignKey("users.id"), primary_key=True)
+    resource = Column(String(50), primary_key=True)
+    version = Column(Integer, default=0, nullable=False)
+    updated_at = Column(DateTime, default=lambda: datetime.now(timezone.utc), onupdate=lambda: datetime.now(timezone.utc))
@@ -1,4 +1,4 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 from typing import Optional
 from datetime import datetime, timezone
 from sqlalchemy import Column, Integer, Float, String, DateTime, ForeignKey
@@ -14,7 +14,7 @@ class Transaction(Base):
     description = Column(String(255), nullable=False)
     amount = Column(Float, nullable=False)
     transaction_type = Column(String(50), nullable=False)  # e.g., 'income' or 'expense'
-    category_id = Column(Integer, ForeignKey("categories.id"), nullable=False)
+    category_id = Column(Integer, ForeignKey("categories.id"), nullable=False, index=True)
     date = Column(DateTime, nullable=False)  # Data em que a transação realmente ocorreu
     created_at = Column(DateTime, default=lambda: datetime.now(timezone.utc))
     updated_at = Column(DateTime, default=lambda: datetime.now(timezone.utc), onupdate=lambda: datetime.now(timezone.utc))
@@ -36,6 +36,10 @@ class TransactionCreate(TransactionBase):
     pass
 
 
+class TransactionBulkCreate(BaseModel):
+    transactions: list[TransactionCreate] = Field(min_length=1, max_length=500)
+
+
 class TransactionUpdate(BaseModel):
     description: Optional[str] = None
     amount: Optional[float] = None
@@ -34,6 +34,7 @@ class UserBase(BaseModel):
 class UserCreate(UserBase):
     password: str
     confirm_password: str
+    seed_default_categories: bool = False  # Cria o conjunto padrão de categorias
 
 
 class UserUpdate(BaseModel):
@@ -1,14 +1,28 @@
 from .uers_service import UserService
 from .categories_service import CategoriesService
+from .category_tree_service import CategoryTreeService
 from .goals_service import GoalsService
 from .transactions_service import TransactionsService
 from .balances_service import BalanceService
+from .resource_versions_service import ResourceVersionService
+from .batch_service import BatchService
+from .dashboard_service import DashboardService
+from .funding_rules_service import FundingRulesService
+from .purge_service import PurgeService
+from .export_service import ExportService
 
 
 __all__ = [
     "UserService",
     "CategoriesService",
+    "CategoryTreeService",
     "GoalsService",
     "TransactionsService",
-    "BalanceService"
+    "BalanceService",
+    "ResourceVersionService",
+    "BatchService",
+    "DashboardService",
+    "FundingRulesService",
+    "PurgeService",
+    "ExportService",
 ]
\ No newline at end of file
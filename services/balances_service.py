@@ -1,9 +1,13 @@
 """Serviço para operações relacionadas a balances."""
 from models.balances import Balance, BalanceOut
+from services.resource_versions_service import ResourceVersionService, BALANCES
 from sqlalchemy.orm import Session
 from fastapi import HTTPException
+from utils.cache import response_cache
+from utils.tracing import traced
 
 
+@traced("service")
 class BalanceService:
     """
     Serviço para operações relacionadas a balances.
@@ -14,9 +18,17 @@ class BalanceService:
     def get_user_balance(self, user_id: int) -> BalanceOut:
         """
         Recupera o balance de um usuário.
+        Servido do cache até a próxima transação do usuário.
         """
+        variant = str(ResourceVersionService(self.db).get_version(user_id, BALANCES))
+        cached = response_cache.get(BALANCES, user_id, variant)
+        if cached is not None:
+            return BalanceOut.model_validate_json(cached)
+
         balance = self.db.query(Balance).filter(Balance.user_id == user_id).first()
         if not balance:
             raise HTTPException(status_code=404, detail="Balance not found for this user")
         
-        return BalanceOut.model_validate(balance)
+        balance = BalanceOut.model_validate(balance)
+        response_cache.set(BALANCES, user_id, variant, balance.model_dump_json().encode())
+        return balance
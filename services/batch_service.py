@@ -0,0 +1,146 @@
+"""Serviço que executa as operações de POST /batch dentro do próprio processo."""
+import asyncio
+import json
+from typing import Optional
+from fastapi import HTTPException
+from sqlalchemy.orm import Session
+from starlette.types import ASGIApp
+from config import settings
+from models.batch import BatchOperation, BatchResult
+from models.users import User
+from utils.tracing import traced
+
+
+# Headers da requisição principal repassados para cada operação
+FORWARDED_HEADERS = ("authorization", "x-admin-token", "accept-language")
+
+
+@traced("service")
+class BatchService:
+    """
+    Executa sub-requisições contra os routers existentes, sem passar pela rede.
+
+    Todas as operações compartilham a sessão do banco e o usuário já
+    autenticado na requisição principal. Sequências de GETs consecutivos rodam
+    concorrentemente; escritas rodam na ordem enviada e servem de barreira,
+    para que uma leitura posterior enxergue o efeito da escrita anterior.
+    """
+    def __init__(self, db: Session):
+        self.db = db
+
+    async def execute(self, app: ASGIApp, operations: list[BatchOperation], user: User, scope: dict) -> list[BatchResult]:
+        """
+        Executa as operações e retorna um resultado por operação, na mesma ordem.
+
+        Raises:
+            HTTPException: 400 se o número de operações exceder BATCH_MAX_OPERATIONS
+        """
+        if len(operations) > settings.BATCH_MAX_OPERATIONS:
+            raise HTTPException(
+                status_code=400,
+                detail=f"A batch accepts at most {settings.BATCH_MAX_OPERATIONS} operations"
+            )
+
+        results: list[Optional[BatchResult]] = [None] * len(operations)
+        pending_reads: list[int] = []
+
+        async def flush_reads():
+            if pending_reads:
+                done = await asyncio.gather(*(self._dispatch(app, operations[i], user, scope) for i in pending_reads))
+                for index, result in zip(pending_reads, done):
+                    results[index] = result
+                pending_reads.clear()
+
+        for index, operation in enumerate(operations):
+            if operation.method == "GET":
+                pending_reads.append(index)
+                continue
+            await flush_reads()
+            results[index] = await self._dispatch(app, operation, user, scope)
+            if results[index].status >= 500:
+                # Não deixa uma escrita com erro contaminar as próximas operações
+                self.db.rollback()
+        await flush_reads()
+
+        return results
+
+    async def _dispatch(self, app: ASGIApp, operation: BatchOperation, user: User, parent_scope: dict) -> BatchResult:
+        path, _, query_string = operation.path.partition("?")
+        if path.rstrip("/") == "/batch":
+            return BatchResult(id=operation.id, status=400, body={"detail": "Nested batch requests are not allowed"})
+
+        body = b"" if operation.body is None else json.dumps(operation.body).encode()
+        headers = {
+            name: value
+            for name, value in ((name.decode("latin-1"), value.decode("latin-1")) for name, value in parent_scope["headers"])
+            if name in FORWARDED_HEADERS
+        }
+        headers.update({name.lower(): value for name, value in (operation.headers or {}).items()})
+        if body:
+            headers["content-type"] = "application/json"
+            headers["content-length"] = str(len(body))
+
+        scope = {
+            "type": "http",
+            "asgi": parent_scope.get("asgi", {"version": "3.0"}),
+            "http_version": parent_scope.get("http_version", "1.1"),
+            "method": operation.method,
+            "scheme": parent_scope.get("scheme", "http"),
+            "server": parent_scope.get("server"),
+            "client": parent_scope.get("client"),
+            "root_path": parent_scope.get("root_path", ""),
+            "path": path,
+            "raw_path": path.encode(),
+            "query_string": query_string.encode(),
+            "headers": [(name.encode("latin-1"), value.encode("latin-1")) for name, value in headers.items()],
+            "state": {"batch_db": self.db, "batch_user": user},
+        }
+
+        request_sent = False
+
+        async def receive():
+            nonlocal request_sent
+            if request_sent:
+                # Sub-requisições não têm conexão real; nada mais será recebido
+                await asyncio.Event().wait()
+            request_sent = True
+            return {"type": "http.request", "body": body, "more_body": False}
+
+        status = 500
+        response_headers: dict[str, str] = {}
+        chunks: list[bytes] = []
+
+        async def send(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                response_headers.update(
+                    (name.decode("latin-1"), value.decode("latin-1")) for name, value in message.get("headers", [])
+                )
+            elif message["type"] == "http.response.body":
+                chunks.append(message.get("body", b""))
+
+        try:
+            await app(scope, receive, send)
+        except Exception:
+            # O ServerErrorMiddleware já respondeu 500; o erro não derruba o batch
+            status = 500
+
+        response_headers.pop("content-length", None)
+        return BatchResult(
+            id=operation.id,
+            status=status,
+            headers=response_headers,
+            body=self._decode_body(b"".join(chunks), response_headers.get("content-type", ""))
+        )
+
+    @staticmethod
+    def _decode_body(raw: bytes, content_type: str):
+        if not raw:
+            return None
+        if content_type.startswith("application/json"):
+            try:
+                return json.loads(raw)
+            except ValueError:
+                pass
+        return raw.decode("utf-8", errors="replace")
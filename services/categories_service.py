@@ -1,9 +1,45 @@
 """Serviço para operações relacionadas a categorias."""
-from models.categories import Category, CategoryCreate, CategoryOut, CategoryUpdate
+from datetime import datetime, timezone
+from typing import Optional
+from models.categories import Category, CategoryCreate, CategoryOut, CategoryUpdate, CategoryMergeResult
+from models.transactions import Transaction
+from services.resource_versions_service import ResourceVersionService, CATEGORIES
+from services.category_tree_service import CategoryTreeService
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
 from fastapi import HTTPException
+from pydantic import TypeAdapter
+from pydantic_core import to_json
+from config import settings
+from utils.cache import response_cache
+from utils.fieldsets import Fieldset
+from utils.serialization import columns_for
+from utils.tracing import traced
 
 
+_category_list_adapter = TypeAdapter(list[CategoryOut])
+_category_columns = columns_for(Category, CategoryOut)
+
+# Categorias criadas para novos usuários que pedem seed_default_categories
+DEFAULT_CATEGORIES = (
+    CategoryCreate(name="Salary", category_type="income", color="#4CAF50", icon="wallet"),
+    CategoryCreate(name="Investments", category_type="income", color="#009688", icon="trending-up"),
+    CategoryCreate(name="Other Income", category_type="income", color="#8BC34A", icon="plus-circle"),
+    CategoryCreate(name="Food", category_type="expense", color="#FF5722", icon="utensils"),
+    CategoryCreate(name="Groceries", category_type="expense", color="#FF9800", icon="shopping-cart"),
+    CategoryCreate(name="Housing", category_type="expense", color="#795548", icon="home"),
+    CategoryCreate(name="Transport", category_type="expense", color="#3F51B5", icon="car"),
+    CategoryCreate(name="Health", category_type="expense", color="#E91E63", icon="heart"),
+    CategoryCreate(name="Education", category_type="expense", color="#9C27B0", icon="book"),
+    CategoryCreate(name="Entertainment", category_type="expense", color="#2196F3", icon="film"),
+    CategoryCreate(name="Bills", category_type="expense", color="#607D8B", icon="file-text"),
+    CategoryCreate(name="Other Expenses", category_type="expense", color="#9E9E9E", icon="more-horizontal"),
+)
+
+DUPLICATE_NAME_DETAIL = "Category with this name already exists"
+
+
+@traced("service")
 class CategoriesService:
     """
     Serviço para operações relacionadas a categorias.
@@ -14,26 +50,63 @@ class CategoriesService:
     def create_category(self, category_create: CategoryCreate, user_id: int) -> CategoryOut:
         """
         Cria uma nova categoria no banco de dados.
+        Nomes duplicados são barrados pela constraint única (user_id, name).
         """
-        # Verifica se já existe categoria com o mesmo nome para este usuário
-        existing_category = self.db.query(Category).filter(
-            Category.name == category_create.name,
-            Category.user_id == user_id
-        ).first()
-        if existing_category:
-            raise HTTPException(status_code=400, detail="Category with this name already exists")
-        
-        new_category = Category(
-            name=category_create.name,
-            category_type=category_create.category_type,
-            color=category_create.color,
-            icon=category_create.icon,
-            user_id=user_id
-        )
-        self.db.add(new_category)
-        self.db.commit()
+        new_category = self.add_categories([category_create], user_id)[0]
+        self._commit()
         self.db.refresh(new_category)
         return CategoryOut.model_validate(new_category)
+
+    def create_categories(self, categories: list[CategoryCreate], user_id: int) -> list[CategoryOut]:
+        """
+        Cria várias categorias em uma única transação (tudo ou nada).
+        """
+        names = [category.name for category in categories]
+        if len(set(names)) != len(names):
+            raise HTTPException(status_code=400, detail="Duplicate category names in request")
+
+        # Valida antes do commit: após o flush os objetos já têm id e defaults,
+        # e depois do commit cada um seria recarregado com um SELECT
+        new_categories = _category_list_adapter.validate_python(self.add_categories(categories, user_id), from_attributes=True)
+        self._commit()
+        return new_categories
+
+    def add_categories(self, categories: list[CategoryCreate], user_id: int) -> list[Category]:
+        """
+        Adiciona categorias à sessão e as insere com um único flush (INSERT em lote),
+        junto com suas linhas na closure table.
+        Não faz commit: permite criar categorias na mesma transação de outra escrita.
+        """
+        tree = CategoryTreeService(self.db)
+        tree.validate_parents({category.parent_id for category in categories if category.parent_id is not None}, user_id)
+
+        new_categories = [
+            Category(
+                name=category.name,
+                category_type=category.category_type,
+                color=category.color,
+                icon=category.icon,
+                parent_id=category.parent_id,
+                user_id=user_id
+            )
+            for category in categories
+        ]
+        self.db.add_all(new_categories)
+        ResourceVersionService(self.db).bump(user_id, CATEGORIES)
+        try:
+            self.db.flush()
+        except IntegrityError:
+            self.db.rollback()
+            raise HTTPException(status_code=400, detail=DUPLICATE_NAME_DETAIL)
+        tree.add_nodes(new_categories)
+        return new_categories
+
+    def _commit(self) -> None:
+        try:
+            self.db.commit()
+        except IntegrityError:
+            self.db.rollback()
+            raise HTTPException(status_code=400, detail=DUPLICATE_NAME_DETAIL)
     
     def get_category(self, category_id: int, user_id: int) -> CategoryOut:
         """
@@ -48,11 +121,22 @@ class CategoriesService:
         
         return CategoryOut.model_validate(category)
     
-    def get_all_categories(self, user_id: int, category_type: str = None) -> list[CategoryOut]:
+    def get_category_json(self, category_id: int, user_id: int, fieldset: Fieldset) -> bytes:
         """
-        Recupera todas as categorias do usuário, opcionalmente filtradas por tipo.
+        Recupera uma categoria selecionando apenas as colunas do fieldset e
+        retorna o JSON reduzido.
         """
-        query = self.db.query(Category).filter(
+        row = self.db.query(*fieldset.columns).filter(
+            Category.id == category_id,
+            Category.user_id == user_id
+        ).first()
+        if not row:
+            raise HTTPException(status_code=404, detail="Category not found")
+
+        return to_json(fieldset.validate([row])[0])
+
+    def _select_categories(self, user_id: int, category_type: str = None, columns=_category_columns):
+        query = self.db.query(*columns).filter(
             Category.deleted_at.is_(None),
             Category.user_id == user_id
         )
@@ -60,8 +144,52 @@ class CategoriesService:
         if category_type:
             query = query.filter(Category.category_type == category_type)
         
-        categories = query.all()
-        return [CategoryOut.model_validate(cat) for cat in categories]
+        return query.all()
+
+    def _query_categories(self, user_id: int, category_type: str = None) -> list[CategoryOut]:
+        """
+        Consulta as categorias selecionando apenas as colunas do CategoryOut e
+        validando a lista inteira de uma vez.
+        """
+        return _category_list_adapter.validate_python(self._select_categories(user_id, category_type), from_attributes=True)
+
+    def _cache_variant(self, user_id: int, category_type: str = None, fieldset: Optional[Fieldset] = None) -> str:
+        # A versão entra na chave: leitores nunca veem dados anteriores a uma escrita
+        version = ResourceVersionService(self.db).get_version(user_id, CATEGORIES)
+        variant = f"{version}:{category_type or ''}"
+        return f"{variant}:{fieldset.cache_variant}" if fieldset else variant
+
+    def get_all_categories(self, user_id: int, category_type: str = None) -> list[CategoryOut]:
+        """
+        Recupera todas as categorias do usuário, opcionalmente filtradas por tipo.
+        Servido do cache até a próxima escrita em categorias do usuário.
+        """
+        variant = self._cache_variant(user_id, category_type)
+        cached = response_cache.get(CATEGORIES, user_id, variant)
+        if cached is not None:
+            return _category_list_adapter.validate_json(cached)
+
+        categories = self._query_categories(user_id, category_type)
+        response_cache.set(CATEGORIES, user_id, variant, _category_list_adapter.dump_json(categories))
+        return categories
+
+    def get_all_categories_json(self, user_id: int, category_type: str = None, fieldset: Optional[Fieldset] = None) -> bytes:
+        """
+        Mesmo que get_all_categories, mas retorna o JSON pronto (caminho rápido);
+        em um hit o conteúdo do cache é devolvido sem desserializar.
+        Com um fieldset, seleciona e serializa apenas os campos pedidos.
+        """
+        variant = self._cache_variant(user_id, category_type, fieldset)
+        cached = response_cache.get(CATEGORIES, user_id, variant)
+        if cached is not None:
+            return cached
+
+        if fieldset:
+            payload = fieldset.dump_json(self._select_categories(user_id, category_type, fieldset.columns))
+        else:
+            payload = _category_list_adapter.dump_json(self._query_categories(user_id, category_type))
+        response_cache.set(CATEGORIES, user_id, variant, payload)
+        return payload
     
     def update_category(self, category_id: int, user_id: int, category_update: CategoryUpdate) -> CategoryOut:
         """
@@ -75,14 +203,7 @@ class CategoriesService:
             raise HTTPException(status_code=404, detail="Category not found")
 
         if category_update.name is not None:
-            # Verifica se o novo nome já existe para este usuário
-            existing = self.db.query(Category).filter(
-                Category.name == category_update.name,
-                Category.user_id == user_id,
-                Category.id != category_id
-            ).first()
-            if existing:
-                raise HTTPException(status_code=400, detail="Category with this name already exists")
+            # Nome duplicado é barrado pela constraint única (user_id, name)
             category.name = category_update.name
         
         if category_update.category_type is not None:
@@ -94,7 +215,12 @@ class CategoriesService:
         if category_update.icon is not None:
             category.icon = category_update.icon
 
-        self.db.commit()
+        # parent_id: None enviado explicitamente move a categoria para a raiz
+        if "parent_id" in category_update.model_fields_set and category_update.parent_id != category.parent_id:
+            CategoryTreeService(self.db).move(category, category_update.parent_id)
+
+        ResourceVersionService(self.db).bump(user_id, CATEGORIES)
+        self._commit()
         self.db.refresh(category)
         return CategoryOut.model_validate(category)
     
@@ -109,9 +235,80 @@ class CategoriesService:
         if not category:
             raise HTTPException(status_code=404, detail="Category not found")
 
-        # Soft delete
-        from datetime import datetime, timezone
+        # Soft delete; as subcategorias sobem para o pai da categoria removida
+        CategoryTreeService(self.db).detach(category, category.parent_id)
         category.deleted_at = datetime.now(timezone.utc)
+        ResourceVersionService(self.db).bump(user_id, CATEGORIES)
         self.db.commit()
 
         return None
+
+    def merge_category(self, category_id: int, user_id: int, target_category_id: int) -> CategoryMergeResult:
+        """
+        Move todas as transações de uma categoria para outra e remove a de origem
+        (soft delete). Também serve para limpar categorias já removidas que
+        ainda têm transações.
+
+        As transações são movidas com UPDATEs em lotes de CATEGORY_MERGE_CHUNK_SIZE,
+        um commit por lote, para não segurar locks por muito tempo em usuários
+        com muitas transações. A versão das categorias é incrementada em cada
+        lote, então caches e ETags nunca servem um agregado desatualizado.
+        """
+        if category_id == target_category_id:
+            raise HTTPException(status_code=400, detail="Cannot merge a category into itself")
+
+        source = self.db.query(Category).filter(
+            Category.id == category_id,
+            Category.user_id == user_id
+        ).first()
+        if not source:
+            raise HTTPException(status_code=404, detail="Category not found")
+
+        target = self.db.query(Category).filter(
+            Category.id == target_category_id,
+            Category.user_id == user_id,
+            Category.deleted_at.is_(None)
+        ).first()
+        if not target:
+            raise HTTPException(status_code=404, detail="Target category not found")
+
+        if source.category_type != target.category_type:
+            raise HTTPException(status_code=400, detail="Categories must have the same type")
+
+        tree = CategoryTreeService(self.db)
+        if tree.is_descendant(source.id, target.id):
+            raise HTTPException(status_code=400, detail="Cannot merge a category into its own subcategory")
+
+        versions = ResourceVersionService(self.db)
+        chunk_size = settings.CATEGORY_MERGE_CHUNK_SIZE
+        moved = 0
+        while True:
+            ids = [row.id for row in self.db.query(Transaction.id).filter(
+                Transaction.category_id == category_id,
+                Transaction.user_id == user_id
+            ).order_by(Transaction.id).limit(chunk_size)]
+            if not ids:
+                break
+
+            moved += self.db.query(Transaction).filter(Transaction.id.in_(ids)).update({
+                Transaction.category_id: target_category_id,
+                Transaction.updated_at: datetime.now(timezone.utc)
+            }, synchronize_session=False)
+            versions.bump(user_id, CATEGORIES)
+            self.db.commit()
+
+            if len(ids) < chunk_size:
+                break
+
+        # Subcategorias passam para o destino; a origem é removida
+        tree.detach(source, target_category_id)
+        if source.deleted_at is None:
+            source.deleted_at = datetime.now(timezone.utc)
+        versions.bump(user_id, CATEGORIES)
+        self.db.commit()
+
+        return CategoryMergeResult(
+            source_category_id=category_id,
+            target_category_id=target_category_id,
+            moved_transactions=moved
+        )
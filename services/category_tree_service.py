@@ -0,0 +1,217 @@
+"""Serviço da hierarquia de categorias (closure table, árvore e rollups)."""
+from datetime import datetime
+from typing import Optional
+from models.categories import Category, CategoryClosure, CategoryTreeNode, CategoryRollup, CategoryRollupItem
+from models.transactions import Transaction
+from sqlalchemy import case, func, insert, literal, select, true
+from sqlalchemy.orm import Session, aliased, join
+from fastapi import HTTPException
+from utils.tracing import traced
+
+
+@traced("service")
+class CategoryTreeService:
+    """
+    Serviço que mantém a closure table nas escritas de categorias e responde
+    consultas sobre a hierarquia. Nenhum método faz commit (exceto
+    rebuild_all, de manutenção): as alterações entram na transação da
+    escrita da categoria.
+    """
+    def __init__(self, db: Session):
+        self.db = db
+
+    def validate_parents(self, parent_ids: set[int], user_id: int) -> None:
+        """
+        Verifica se as categorias pai existem, são do usuário e estão ativas.
+
+        Raises:
+            HTTPException: 400 se alguma categoria pai for inválida
+        """
+        if not parent_ids:
+            return
+        found = self.db.query(Category.id).filter(
+            Category.id.in_(parent_ids),
+            Category.user_id == user_id,
+            Category.deleted_at.is_(None)
+        ).count()
+        if found != len(parent_ids):
+            raise HTTPException(status_code=400, detail="Parent category not found")
+
+    def add_nodes(self, categories: list[Category]) -> None:
+        """
+        Cria as linhas da closure table para categorias recém-inseridas (já com id).
+        """
+        new_ids = [category.id for category in categories]
+        self.db.execute(insert(CategoryClosure), [
+            {"ancestor_id": category_id, "descendant_id": category_id, "depth": 0} for category_id in new_ids
+        ])
+
+        # Herda todos os ancestrais do pai com um único INSERT ... SELECT
+        parent_paths = select(
+            CategoryClosure.ancestor_id,
+            Category.id,
+            CategoryClosure.depth + 1
+        ).join(Category, Category.parent_id == CategoryClosure.descendant_id).where(Category.id.in_(new_ids))
+        self.db.execute(insert(CategoryClosure).from_select(["ancestor_id", "descendant_id", "depth"], parent_paths))
+
+    def move(self, category: Category, new_parent_id: Optional[int]) -> None:
+        """
+        Move a categoria (com toda a subárvore) para baixo de outro pai.
+
+        Raises:
+            HTTPException: 400 se o novo pai for a própria categoria ou um descendente
+        """
+        if new_parent_id is not None:
+            self.validate_parents({new_parent_id}, category.user_id)
+            if self.is_descendant(category.id, new_parent_id):
+                raise HTTPException(status_code=400, detail="Category cannot be moved under itself or its subcategories")
+
+        # A subárvore é lida antes: o MySQL não aceita um DELETE com subconsulta
+        # na própria tabela (erro 1093)
+        subtree = [row[0] for row in self.db.execute(
+            select(CategoryClosure.descendant_id).where(CategoryClosure.ancestor_id == category.id)
+        )]
+
+        # Remove os caminhos dos antigos ancestrais para a subárvore
+        self.db.query(CategoryClosure).filter(
+            CategoryClosure.descendant_id.in_(subtree),
+            CategoryClosure.ancestor_id.not_in(subtree)
+        ).delete(synchronize_session=False)
+
+        if new_parent_id is not None:
+            # Liga cada ancestral do novo pai a cada nó da subárvore
+            above = aliased(CategoryClosure)
+            below = aliased(CategoryClosure)
+            paths = select(
+                above.ancestor_id,
+                below.descendant_id,
+                above.depth + below.depth + 1
+            ).select_from(join(above, below, true())).where(
+                above.descendant_id == new_parent_id,
+                below.ancestor_id == category.id
+            )
+            self.db.execute(insert(CategoryClosure).from_select(["ancestor_id", "descendant_id", "depth"], paths))
+
+        category.parent_id = new_parent_id
+
+    def detach(self, category: Category, new_parent_id: Optional[int]) -> None:
+        """
+        Move as subcategorias ativas de uma categoria removida para outro pai
+        (o pai dela, na remoção; a categoria de destino, na mesclagem).
+        """
+        children = self.db.query(Category).filter(
+            Category.parent_id == category.id,
+            Category.deleted_at.is_(None)
+        ).all()
+        for child in children:
+            self.move(child, new_parent_id)
+
+    def is_descendant(self, ancestor_id: int, descendant_id: int) -> bool:
+        """Indica se descendant_id está na subárvore de ancestor_id (inclusive)."""
+        return self.db.query(CategoryClosure).filter(
+            CategoryClosure.ancestor_id == ancestor_id,
+            CategoryClosure.descendant_id == descendant_id
+        ).first() is not None
+
+    def rebuild(self, user_id: int) -> None:
+        """
+        Recalcula a closure table do usuário a partir de parent_id (por exemplo,
+        para categorias criadas antes da hierarquia existir).
+        """
+        ids = select(Category.id).where(Category.user_id == user_id)
+        self.db.query(CategoryClosure).filter(CategoryClosure.descendant_id.in_(ids)).delete(synchronize_session=False)
+
+        parents = dict(self.db.query(Category.id, Category.parent_id).filter(Category.user_id == user_id).all())
+        rows = []
+        for category_id in parents:
+            node, depth, seen = category_id, 0, set()
+            while node is not None and node not in seen:
+                seen.add(node)
+                rows.append({"ancestor_id": node, "descendant_id": category_id, "depth": depth})
+                node, depth = parents.get(node), depth + 1
+        if rows:
+            self.db.execute(insert(CategoryClosure), rows)
+
+    def rebuild_all(self) -> int:
+        """
+        Reconstrói a closure table de todos os usuários com categorias, com um
+        commit por usuário (bancos criados antes da hierarquia existir).
+        Retorna o número de usuários processados.
+        """
+        user_ids = [row[0] for row in self.db.query(Category.user_id).distinct().order_by(Category.user_id)]
+        for user_id in user_ids:
+            self.rebuild(user_id)
+            self.db.commit()
+        return len(user_ids)
+
+    def get_tree(self, user_id: int) -> list[CategoryTreeNode]:
+        """
+        Retorna as categorias ativas do usuário como uma árvore (uma única consulta).
+        """
+        categories = self.db.query(Category).filter(
+            Category.user_id == user_id,
+            Category.deleted_at.is_(None)
+        ).order_by(Category.name).all()
+
+        nodes = {category.id: CategoryTreeNode.model_validate(category) for category in categories}
+        roots = []
+        for node in nodes.values():
+            parent = nodes.get(node.parent_id)
+            if parent is not None:
+                parent.children.append(node)
+            else:
+                roots.append(node)
+        return roots
+
+    def get_rollup(self, category_id: int, user_id: int, start: Optional[datetime] = None, end: Optional[datetime] = None) -> CategoryRollup:
+        """
+        Soma as transações da subárvore da categoria e de cada subcategoria
+        direta com um único join na closure table.
+        """
+        category = self.db.query(Category).filter(
+            Category.id == category_id,
+            Category.user_id == user_id
+        ).first()
+        if not category:
+            raise HTTPException(status_code=404, detail="Category not found")
+
+        children = self.db.query(Category.id, Category.name).filter(
+            Category.parent_id == category_id,
+            Category.deleted_at.is_(None)
+        ).order_by(Category.name).all()
+        roots = [category_id] + [child.id for child in children]
+
+        filters = [
+            CategoryClosure.ancestor_id.in_(roots),
+            Transaction.user_id == user_id,
+            Transaction.deleted_at.is_(None)
+        ]
+        if start is not None:
+            filters.append(Transaction.date >= start)
+        if end is not None:
+            filters.append(Transaction.date < end)
+
+        totals = {
+            row.ancestor_id: row
+            for row in self.db.query(
+                CategoryClosure.ancestor_id,
+                func.sum(case((Transaction.transaction_type == "income", Transaction.amount), else_=literal(0.0))).label("total_income"),
+                func.sum(case((Transaction.transaction_type == "expense", Transaction.amount), else_=literal(0.0))).label("total_expenses"),
+                func.count(Transaction.id).label("transaction_count")
+            ).join(Transaction, Transaction.category_id == CategoryClosure.descendant_id).filter(*filters).group_by(CategoryClosure.ancestor_id)
+        }
+
+        def item(node_id: int, name: str) -> dict:
+            row = totals.get(node_id)
+            return {
+                "category_id": node_id,
+                "name": name,
+                "total_income": round(row.total_income or 0.0, 2) if row else 0.0,
+                "total_expenses": round(row.total_expenses or 0.0, 2) if row else 0.0,
+                "transaction_count": row.transaction_count if row else 0,
+            }
+
+        return CategoryRollup(
+            **item(category.id, category.name),
+            children=[CategoryRollupItem(**item(child.id, child.name)) for child in children]
+        )
@@ -0,0 +1,105 @@
+"""Serviço do dashboard: agrega balance, metas, categorias e transações em uma resposta."""
+import contextvars
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from typing import Any, Callable, Optional
+from fastapi import HTTPException
+from sqlalchemy.orm import Session, sessionmaker
+from sqlalchemy.pool import SingletonThreadPool, StaticPool
+from pydantic import TypeAdapter
+from config import settings
+from models.dashboard import DashboardOut
+from services.balances_service import BalanceService
+from services.categories_service import CategoriesService
+from services.goals_service import GoalsService
+from services.transactions_service import TransactionsService
+from services.resource_versions_service import ResourceVersionService, BALANCES, CATEGORIES, GOALS, DASHBOARD
+from utils.cache import response_cache
+from utils.tracing import traced
+
+
+_dashboard_adapter = TypeAdapter(DashboardOut)
+_executor: Optional[ThreadPoolExecutor] = None
+# Prefixo do nome das threads do pool (amostradas pelo profiler por requisição)
+DASHBOARD_THREAD_PREFIX = "dashboard"
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(max_workers=settings.DASHBOARD_MAX_WORKERS, thread_name_prefix=DASHBOARD_THREAD_PREFIX)
+    return _executor
+
+
+def month_bounds(now: datetime) -> tuple[datetime, datetime]:
+    """Retorna o início do mês de `now` e o início do mês seguinte."""
+    start = now.replace(day=1, hour=0, minute=0, second=0, microsecond=0, tzinfo=None)
+    if start.month == 12:
+        return start, start.replace(year=start.year + 1, month=1)
+    return start, start.replace(month=start.month + 1)
+
+
+@traced("service")
+class DashboardService:
+    """
+    Serviço que monta o dashboard do usuário.
+
+    As consultas independentes rodam em paralelo em um pool de threads, cada
+    uma com sua própria sessão. Engines que compartilham uma única conexão
+    (SQLite em memória) executam em sequência na sessão da requisição.
+    """
+    def __init__(self, db: Session):
+        self.db = db
+
+    def get_versions(self, user_id: int) -> dict[str, int]:
+        """Versões dos recursos que compõem o dashboard."""
+        return ResourceVersionService(self.db).get_versions(user_id, (BALANCES, CATEGORIES, GOALS))
+
+    def get_dashboard_json(self, user_id: int, recent: int = 10) -> bytes:
+        """
+        Retorna o JSON do dashboard. Servido do cache até a próxima escrita em
+        balance (transações), categorias ou metas do usuário.
+        """
+        versions = self.get_versions(user_id)
+        month_start, month_end = month_bounds(datetime.now(timezone.utc))
+        variant = f"{versions[BALANCES]}:{versions[CATEGORIES]}:{versions[GOALS]}:{recent}:{month_start:%Y-%m}"
+
+        cached = response_cache.get(DASHBOARD, user_id, variant)
+        if cached is not None:
+            return cached
+
+        parts = self._run_concurrently({
+            "balance": lambda db: self._get_balance(db, user_id),
+            "goals": lambda db: GoalsService(db).get_user_goals(user_id),
+            "categories": lambda db: CategoriesService(db).get_all_categories(user_id),
+            "recent_transactions": lambda db: TransactionsService(db).get_recent_transactions(user_id, recent),
+            "category_breakdown": lambda db: TransactionsService(db).get_category_breakdown(user_id, month_start, month_end),
+        })
+
+        payload = _dashboard_adapter.dump_json(DashboardOut(month=f"{month_start:%Y-%m}", **parts))
+        response_cache.set(DASHBOARD, user_id, variant, payload)
+        return payload
+
+    @staticmethod
+    def _get_balance(db: Session, user_id: int):
+        try:
+            return BalanceService(db).get_user_balance(user_id)
+        except HTTPException:
+            # Usuário ainda sem transações
+            return None
+
+    def _run_concurrently(self, tasks: dict[str, Callable[[Session], Any]]) -> dict[str, Any]:
+        bind = self.db.get_bind()
+        if settings.DASHBOARD_MAX_WORKERS <= 1 or isinstance(bind.pool, (StaticPool, SingletonThreadPool)):
+            return {name: task(self.db) for name, task in tasks.items()}
+
+        session_factory = sessionmaker(bind=bind, autocommit=False, autoflush=False)
+
+        def run(task):
+            with session_factory() as session:
+                return task(session)
+
+        # Uma cópia do contexto por tarefa: as consultas das threads entram nas
+        # métricas, no log de consultas lentas e no trace da requisição
+        futures = {name: _get_executor().submit(contextvars.copy_context().run, run, task) for name, task in tasks.items()}
+        return {name: future.result() for name, future in futures.items()}
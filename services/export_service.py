@@ -0,0 +1,93 @@
+"""Serviço de exportação completa dos dados da conta em um arquivo ZIP."""
+import csv
+import io
+import zipfile
+from datetime import datetime
+from typing import Iterator
+from sqlalchemy import select
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session, sessionmaker
+from config import settings
+from models.balances import Balance, BalanceOut
+from models.categories import Category, CategoryOut
+from models.funding_rules import GoalFundingRule, GoalFundingRuleOut
+from models.goals import Goal, GoalContribution, GoalOut
+from models.transactions import Transaction, TransactionOut
+from models.users import User, UserOut
+from utils.serialization import columns_for
+from utils.zipstream import ZipStream
+from utils.tracing import traced
+
+
+# Membros CSV do arquivo: nome, model e colunas exportadas
+_CSV_MEMBERS = (
+    ("categories.csv", Category, columns_for(Category, CategoryOut)),
+    ("goals.csv", Goal, columns_for(Goal, GoalOut)),
+    ("goal_contributions.csv", GoalContribution, list(GoalContribution.__table__.columns)),
+    ("funding_rules.csv", GoalFundingRule, columns_for(GoalFundingRule, GoalFundingRuleOut)),
+    ("transactions.csv", Transaction, columns_for(Transaction, TransactionOut)),
+)
+
+
+def stream_account_export(bind: Engine, user_id: int) -> Iterator[bytes]:
+    """
+    Gera o ZIP com sessão própria, que vive enquanto a resposta é enviada
+    (a sessão da requisição pode ser encerrada antes do fim do streaming).
+    """
+    session_factory = sessionmaker(bind=bind, autocommit=False, autoflush=False)
+    with session_factory() as db:
+        yield from ExportService(db).iter_zip(user_id)
+
+
+def _format(value):
+    return value.isoformat() if isinstance(value, datetime) else value
+
+
+@traced("service")
+class ExportService:
+    """
+    Serviço que exporta os dados do usuário (inclusive registros removidos
+    com soft delete) como membros JSON e CSV de um ZIP.
+
+    As linhas são lidas com cursores do lado do servidor (yield_per) em lotes
+    de EXPORT_CHUNK_SIZE e cada lote é comprimido e enviado antes do próximo:
+    a memória usada não depende do tamanho da conta.
+    """
+    def __init__(self, db: Session):
+        self.db = db
+
+    def iter_zip(self, user_id: int) -> Iterator[bytes]:
+        """
+        Gera os bytes do arquivo ZIP em pedaços.
+        """
+        stream = ZipStream()
+        with zipfile.ZipFile(stream, mode="w", compression=zipfile.ZIP_DEFLATED) as archive:
+            user = self.db.query(*columns_for(User, UserOut)).filter(User.id == user_id).first()
+            archive.writestr("user.json", UserOut.model_validate(user, from_attributes=True).model_dump_json(indent=2))
+
+            balance = self.db.query(Balance).filter(Balance.user_id == user_id).first()
+            archive.writestr("balance.json", BalanceOut.model_validate(balance).model_dump_json(indent=2) if balance else "null")
+            yield stream.drain()
+
+            for name, model, columns in _CSV_MEMBERS:
+                # force_zip64: o tamanho final do membro não é conhecido de antemão
+                with archive.open(name, mode="w", force_zip64=True) as member:
+                    member.write(self._csv_rows([[column.name for column in columns]]))
+                    result = self.db.execute(
+                        select(*columns).where(model.user_id == user_id).order_by(model.id)
+                        .execution_options(yield_per=settings.EXPORT_CHUNK_SIZE)
+                    )
+                    for partition in result.partitions():
+                        member.write(self._csv_rows(partition))
+                        yield stream.drain()
+                yield stream.drain()
+
+        # Diretório central, escrito ao fechar o arquivo
+        yield stream.drain()
+
+    @staticmethod
+    def _csv_rows(rows) -> bytes:
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        writer.writerows([_format(value) for value in row] for row in rows)
+        return buffer.getvalue().encode("utf-8")
@@ -0,0 +1,127 @@
+"""Serviço das regras de financiamento automático de metas."""
+from models.categories import Category
+from models.funding_rules import GoalFundingRule, GoalFundingRuleCreate, GoalFundingRuleOut
+from models.goals import Goal, GoalOut
+from models.transactions import Transaction
+from services.goals_service import GoalsService
+from services.resource_versions_service import ResourceVersionService, FUNDING_RULES, GOALS
+from sqlalchemy.orm import Session
+from fastapi import HTTPException
+from pydantic import TypeAdapter
+from utils.cache import response_cache
+from utils.serialization import columns_for
+from utils.tracing import traced
+
+
+_rule_list_adapter = TypeAdapter(list[GoalFundingRuleOut])
+_rule_columns = columns_for(GoalFundingRule, GoalFundingRuleOut)
+
+
+@traced("service")
+class FundingRulesService:
+    """
+    Serviço para as regras que direcionam parte das receitas para metas.
+    """
+    def __init__(self, db: Session):
+        self.db = db
+
+    def create_rule(self, rule_create: GoalFundingRuleCreate, user_id: int) -> GoalFundingRuleOut:
+        """
+        Cria uma regra para uma meta ativa do usuário.
+
+        Raises:
+            HTTPException: 404 se a meta ou a categoria não existir; 400 se a categoria não for de receita
+        """
+        goal = self.db.query(Goal.id).filter(
+            Goal.id == rule_create.goal_id,
+            Goal.user_id == user_id,
+            Goal.deleted_at.is_(None)
+        ).first()
+        if not goal:
+            raise HTTPException(status_code=404, detail="Goal not found")
+
+        if rule_create.category_id is not None:
+            category = self.db.query(Category.category_type).filter(
+                Category.id == rule_create.category_id,
+                Category.user_id == user_id,
+                Category.deleted_at.is_(None)
+            ).first()
+            if not category:
+                raise HTTPException(status_code=404, detail="Category not found")
+            if category.category_type != "income":
+                raise HTTPException(status_code=400, detail="Funding rules only apply to income categories")
+
+        rule = GoalFundingRule(user_id=user_id, **rule_create.model_dump())
+        self.db.add(rule)
+        ResourceVersionService(self.db).bump(user_id, FUNDING_RULES)
+        self.db.commit()
+        self.db.refresh(rule)
+        return GoalFundingRuleOut.model_validate(rule)
+
+    def get_rules(self, user_id: int) -> list[GoalFundingRuleOut]:
+        """
+        Recupera as regras do usuário.
+        Servido do cache até a próxima escrita nas regras do usuário, então a
+        avaliação a cada receita não consulta a tabela de regras.
+        """
+        variant = str(ResourceVersionService(self.db).get_version(user_id, FUNDING_RULES))
+        cached = response_cache.get(FUNDING_RULES, user_id, variant)
+        if cached is not None:
+            return _rule_list_adapter.validate_json(cached)
+
+        rows = self.db.query(*_rule_columns).filter(
+            GoalFundingRule.user_id == user_id
+        ).order_by(GoalFundingRule.id).all()
+        rules = _rule_list_adapter.validate_python(rows, from_attributes=True)
+        response_cache.set(FUNDING_RULES, user_id, variant, _rule_list_adapter.dump_json(rules))
+        return rules
+
+    def delete_rule(self, rule_id: int, user_id: int) -> None:
+        """
+        Remove uma regra do usuário.
+        """
+        deleted = self.db.query(GoalFundingRule).filter(
+            GoalFundingRule.id == rule_id,
+            GoalFundingRule.user_id == user_id
+        ).delete(synchronize_session=False)
+        if not deleted:
+            raise HTTPException(status_code=404, detail="Funding rule not found")
+
+        ResourceVersionService(self.db).bump(user_id, FUNDING_RULES)
+        self.db.commit()
+
+    def apply(self, transactions: list[Transaction], user_id: int) -> list[GoalOut]:
+        """
+        Avalia as regras do usuário sobre as receitas de um lote de transações.
+
+        Os valores são somados por meta em memória e cada meta recebe um único
+        UPDATE (e uma linha no histórico de contribuições) por lote, por mais
+        receitas que ele tenha. Metas removidas ou já concluídas são ignoradas.
+        Não faz commit: as contribuições entram na transação das receitas.
+        """
+        incomes = [transaction for transaction in transactions if transaction.transaction_type == "income"]
+        if not incomes:
+            return []
+        rules = self.get_rules(user_id)
+        if not rules:
+            return []
+
+        totals: dict[int, float] = {}
+        for transaction in incomes:
+            for rule in rules:
+                if rule.category_id is None or rule.category_id == transaction.category_id:
+                    totals[rule.goal_id] = totals.get(rule.goal_id, 0.0) + transaction.amount * rule.percentage / 100
+
+        goals_service = GoalsService(self.db)
+        funded = []
+        for goal_id, amount in totals.items():
+            amount = round(amount, 2)
+            if amount <= 0:
+                continue
+            goal = goals_service.contribute(goal_id, amount, open_only=True)
+            if goal is not None:
+                funded.append(goal)
+
+        if funded:
+            ResourceVersionService(self.db).bump(user_id, GOALS)
+        return funded
@@ -1,9 +1,63 @@
 """Serviço para operações relacionadas a metas (goals)."""
-from models.goals import Goal, GoalCreate, GoalOut, GoalUpdate
+import math
+import statistics
+from datetime import date, datetime, timedelta, timezone
+from typing import Optional
+from models.goals import Goal, GoalContribution, GoalCreate, GoalListQuery, GoalOut, GoalUpdate, GoalProgress, GoalProgressPoint
+from services.resource_versions_service import ResourceVersionService, GOALS
+from sqlalchemy import case, func, insert, select, update
 from sqlalchemy.orm import Session
 from fastapi import HTTPException
+from pydantic import TypeAdapter
+from pydantic_core import to_json
+from utils.cache import response_cache
+from utils.fieldsets import Fieldset
+from utils.serialization import columns_for
+from utils.tracing import traced
 
 
+_goal_list_adapter = TypeAdapter(list[GoalOut])
+_goal_columns = columns_for(Goal, GoalOut)
+
+# Expressões SQL das ordenações aceitas em GoalListQuery.sort_by
+_goal_sort_columns = {
+    "name": Goal.name,
+    "created_at": Goal.created_at,
+    "target_amount": Goal.target_amount,
+    "percent_complete": Goal.progress,
+    "remaining_amount": Goal.target_amount - Goal.current_amount,
+}
+
+# Projeções além deste horizonte são tratadas como "sem previsão"
+MAX_PROJECTION_DAYS = 365 * 50
+
+
+def project_completion(points: list[GoalProgressPoint], target_amount: float, current_amount: float) -> tuple[Optional[float], Optional[date]]:
+    """
+    Estima o ritmo diário e a data de conclusão por regressão linear (mínimos
+    quadrados) do saldo diário da meta. Retorna (ritmo, data); a data é None
+    se a meta já foi concluída, se há menos de dois dias de histórico ou se o
+    ritmo não é positivo.
+    """
+    if len(points) < 2:
+        return None, None
+
+    first_day = points[0].date
+    days = [(point.date - first_day).days for point in points]
+    balances = [point.balance for point in points]
+    slope, _ = statistics.linear_regression(days, balances)
+
+    remaining = target_amount - current_amount
+    if remaining <= 0 or slope <= 0:
+        return round(slope, 2), None
+
+    days_needed = math.ceil(remaining / slope)
+    if days_needed > MAX_PROJECTION_DAYS:
+        return round(slope, 2), None
+    return round(slope, 2), points[-1].date + timedelta(days=days_needed)
+
+
+@traced("service")
 class GoalsService:
     """
     Serviço para operações relacionadas a metas.
@@ -24,6 +78,7 @@ class GoalsService:
             icon=goal_create.icon
         )
         self.db.add(new_goal)
+        ResourceVersionService(self.db).bump(goal_create.user_id, GOALS)
         self.db.commit()
         self.db.refresh(new_goal)
         return GoalOut.model_validate(new_goal)
@@ -36,17 +91,94 @@ class GoalsService:
         if not goal:
             raise HTTPException(status_code=404, detail="Goal not found")
         
-        return GoalOut.model_validate(goal)
+        return self._with_projections([GoalOut.model_validate(goal)])[0]
+
+    def get_goal_json(self, goal_id: int, fieldset: Fieldset) -> bytes:
+        """
+        Recupera uma meta selecionando apenas as colunas do fieldset e retorna
+        o JSON reduzido. A projeção de conclusão vem do histórico: pedida no
+        fieldset, a meta é carregada inteira.
+        """
+        if fieldset.derived:
+            return to_json(fieldset.validate_models([self.get_goal(goal_id)])[0])
+
+        row = self.db.query(*fieldset.columns).filter(Goal.id == goal_id).first()
+        if not row:
+            raise HTTPException(status_code=404, detail="Goal not found")
+
+        return to_json(fieldset.validate([row])[0])
     
-    def get_user_goals(self, user_id: int) -> list[GoalOut]:
+    def get_user_goals(self, user_id: int, query: Optional[GoalListQuery] = None) -> list[GoalOut]:
+        """
+        Recupera as metas ativas de um usuário, opcionalmente filtradas,
+        ordenadas e paginadas pelo banco (ver GoalListQuery).
+        Servido do cache até a próxima escrita em metas do usuário.
+        """
+        variant = self._cache_variant(user_id, query)
+        cached = response_cache.get(GOALS, user_id, variant)
+        if cached is not None:
+            return _goal_list_adapter.validate_json(cached)
+
+        goals = self._query_user_goals(user_id, query)
+        response_cache.set(GOALS, user_id, variant, _goal_list_adapter.dump_json(goals))
+        return goals
+
+    def get_user_goals_json(self, user_id: int, fieldset: Optional[Fieldset] = None, query: Optional[GoalListQuery] = None) -> bytes:
         """
-        Recupera todas as metas de um usuário.
+        Mesmo que get_user_goals, mas retorna o JSON pronto (caminho rápido).
+        Com um fieldset, seleciona e serializa apenas os campos pedidos.
         """
-        goals = self.db.query(Goal).filter(
+        variant = self._cache_variant(user_id, query, fieldset)
+        cached = response_cache.get(GOALS, user_id, variant)
+        if cached is not None:
+            return cached
+
+        if fieldset and fieldset.derived:
+            # projected_completion_date exige as metas completas e o histórico
+            payload = to_json(fieldset.validate_models(self._query_user_goals(user_id, query)))
+        elif fieldset:
+            payload = fieldset.dump_json(self._select_user_goals(user_id, fieldset.columns, query))
+        else:
+            payload = _goal_list_adapter.dump_json(self._query_user_goals(user_id, query))
+        response_cache.set(GOALS, user_id, variant, payload)
+        return payload
+
+    def _cache_variant(self, user_id: int, query: Optional[GoalListQuery] = None, fieldset: Optional[Fieldset] = None) -> str:
+        variant = str(ResourceVersionService(self.db).get_version(user_id, GOALS))
+        if query:
+            variant = f"{variant}:" + ":".join(str(value) for value in query.model_dump().values())
+        return f"{variant}:{fieldset.cache_variant}" if fieldset else variant
+
+    def _query_user_goals(self, user_id: int, query: Optional[GoalListQuery] = None) -> list[GoalOut]:
+        """
+        Consulta as metas ativas selecionando apenas as colunas do GoalOut.
+        """
+        goals = _goal_list_adapter.validate_python(self._select_user_goals(user_id, query=query), from_attributes=True)
+        return self._with_projections(goals)
+
+    def _select_user_goals(self, user_id: int, columns=_goal_columns, query: Optional[GoalListQuery] = None):
+        statement = self.db.query(*columns).filter(
             Goal.user_id == user_id,
             Goal.deleted_at.is_(None)
-        ).all()
-        return [GoalOut.model_validate(goal) for goal in goals]
+        )
+        if query is None:
+            return statement.all()
+
+        # Filtros e ordenação usam a coluna gerada `progress` (indexada com user_id)
+        if query.min_percent_complete is not None:
+            statement = statement.filter(Goal.progress >= query.min_percent_complete / 100)
+        if query.max_remaining_amount is not None:
+            statement = statement.filter(Goal.target_amount - Goal.current_amount <= query.max_remaining_amount)
+        if query.sort_by is not None:
+            column = _goal_sort_columns[query.sort_by]
+            statement = statement.order_by(column.desc() if query.order == "desc" else column.asc(), Goal.id)
+        else:
+            statement = statement.order_by(Goal.id)
+
+        statement = statement.offset(query.skip)
+        if query.limit is not None:
+            statement = statement.limit(query.limit)
+        return statement.all()
     
     def update_goal(self, goal_id: int, goal_update: GoalUpdate) -> GoalOut:
         """
@@ -62,7 +194,14 @@ class GoalsService:
         if goal_update.target_amount is not None:
             goal.target_amount = goal_update.target_amount
         
-        if goal_update.current_amount is not None:
+        if goal_update.current_amount is not None and goal_update.current_amount != goal.current_amount:
+            # Ajuste manual entra no histórico para a série diária seguir o saldo real
+            self.db.add(GoalContribution(
+                goal_id=goal.id,
+                user_id=goal.user_id,
+                amount=goal_update.current_amount - goal.current_amount,
+                balance_after=goal_update.current_amount
+            ))
             goal.current_amount = goal_update.current_amount
         
         if goal_update.color is not None:
@@ -71,9 +210,10 @@ class GoalsService:
         if goal_update.icon is not None:
             goal.icon = goal_update.icon
 
+        ResourceVersionService(self.db).bump(goal.user_id, GOALS)
         self.db.commit()
         self.db.refresh(goal)
-        return GoalOut.model_validate(goal)
+        return self._with_projections([GoalOut.model_validate(goal)])[0]
     
     def delete_goal(self, goal_id: int) -> None:
         """
@@ -84,29 +224,132 @@ class GoalsService:
             raise HTTPException(status_code=404, detail="Goal not found")
 
         # Soft delete
-        from datetime import datetime, timezone
         goal.deleted_at = datetime.now(timezone.utc)
+        ResourceVersionService(self.db).bump(goal.user_id, GOALS)
         self.db.commit()
 
         return None
     
     def add_amount_to_goal(self, goal_id: int, amount: float) -> GoalOut:
         """
-        Adiciona um valor ao progresso da meta.
+        Adiciona um valor ao progresso da meta, sem ultrapassar o target.
+
+        A soma e o limite são feitos pelo próprio banco em um único UPDATE
+        condicional, então contribuições concorrentes não se perdem. Quando o
+        dialeto suporta UPDATE ... RETURNING, a meta atualizada volta no mesmo
+        comando; nos demais (MySQL), é lida em seguida na mesma transação.
+        Cada contribuição é registrada em goal_contributions na mesma transação.
         """
-        goal = self.db.query(Goal).filter(Goal.id == goal_id).first()
-        if not goal:
-            raise HTTPException(status_code=404, detail="Goal not found")
-        
         if amount <= 0:
+            # Meta inexistente continua sendo 404, antes da validação do valor
+            if self.db.query(Goal.id).filter(Goal.id == goal_id).first() is None:
+                raise HTTPException(status_code=404, detail="Goal not found")
             raise HTTPException(status_code=400, detail="Amount must be positive")
-        
-        goal.current_amount += amount
-        
-        # Não permite ultrapassar o target
-        if goal.current_amount > goal.target_amount:
-            goal.current_amount = goal.target_amount
-        
+
+        goal = self.contribute(goal_id, amount)
+        if goal is None:
+            self.db.rollback()
+            raise HTTPException(status_code=404, detail="Goal not found")
+
+        ResourceVersionService(self.db).bump(goal.user_id, GOALS)
         self.db.commit()
-        self.db.refresh(goal)
-        return GoalOut.model_validate(goal)
+        return self._with_projections([goal])[0]
+
+    def contribute(self, goal_id: int, amount: float, open_only: bool = False) -> Optional[GoalOut]:
+        """
+        Soma o valor à meta com um UPDATE condicional (limitado ao target) e
+        registra a contribuição no histórico. Retorna a meta atualizada, ou None
+        se ela não existe (ou, com open_only, se foi removida ou já está concluída).
+        Não faz commit nem incrementa a versão: isso fica com quem chama.
+        """
+        new_amount = Goal.current_amount + amount
+        filters = [Goal.id == goal_id]
+        if open_only:
+            filters += [Goal.deleted_at.is_(None), Goal.current_amount < Goal.target_amount]
+        statement = update(Goal).where(*filters).values(
+            current_amount=case((new_amount > Goal.target_amount, Goal.target_amount), else_=new_amount),
+            updated_at=datetime.now(timezone.utc)
+        ).execution_options(synchronize_session=False)
+
+        if self.db.get_bind().dialect.update_returning:
+            row = self.db.execute(statement.returning(*_goal_columns)).first()
+        else:
+            result = self.db.execute(statement)
+            row = self.db.query(*_goal_columns).filter(Goal.id == goal_id).first() if result.rowcount else None
+
+        if row is None:
+            return None
+
+        goal = GoalOut.model_validate(row, from_attributes=True)
+        self.db.execute(insert(GoalContribution).values(
+            goal_id=goal.id,
+            user_id=goal.user_id,
+            amount=amount,
+            balance_after=goal.current_amount
+        ))
+        return goal
+
+    def get_goal_progress(self, goal_id: int) -> GoalProgress:
+        """
+        Retorna a série diária de progresso da meta e a projeção de conclusão.
+        Servido do cache até a próxima escrita em metas do usuário.
+        """
+        goal = self.db.query(Goal.id, Goal.user_id, Goal.target_amount, Goal.current_amount).filter(Goal.id == goal_id).first()
+        if not goal:
+            raise HTTPException(status_code=404, detail="Goal not found")
+
+        variant = f"{ResourceVersionService(self.db).get_version(goal.user_id, GOALS)}:progress:{goal_id}"
+        cached = response_cache.get(GOALS, goal.user_id, variant)
+        if cached is not None:
+            return GoalProgress.model_validate_json(cached)
+
+        points = self._daily_points([goal_id]).get(goal_id, [])
+        daily_rate, projected = project_completion(points, goal.target_amount, goal.current_amount)
+        progress = GoalProgress(
+            goal_id=goal_id,
+            target_amount=goal.target_amount,
+            current_amount=goal.current_amount,
+            points=points,
+            daily_rate=daily_rate,
+            projected_completion_date=projected
+        )
+        response_cache.set(GOALS, goal.user_id, variant, progress.model_dump_json().encode())
+        return progress
+
+    def _daily_points(self, goal_ids: list[int]) -> dict[int, list[GoalProgressPoint]]:
+        """
+        Agrega as contribuições por meta e por dia em uma única consulta. O
+        saldo do dia é o balance_after da última linha do dia (maior id), já
+        que ajustes em update_goal podem reduzir o saldo.
+        """
+        if not goal_ids:
+            return {}
+        day = func.date(GoalContribution.created_at)
+        daily = select(
+            GoalContribution.goal_id,
+            day.label("day"),
+            func.sum(GoalContribution.amount).label("contributed"),
+            func.max(GoalContribution.id).label("last_id")
+        ).where(GoalContribution.goal_id.in_(goal_ids)).group_by(GoalContribution.goal_id, day).subquery()
+        rows = self.db.query(
+            daily.c.goal_id,
+            daily.c.day,
+            daily.c.contributed,
+            GoalContribution.balance_after.label("balance")
+        ).join(GoalContribution, GoalContribution.id == daily.c.last_id).order_by(daily.c.goal_id, daily.c.day)
+
+        points: dict[int, list[GoalProgressPoint]] = {}
+        for row in rows:
+            points.setdefault(row.goal_id, []).append(GoalProgressPoint(
+                date=date.fromisoformat(str(row.day)),
+                contributed=round(row.contributed, 2),
+                balance=round(row.balance, 2)
+            ))
+        return points
+
+    def _with_projections(self, goals: list[GoalOut]) -> list[GoalOut]:
+        """Preenche projected_completion_date a partir do histórico de contribuições."""
+        points = self._daily_points([goal.id for goal in goals])
+        for goal in goals:
+            _, goal.projected_completion_date = project_completion(points.get(goal.id, []), goal.target_amount, goal.current_amount)
+        return goals
@@ -0,0 +1,152 @@
+"""Serviço de remoção de contas em segundo plano, em lotes."""
+from datetime import datetime, timezone
+from typing import Optional
+from sqlalchemy import or_
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session, sessionmaker
+from fastapi import HTTPException
+from config import settings
+from models.balances import Balance
+from models.categories import Category, CategoryClosure
+from models.funding_rules import GoalFundingRule
+from models.goals import Goal, GoalContribution
+from models.purge_jobs import PurgeJob, PurgeJobOut
+from models.resource_versions import ResourceVersion
+from models.transactions import Transaction
+from models.users import User
+from services.resource_versions_service import BALANCES, CATEGORIES, GOALS, FUNDING_RULES, DASHBOARD
+from utils.cache import response_cache
+from utils.tracing import traced
+
+
+# Tabelas com id próprio removidas por user_id, das dependentes para as principais
+_USER_TABLES = (GoalContribution, GoalFundingRule, Transaction, Goal)
+
+
+def run_purge_job(bind: Engine, job_id: int) -> None:
+    """
+    Executa um job de remoção com sessão própria. Chamado via BackgroundTasks,
+    depois que a resposta 202 já foi enviada.
+    """
+    session_factory = sessionmaker(bind=bind, autocommit=False, autoflush=False)
+    with session_factory() as db:
+        PurgeService(db).run(job_id)
+
+
+@traced("service")
+class PurgeService:
+    """
+    Serviço que remove os dados de um usuário em lotes de PURGE_CHUNK_SIZE.
+
+    Cada lote é um SELECT dos ids seguido de um DELETE por chave primária, com
+    commit e atualização do progresso do job, então nenhuma transação fica
+    longa e nenhum objeto relacionado é carregado na sessão. Um job
+    interrompido pode ser executado de novo e continua de onde parou.
+    """
+    def __init__(self, db: Session):
+        self.db = db
+
+    def create_job(self, user_id: int) -> PurgeJob:
+        """
+        Registra um job pendente para o usuário. Não faz commit.
+        """
+        job = PurgeJob(user_id=user_id, status="pending", deleted_rows=0)
+        self.db.add(job)
+        return job
+
+    def get_job(self, job_id: int) -> PurgeJobOut:
+        """
+        Recupera o status de um job.
+        """
+        job = self.db.query(PurgeJob).filter(PurgeJob.id == job_id).first()
+        if not job:
+            raise HTTPException(status_code=404, detail="Purge job not found")
+        return PurgeJobOut.model_validate(job)
+
+    def get_latest_job(self, user_id: int) -> Optional[PurgeJob]:
+        """
+        Recupera o job mais recente do usuário, se houver.
+        """
+        return self.db.query(PurgeJob).filter(PurgeJob.user_id == user_id).order_by(PurgeJob.id.desc()).first()
+
+    def run(self, job_id: int) -> None:
+        """
+        Executa o job. Em caso de erro, o job fica como 'failed' com a mensagem.
+        """
+        job = self.db.query(PurgeJob).filter(PurgeJob.id == job_id).first()
+        if job is None or job.status == "completed":
+            return
+
+        job.status = "running"
+        job.error = None
+        self.db.commit()
+
+        try:
+            for model in _USER_TABLES:
+                self._purge_rows(job, model)
+            self._purge_categories(job)
+            for model in (Balance, ResourceVersion):
+                deleted = self.db.query(model).filter(model.user_id == job.user_id).delete(synchronize_session=False)
+                self._progress(job, model.__tablename__, deleted)
+            deleted = self.db.query(User).filter(User.id == job.user_id).delete(synchronize_session=False)
+            self._progress(job, User.__tablename__, deleted)
+        except Exception as exc:
+            self.db.rollback()
+            job.status = "failed"
+            job.error = str(exc)[:255]
+            job.finished_at = datetime.now(timezone.utc)
+            self.db.commit()
+            return
+
+        job.status = "completed"
+        job.current_table = None
+        job.finished_at = datetime.now(timezone.utc)
+        self.db.commit()
+
+        # O id pode ser reaproveitado por um novo usuário: não deixa cache para trás
+        for resource in (BALANCES, CATEGORIES, GOALS, FUNDING_RULES, DASHBOARD):
+            response_cache.invalidate(resource, job.user_id)
+
+    def _purge_rows(self, job: PurgeJob, model) -> None:
+        chunk_size = settings.PURGE_CHUNK_SIZE
+        while True:
+            ids = [row.id for row in self.db.query(model.id).filter(
+                model.user_id == job.user_id
+            ).order_by(model.id).limit(chunk_size)]
+            if not ids:
+                break
+
+            deleted = self.db.query(model).filter(model.id.in_(ids)).delete(synchronize_session=False)
+            self._progress(job, model.__tablename__, deleted)
+
+            if len(ids) < chunk_size:
+                break
+
+    def _purge_categories(self, job: PurgeJob) -> None:
+        # Por lote: remove os caminhos da closure table, solta as subcategorias
+        # de lotes seguintes (parent_id) e só então remove as categorias
+        chunk_size = settings.PURGE_CHUNK_SIZE
+        while True:
+            ids = [row.id for row in self.db.query(Category.id).filter(
+                Category.user_id == job.user_id
+            ).order_by(Category.id).limit(chunk_size)]
+            if not ids:
+                break
+
+            self.db.query(CategoryClosure).filter(or_(
+                CategoryClosure.ancestor_id.in_(ids),
+                CategoryClosure.descendant_id.in_(ids)
+            )).delete(synchronize_session=False)
+            self.db.query(Category).filter(Category.parent_id.in_(ids)).update(
+                {Category.parent_id: None}, synchronize_session=False
+            )
+            deleted = self.db.query(Category).filter(Category.id.in_(ids)).delete(synchronize_session=False)
+            self._progress(job, Category.__tablename__, deleted)
+
+            if len(ids) < chunk_size:
+                break
+
+    def _progress(self, job: PurgeJob, table: str, deleted: int) -> None:
+        job.current_table = table
+        job.deleted_rows += deleted
+        self.db.commit()
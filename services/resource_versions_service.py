@@ -0,0 +1,84 @@
+"""Serviço para os contadores de alteração por usuário (ETags e cache)."""
+from datetime import datetime, timezone
+from models.resource_versions import ResourceVersion
+from sqlalchemy.dialects import mysql, sqlite
+from sqlalchemy.orm import Session
+from utils.cache import response_cache
+from utils.tracing import traced
+
+
+BALANCES = "balances"
+CATEGORIES = "categories"
+GOALS = "goals"
+FUNDING_RULES = "funding_rules"
+# Agregado dos três recursos acima; invalidado junto com qualquer um deles
+DASHBOARD = "dashboard"
+
+
+@traced("service")
+class ResourceVersionService:
+    """
+    Serviço para leitura e incremento dos contadores de alteração.
+
+    As versões lidas ficam memorizadas na sessão (`Session.info`), então o
+    controller (ETag) e o service (chave de cache) fazem uma única leitura
+    por requisição.
+    """
+    def __init__(self, db: Session):
+        self.db = db
+        self._memo = db.info.setdefault("resource_versions", {})
+
+    def get_version(self, user_id: int, resource: str) -> int:
+        """
+        Retorna a versão atual de um recurso do usuário (0 se nunca alterado).
+        """
+        key = (user_id, resource)
+        if key not in self._memo:
+            version = self.db.query(ResourceVersion.version).filter(
+                ResourceVersion.user_id == user_id,
+                ResourceVersion.resource == resource
+            ).scalar()
+            self._memo[key] = version or 0
+        return self._memo[key]
+
+    def get_versions(self, user_id: int, resources: tuple[str, ...]) -> dict[str, int]:
+        """
+        Retorna as versões de vários recursos do usuário com uma única consulta.
+        """
+        missing = [resource for resource in resources if (user_id, resource) not in self._memo]
+        if missing:
+            rows = self.db.query(ResourceVersion.resource, ResourceVersion.version).filter(
+                ResourceVersion.user_id == user_id,
+                ResourceVersion.resource.in_(missing)
+            ).all()
+            found = dict(rows)
+            for resource in missing:
+                self._memo[(user_id, resource)] = found.get(resource, 0)
+        return {resource: self._memo[(user_id, resource)] for resource in resources}
+
+    def bump(self, user_id: int, resource: str) -> None:
+        """
+        Incrementa a versão de um recurso do usuário e invalida seu cache.
+        Não faz commit: deve ser chamado dentro da transação da escrita.
+
+        O incremento é um único upsert atômico (INSERT ... ON DUPLICATE KEY
+        UPDATE no MySQL, ON CONFLICT DO UPDATE no SQLite): a primeira escrita
+        concorrente de um recurso não colide na chave primária.
+        """
+        now = datetime.now(timezone.utc)
+        values = {"user_id": user_id, "resource": resource, "version": 1, "updated_at": now}
+        if self.db.get_bind().dialect.name == "mysql":
+            statement = mysql.insert(ResourceVersion).values(**values).on_duplicate_key_update(
+                version=ResourceVersion.version + 1,
+                updated_at=now
+            )
+        else:
+            statement = sqlite.insert(ResourceVersion).values(**values).on_conflict_do_update(
+                index_elements=[ResourceVersion.user_id, ResourceVersion.resource],
+                set_={"version": ResourceVersion.version + 1, "updated_at": now}
+            )
+        self.db.execute(statement)
+
+        self._memo.pop((user_id, resource), None)
+        response_cache.invalidate(resource, user_id)
+        response_cache.invalidate(DASHBOARD, user_id)
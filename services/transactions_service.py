@@ -1,11 +1,27 @@
-from models.transactions import Transaction, TransactionCreate, TransactionOut, TransactionUpdate
+from typing import Optional
+from models.transactions import Transaction, TransactionCreate, TransactionOut, TransactionUpdate, PaginatedTransactionResponse
 from models.balances import Balance
+from models.categories import Category
+from models.dashboard import CategoryBreakdownItem
+from services.funding_rules_service import FundingRulesService
+from services.resource_versions_service import ResourceVersionService, BALANCES
 from sqlalchemy.orm import Session
-from sqlalchemy import func
+from sqlalchemy import and_, case, func
 from fastapi import HTTPException
 from datetime import datetime, timezone
+from pydantic import TypeAdapter
+from pydantic_core import to_json
+from utils.fieldsets import Fieldset
+from utils.serialization import columns_for
+from utils.tracing import traced
 
 
+_transaction_list_adapter = TypeAdapter(list[TransactionOut])
+_paginated_adapter = TypeAdapter(PaginatedTransactionResponse)
+_transaction_columns = columns_for(Transaction, TransactionOut)
+
+
+@traced("service")
 class TransactionsService:
     """
     Serviço para operações relacionadas a transações.
@@ -16,8 +32,40 @@ class TransactionsService:
     def create_transaction(self, transaction_create: TransactionCreate, user_id: int) -> TransactionOut:
         """
         Cria uma nova transação no banco de dados e atualiza o balance.
+        Receitas são avaliadas pelas regras de financiamento de metas na mesma transação.
+        """
+        new_transaction = self._build_transaction(transaction_create, user_id)
+        self.db.add(new_transaction)
+        self.db.flush()
+        FundingRulesService(self.db).apply([new_transaction], user_id)
+
+        # Validado antes do commit (que expira o objeto) para não reler a linha;
+        # o balance é atualizado e commitado na mesma transação da inserção
+        created = TransactionOut.model_validate(new_transaction)
+        self._update_balance(user_id)
+        return created
+    
+    def create_transactions(self, transactions: list[TransactionCreate], user_id: int) -> list[TransactionOut]:
+        """
+        Importa várias transações de uma vez.
+
+        As regras de financiamento são avaliadas uma única vez para o lote
+        (um UPDATE por meta) e o balance é recalculado uma vez, tudo na mesma
+        transação das inserções.
         """
-        new_transaction = Transaction(
+        new_transactions = [self._build_transaction(transaction, user_id) for transaction in transactions]
+        self.db.add_all(new_transactions)
+        self.db.flush()
+        FundingRulesService(self.db).apply(new_transactions, user_id)
+
+        # Validado antes do commit, que expira os objetos
+        created = _transaction_list_adapter.validate_python(new_transactions, from_attributes=True)
+        self._update_balance(user_id)
+        return created
+
+    @staticmethod
+    def _build_transaction(transaction_create: TransactionCreate, user_id: int) -> Transaction:
+        return Transaction(
             user_id=user_id,
             description=transaction_create.description,
             amount=transaction_create.amount,
@@ -25,15 +73,7 @@ class TransactionsService:
             category_id=transaction_create.category_id,
             date=transaction_create.date
         )
-        self.db.add(new_transaction)
-        self.db.commit()
-        self.db.refresh(new_transaction)
-        
-        # Atualiza balance do usuário
-        self._update_balance(user_id)
-        
-        return TransactionOut.model_validate(new_transaction)
-    
+
     def _update_balance(self, user_id: int):
         """
         Atualiza o balance do usuário com base em todas as transações.
@@ -44,47 +84,31 @@ class TransactionsService:
             balance = Balance(user_id=user_id)
             self.db.add(balance)
         
-        # Calcula totais gerais (todas as transações)
-        total_income = self.db.query(func.sum(Transaction.amount)).filter(
-            Transaction.user_id == user_id,
-            Transaction.transaction_type == "income",
-            Transaction.deleted_at.is_(None)
-        ).scalar() or 0.0
-        
-        total_expenses = self.db.query(func.sum(Transaction.amount)).filter(
-            Transaction.user_id == user_id,
-            Transaction.transaction_type == "expense",
-            Transaction.deleted_at.is_(None)
-        ).scalar() or 0.0
-        
-        # Calcula totais do mês atual
+        # Totais gerais, do mês atual e a última transação em uma única consulta
         now = datetime.now(timezone.utc)
         month_start = now.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
-        
-        monthly_income = self.db.query(func.sum(Transaction.amount)).filter(
-            Transaction.user_id == user_id,
-            Transaction.transaction_type == "income",
-            Transaction.created_at >= month_start,
-            Transaction.deleted_at.is_(None)
-        ).scalar() or 0.0
-        
-        monthly_expenses = self.db.query(func.sum(Transaction.amount)).filter(
+        is_income = Transaction.transaction_type == "income"
+        is_expense = Transaction.transaction_type == "expense"
+        in_month = Transaction.created_at >= month_start
+        totals = self.db.query(
+            func.sum(case((is_income, Transaction.amount), else_=0.0)).label("total_income"),
+            func.sum(case((is_expense, Transaction.amount), else_=0.0)).label("total_expenses"),
+            func.sum(case((and_(is_income, in_month), Transaction.amount), else_=0.0)).label("monthly_income"),
+            func.sum(case((and_(is_expense, in_month), Transaction.amount), else_=0.0)).label("monthly_expenses"),
+            func.max(Transaction.created_at).label("last_transaction_date")
+        ).filter(
             Transaction.user_id == user_id,
-            Transaction.transaction_type == "expense",
-            Transaction.created_at >= month_start,
             Transaction.deleted_at.is_(None)
-        ).scalar() or 0.0
-        
+        ).one()
+        total_income = totals.total_income or 0.0
+        total_expenses = totals.total_expenses or 0.0
+        monthly_income = totals.monthly_income or 0.0
+        monthly_expenses = totals.monthly_expenses or 0.0
+
         # Calcula média diária de gastos do mês
         days_in_month = now.day
         daily_average_expense = monthly_expenses / days_in_month if days_in_month > 0 else 0.0
         
-        # Última transação
-        last_transaction = self.db.query(Transaction).filter(
-            Transaction.user_id == user_id,
-            Transaction.deleted_at.is_(None)
-        ).order_by(Transaction.created_at.desc()).first()
-        
         # Atualiza balance
         balance.current_balance = total_income - total_expenses
         balance.total_income = total_income
@@ -92,8 +116,9 @@ class TransactionsService:
         balance.monthly_income = monthly_income
         balance.monthly_expenses = monthly_expenses
         balance.daily_average_expense = daily_average_expense
-        balance.last_transaction_date = last_transaction.created_at if last_transaction else None
+        balance.last_transaction_date = totals.last_transaction_date
         
+        ResourceVersionService(self.db).bump(user_id, BALANCES)
         self.db.commit()
 
     
@@ -109,6 +134,20 @@ class TransactionsService:
             raise HTTPException(status_code=404, detail="Transaction not found")
         
         return TransactionOut.model_validate(transaction)
+
+    def get_transaction_json(self, transaction_id: int, user_id: int, fieldset: Fieldset) -> bytes:
+        """
+        Recupera uma transação selecionando apenas as colunas do fieldset e
+        retorna o JSON reduzido.
+        """
+        row = self.db.query(*fieldset.columns).filter(
+            Transaction.id == transaction_id,
+            Transaction.user_id == user_id
+        ).first()
+        if not row:
+            raise HTTPException(status_code=404, detail="Transaction not found")
+
+        return to_json(fieldset.validate([row])[0])
     
     def get_paginated_transactions(self, skip: int = 0, limit: int = 10, user_id: int = None, page: int = 1) -> dict:
         """
@@ -128,7 +167,66 @@ class TransactionsService:
             "page": page,
             "limit": limit
         }
+
+    def get_paginated_transactions_json(self, skip: int = 0, limit: int = 10, user_id: int = None, page: int = 1, fieldset: Optional[Fieldset] = None) -> bytes:
+        """
+        Mesmo que get_paginated_transactions, mas seleciona só as colunas do
+        TransactionOut e retorna o JSON pronto (caminho rápido).
+        Com um fieldset, seleciona e serializa apenas os campos pedidos.
+        """
+        columns = fieldset.columns if fieldset else _transaction_columns
+        query = self.db.query(*columns).filter(Transaction.user_id == user_id)
+        total = self.db.query(func.count(Transaction.id)).filter(Transaction.user_id == user_id).scalar()
+        rows = query.offset(skip).limit(limit).all()
+
+        if fieldset:
+            return to_json({
+                "items": fieldset.validate(rows),
+                "total": total,
+                "page": page,
+                "limit": limit
+            })
+
+        return _paginated_adapter.dump_json(PaginatedTransactionResponse(
+            items=_transaction_list_adapter.validate_python(rows, from_attributes=True),
+            total=total,
+            page=page,
+            limit=limit
+        ))
     
+    def get_recent_transactions(self, user_id: int, limit: int = 10) -> list[TransactionOut]:
+        """
+        Recupera as últimas transações do usuário (pela data em que ocorreram).
+        """
+        rows = self.db.query(*_transaction_columns).filter(
+            Transaction.user_id == user_id,
+            Transaction.deleted_at.is_(None)
+        ).order_by(Transaction.date.desc(), Transaction.id.desc()).limit(limit).all()
+        return _transaction_list_adapter.validate_python(rows, from_attributes=True)
+
+    def get_category_breakdown(self, user_id: int, start: datetime, end: datetime) -> list[CategoryBreakdownItem]:
+        """
+        Soma as transações do usuário por categoria e tipo no intervalo [start, end),
+        agregando no banco (uma única consulta com GROUP BY).
+        """
+        total = func.sum(Transaction.amount)
+        rows = self.db.query(
+            Transaction.category_id,
+            Category.name.label("category_name"),
+            Transaction.transaction_type,
+            total.label("total"),
+            func.count(Transaction.id).label("count")
+        ).join(Category, Category.id == Transaction.category_id).filter(
+            Transaction.user_id == user_id,
+            Transaction.deleted_at.is_(None),
+            Transaction.date >= start,
+            Transaction.date < end
+        ).group_by(
+            Transaction.category_id, Category.name, Transaction.transaction_type
+        ).order_by(total.desc()).all()
+
+        return [CategoryBreakdownItem.model_validate(row, from_attributes=True) for row in rows]
+
     def update_transaction(self, transaction_id: int, user_id: int, transaction_update: TransactionUpdate) -> TransactionOut:
         """
         Atualiza os dados de uma transação existente e recalcula o balance (apenas do usuário autenticado).
@@ -157,13 +255,13 @@ class TransactionsService:
         if transaction_update.date is not None:
             transaction.date = transaction_update.date
 
-        self.db.commit()
-        self.db.refresh(transaction)
-        
-        # Atualiza balance do usuário
+        self.db.flush()
+        updated = TransactionOut.model_validate(transaction)
+
+        # Atualiza balance do usuário (e commita junto com a alteração)
         self._update_balance(user_id)
-        
-        return TransactionOut.model_validate(transaction)
+
+        return updated
     
     def delete_transaction(self, transaction_id: int, user_id: int) -> None:
         """
@@ -179,9 +277,9 @@ class TransactionsService:
         user_id = transaction.user_id
         
         self.db.delete(transaction)
-        self.db.commit()
-        
-        # Atualiza balance do usuário
+        self.db.flush()
+
+        # Atualiza balance do usuário (e commita junto com a remoção)
         self._update_balance(user_id)
 
         return None
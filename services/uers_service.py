@@ -1,19 +1,28 @@
+from datetime import datetime, timezone
 from models.users import User, UserCreate, UserOut, UserUpdate
+from models.purge_jobs import PurgeJobOut
+from services.categories_service import CategoriesService, DEFAULT_CATEGORIES
+from services.purge_service import PurgeService
 from sqlalchemy.orm import Session
 from fastapi import HTTPException
-import bcrypt
+from utils.tracing import traced
 
 
+# bcrypt só é usado em cadastro, login e troca de senha: importado sob demanda
+# para não pesar no boot dos workers.
 def hash_password(password: str) -> str:
     """Hash a password using bcrypt."""
+    import bcrypt
     return bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt()).decode('utf-8')
 
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     """Verify a password against a hash."""
+    import bcrypt
     return bcrypt.checkpw(plain_password.encode('utf-8'), hashed_password.encode('utf-8'))
 
 
+@traced("service")
 class UserService:
     """
     Serviço para operações relacionadas a usuários.
@@ -39,6 +48,12 @@ class UserService:
             hashed_password=hash_password(user_create.password)
         )
         self.db.add(new_user)
+
+        if user_create.seed_default_categories:
+            # Mesma transação do usuário: ou ambos são criados, ou nenhum
+            self.db.flush()
+            CategoriesService(self.db).add_categories(list(DEFAULT_CATEGORIES), new_user.id)
+
         self.db.commit()
         self.db.refresh(new_user)
         return UserOut.model_validate(new_user)
@@ -64,13 +79,24 @@ class UserService:
         self.db.refresh(user)
         return UserOut.model_validate(user)
     
-    def delete_user(self, user_id: int) -> None:
+    def delete_user(self, user_id: int) -> PurgeJobOut:
         """
-        Deleta um usuário do banco de dados.
+        Marca o usuário como removido e registra um job para remover seus dados
+        em segundo plano (ver PurgeService). Chamadas repetidas retornam o job
+        já existente.
         """
         user = self.db.query(User).filter(User.id == user_id).first()
         if not user:
             raise HTTPException(status_code=404, detail="User not found")
 
-        self.db.delete(user)
-        self.db.commit()
\ No newline at end of file
+        purge_service = PurgeService(self.db)
+        if user.deleted_at is not None:
+            job = purge_service.get_latest_job(user_id)
+            if job is not None and job.status != "failed":
+                return PurgeJobOut.model_validate(job)
+
+        user.deleted_at = datetime.now(timezone.utc)
+        job = purge_service.create_job(user_id)
+        self.db.commit()
+        self.db.refresh(job)
+        return PurgeJobOut.model_validate(job)
\ No newline at end of file
@@ -1,8 +1,11 @@
 """Configuração compartilhada para todos os testes."""
 import pytest
 import os
+from collections import Counter
+from contextlib import contextmanager
+from fastapi import Request
 from fastapi.testclient import TestClient
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
 from sqlalchemy.orm import sessionmaker
 from sqlalchemy.pool import StaticPool
 
@@ -10,9 +13,10 @@ from sqlalchemy.pool import StaticPool
 os.environ["TESTING"] = "true"
 
 # Importa todos os modelos ANTES de criar o app
-from models import users, categories, goals, transactions, balances
+from models import users, categories, goals, transactions, balances, resource_versions
 from main import app
 from config import Base, get_db
+from utils.cache import response_cache
 
 # Configura banco de dados em memória para testes
 SQLALCHEMY_DATABASE_URL = "sqlite:///:memory:"
@@ -25,8 +29,13 @@ engine = create_engine(
 TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
 
-def override_get_db():
+def override_get_db(request: Request):
     """Override da dependency do banco de dados para usar banco de testes."""
+    shared = getattr(request.state, "batch_db", None)
+    if shared is not None:
+        yield shared
+        return
+
     try:
         db = TestingSessionLocal()
         yield db
@@ -43,12 +52,65 @@ client = TestClient(app)
 
 @pytest.fixture(scope="function", autouse=True)
 def setup_database():
-    """Cria e limpa o banco de dados antes de cada teste."""
+    """Cria e limpa o banco de dados (e o cache de leituras) antes de cada teste."""
     Base.metadata.create_all(bind=engine)
+    response_cache.clear()
     yield
     Base.metadata.drop_all(bind=engine)
 
 
+@pytest.fixture
+def query_log():
+    """Fixture que registra os statements SQL executados no banco de testes."""
+    statements = []
+
+    def _record(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(engine, "before_cursor_execute", _record)
+    yield statements
+    event.remove(engine, "before_cursor_execute", _record)
+
+
+@pytest.fixture
+def assert_max_queries(query_log):
+    """
+    Fixture que limita o número de statements executados em um bloco:
+
+        with assert_max_queries(6):
+            client.post("/transactions/", ...)
+
+    Em caso de falha, a mensagem lista os statements (e os repetidos, prováveis N+1).
+    """
+    @contextmanager
+    def _assert_max_queries(limit: int):
+        query_log.clear()
+        yield query_log
+        executed = list(query_log)
+        if len(executed) > limit:
+            repeated = [f"  {count}x {statement}" for statement, count in Counter(executed).most_common() if count > 1]
+            details = "\n".join(f"  {statement}" for statement in executed)
+            message = f"{len(executed)} statements executados (limite: {limit}):\n{details}"
+            if repeated:
+                message += "\nRepetidos:\n" + "\n".join(repeated)
+            pytest.fail(message)
+
+    return _assert_max_queries
+
+
+@pytest.fixture
+def file_session_factory(tmp_path):
+    """Banco SQLite em arquivo, com uma conexão por thread."""
+    engine = create_engine(
+        f"sqlite:///{tmp_path / 'file.db'}",
+        connect_args={"check_same_thread": False, "timeout": 30},
+        pool_size=16
+    )
+    Base.metadata.create_all(bind=engine)
+    yield sessionmaker(bind=engine, autoflush=False)
+    engine.dispose()
+
+
 @pytest.fixture
 def test_user():
     """Fixture para criar um usuário de teste."""
@@ -0,0 +1,94 @@
+"""Testes para o access log estruturado."""
+import json
+from logging.handlers import QueueHandler
+
+import pytest
+from fastapi import FastAPI, HTTPException
+from fastapi.testclient import TestClient
+
+from tests.conftest import client
+from utils.access_log import AccessLogMiddleware, logger, setup_access_log
+
+
+@pytest.fixture
+def access_log(tmp_path):
+    """Liga o access log em um arquivo temporário e devolve uma função que lê as linhas."""
+    path = tmp_path / "access.log"
+    listener = setup_access_log(str(path))
+
+    def read():
+        # Parar o listener esvazia a fila antes da leitura
+        if listener._thread is not None:
+            listener.stop()
+        return [json.loads(line) for line in path.read_text().splitlines()]
+
+    yield read
+    read()
+    for handler in listener.handlers:
+        handler.close()
+    for handler in list(logger.handlers):
+        logger.removeHandler(handler)
+
+
+def _sampled_app(**options) -> FastAPI:
+    app = FastAPI()
+    app.add_middleware(AccessLogMiddleware, **options)
+
+    @app.get("/busy")
+    async def busy():
+        return {"ok": True}
+
+    @app.get("/rare")
+    async def rare():
+        return {"ok": True}
+
+    @app.get("/fail")
+    async def fail():
+        raise HTTPException(status_code=404, detail="Not found")
+
+    return app
+
+
+class TestAccessLog:
+    """Testes do conteúdo do access log."""
+
+    def test_request_is_logged_as_json(self, test_user, test_category, auth_headers, access_log):
+        """Testa os campos da linha registrada para uma requisição."""
+        response = client.get("/transactions/?page=1", headers=auth_headers)
+
+        [entry] = [entry for entry in access_log() if entry["route"] == "/transactions/"]
+        assert entry["method"] == "GET"
+        assert entry["status"] == 200
+        assert entry["user_id"] == test_user["id"]
+        assert entry["bytes"] == len(response.content)
+        assert entry["db_queries"] >= 2
+        assert entry["latency_ms"] >= entry["db_time_ms"] > 0
+        assert entry["sample_rate"] == 1.0
+        assert "timestamp" in entry
+
+    def test_writes_go_through_a_queue(self, access_log):
+        """Testa que o logger só enfileira os registros."""
+        assert [type(handler) for handler in logger.handlers] == [QueueHandler]
+        assert logger.propagate is False
+
+
+class TestAccessLogSampling:
+    """Testes da amostragem das respostas 2xx."""
+
+    def test_sampled_routes_and_errors(self, access_log):
+        """Testa que só os 2xx das rotas amostradas são descartados e erros sempre entram."""
+        app_client = TestClient(_sampled_app(sample_rate=0.0, sampled_routes={"/busy"}))
+        app_client.get("/busy")
+        app_client.get("/rare")
+        app_client.get("/fail")
+
+        assert [(entry["route"], entry["status"]) for entry in access_log()] == [("/rare", 200), ("/fail", 404)]
+
+    def test_all_2xx_routes_are_sampled_by_default(self, access_log):
+        """Testa que, sem lista de rotas, a amostragem vale para todos os 2xx."""
+        app_client = TestClient(_sampled_app(sample_rate=0.0))
+        app_client.get("/busy")
+        app_client.get("/rare")
+        app_client.get("/fail")
+
+        assert [entry["route"] for entry in access_log()] == ["/fail"]
@@ -0,0 +1,92 @@
+"""Testes para o endpoint de batch de requisições."""
+from auth.login_service import LoginService
+from config import settings
+from tests.conftest import client
+
+
+class TestBatch:
+    """Testes para POST /batch."""
+
+    def test_reads_return_per_operation_results(self, test_user, test_category, auth_headers):
+        """Testa que cada operação retorna seu próprio status e corpo."""
+        response = client.post("/batch", json={"operations": [
+            {"id": "categories", "method": "GET", "path": "/categories/"},
+            {"id": "goals", "method": "GET", "path": f"/goals/user/{test_user['id']}"},
+            {"id": "missing", "method": "GET", "path": "/categories/999"},
+        ]}, headers=auth_headers)
+
+        assert response.status_code == 200
+        results = {result["id"]: result for result in response.json()["results"]}
+        assert results["categories"]["status"] == 200
+        assert results["categories"]["body"][0]["name"] == test_category["name"]
+        assert "etag" in results["categories"]["headers"]
+        assert results["goals"]["body"] == []
+        assert results["missing"]["status"] == 404
+
+    def test_authenticates_once(self, test_user, auth_headers, monkeypatch):
+        """Testa que o token é decodificado uma única vez para todo o batch."""
+        calls = []
+        original = LoginService.verify_token
+
+        def counting_verify_token(self, token):
+            calls.append(token)
+            return original(self, token)
+
+        monkeypatch.setattr(LoginService, "verify_token", counting_verify_token)
+        response = client.post("/batch", json={"operations": [
+            {"method": "GET", "path": "/categories/"},
+            {"method": "GET", "path": "/transactions/"},
+            {"method": "GET", "path": f"/goals/user/{test_user['id']}"},
+        ]}, headers=auth_headers)
+
+        assert all(result["status"] == 200 for result in response.json()["results"])
+        assert len(calls) == 1
+
+    def test_writes_are_visible_to_later_reads(self, test_category, auth_headers):
+        """Testa que uma leitura após uma escrita enxerga o novo registro."""
+        response = client.post("/batch", json={"operations": [
+            {"id": "create", "method": "POST", "path": "/transactions/", "body": {
+                "description": "Coffee",
+                "amount": 5.0,
+                "transaction_type": "expense",
+                "category_id": test_category["id"],
+                "date": "2024-01-10T12:00:00Z"
+            }},
+            {"id": "list", "method": "GET", "path": "/transactions/?fields=description"},
+        ]}, headers=auth_headers)
+
+        results = response.json()["results"]
+        assert results[0]["status"] == 201
+        assert results[1]["body"]["items"] == [{"description": "Coffee"}]
+
+    def test_failed_operation_does_not_abort_batch(self, test_category, auth_headers):
+        """Testa que erros de validação ficam restritos à operação."""
+        response = client.post("/batch", json={"operations": [
+            {"method": "POST", "path": "/categories/", "body": {"name": "Incomplete"}},
+            {"method": "GET", "path": "/categories/"},
+        ]}, headers=auth_headers)
+
+        results = response.json()["results"]
+        assert results[0]["status"] == 422
+        assert results[1]["status"] == 200
+
+    def test_nested_batch_is_rejected(self, auth_headers):
+        """Testa que um batch não pode conter outro batch."""
+        response = client.post("/batch", json={"operations": [
+            {"method": "POST", "path": "/batch", "body": {"operations": []}},
+        ]}, headers=auth_headers)
+        assert response.json()["results"][0]["status"] == 400
+
+    def test_operation_limit(self, auth_headers, monkeypatch):
+        """Testa o limite de operações por batch."""
+        monkeypatch.setattr(settings, "BATCH_MAX_OPERATIONS", 1)
+        response = client.post("/batch", json={"operations": [
+            {"method": "GET", "path": "/categories/"},
+            {"method": "GET", "path": "/categories/"},
+        ]}, headers=auth_headers)
+        assert response.status_code == 400
+
+    def test_requires_authentication(self):
+        """Testa que o batch exige autenticação."""
+        response = client.post("/batch", json={"operations": []})
+        assert response.status_code == 401
@@ -0,0 +1,222 @@
+"""Testes para o cache de leituras por usuário."""
+import fnmatch
+import socketserver
+import threading
+import time
+
+import pytest
+
+from tests.conftest import client
+from utils.cache import MemoryCacheBackend, RedisCacheBackend, ResponseCache, response_cache
+
+
+class _FakeRedisHandler(socketserver.StreamRequestHandler):
+    """Servidor mínimo que fala RESP, com os comandos usados pelo backend."""
+
+    def _read_command(self):
+        line = self.rfile.readline()
+        if not line:
+            return None
+        count = int(line[1:-2])
+        args = []
+        for _ in range(count):
+            length = int(self.rfile.readline()[1:-2])
+            args.append(self.rfile.read(length + 2)[:-2])
+        return args
+
+    def _bulk(self, value):
+        if value is None:
+            return b"$-1\r\n"
+        return b"$%d\r\n%s\r\n" % (len(value), value)
+
+    def handle(self):
+        store = self.server.store
+        while True:
+            args = self._read_command()
+            if args is None:
+                return
+            command, args = args[0].upper(), args[1:]
+            if command == b"HGET":
+                reply = self._bulk(store.get(args[0], {}).get(args[1]))
+            elif command == b"HSET":
+                store.setdefault(args[0], {})[args[1]] = args[2]
+                reply = b":1\r\n"
+            elif command == b"EXPIRE":
+                reply = b":1\r\n"
+            elif command == b"DEL":
+                removed = sum(1 for key in args if store.pop(key, None) is not None)
+                reply = b":%d\r\n" % removed
+            elif command == b"SCAN":
+                # SCAN cursor MATCH pattern COUNT n; o cursor é a última chave visitada (em hex)
+                after = b"" if args[0] == b"0" else bytes.fromhex(args[0].decode())
+                pattern, count = args[2].decode(), int(args[4])
+                remaining = sorted(key for key in store if key > after)
+                keys = remaining[:count]
+                self.server.scans += 1
+                following = keys[-1].hex().encode() if len(remaining) > count else b"0"
+                matched = [key for key in keys if fnmatch.fnmatchcase(key.decode(), pattern)]
+                reply = (b"*2\r\n" + self._bulk(following)
+                         + b"*%d\r\n" % len(matched) + b"".join(self._bulk(key) for key in matched))
+            else:
+                reply = b"-ERR unknown command\r\n"
+            self.wfile.write(reply)
+
+
+@pytest.fixture
+def fake_redis():
+    """Sobe um servidor RESP local e retorna sua URL."""
+    server = socketserver.ThreadingTCPServer(("127.0.0.1", 0), _FakeRedisHandler)
+    server.daemon_threads = True
+    server.store = {}
+    server.scans = 0
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    host, port = server.server_address
+    yield server, f"redis://{host}:{port}/0"
+    server.shutdown()
+    server.server_close()
+
+
+class TestMemoryBackend:
+    """Testes para o backend LRU em memória."""
+
+    def test_lru_eviction(self):
+        """Testa que a chave menos usada é descartada ao atingir o limite."""
+        backend = MemoryCacheBackend(max_entries=2)
+        backend.set("a", "v", b"1", ttl=60)
+        backend.set("b", "v", b"2", ttl=60)
+        backend.get("a", "v")
+        backend.set("c", "v", b"3", ttl=60)
+        assert backend.get("a", "v") == b"1"
+        assert backend.get("b", "v") is None
+        assert backend.get("c", "v") == b"3"
+
+    def test_ttl_expiration(self):
+        """Testa que entradas expiradas não são retornadas."""
+        backend = MemoryCacheBackend()
+        backend.set("a", "v", b"1", ttl=0)
+        time.sleep(0.01)
+        assert backend.get("a", "v") is None
+
+    def test_delete_removes_all_variants(self):
+        """Testa que a invalidação remove todas as variantes da chave."""
+        backend = MemoryCacheBackend()
+        backend.set("a", "v1", b"1", ttl=60)
+        backend.set("a", "v2", b"2", ttl=60)
+        backend.delete("a")
+        assert backend.get("a", "v1") is None
+        assert backend.get("a", "v2") is None
+
+
+class TestRedisBackend:
+    """Testes para o backend Redis contra um servidor RESP local."""
+
+    def test_round_trip_and_invalidation(self, fake_redis):
+        """Testa leitura, escrita e invalidação via protocolo Redis."""
+        server, url = fake_redis
+        cache = ResponseCache(RedisCacheBackend(url), ttl=60)
+
+        assert cache.get("goals", 1, "3") is None
+        cache.set("goals", 1, "3", b'[{"id": 1}]')
+        assert cache.get("goals", 1, "3") == b'[{"id": 1}]'
+        assert b"expense-tracker:goals:1" in server.store
+
+        cache.invalidate("goals", 1)
+        assert cache.get("goals", 1, "3") is None
+
+        stats = cache.stats()["resources"]["goals"]
+        assert stats["hits"] == 1
+        assert stats["misses"] == 2
+        assert stats["hit_ratio"] == 0.3333
+
+    def test_clear_scans_only_prefixed_keys(self, fake_redis, monkeypatch):
+        """Testa que clear percorre o keyspace com SCAN paginado e preserva outras chaves."""
+        server, url = fake_redis
+        server.store[b"other-app:key"] = {b"v": b"1"}
+        backend = RedisCacheBackend(url)
+        monkeypatch.setattr(backend, "SCAN_COUNT", 2)
+        for user_id in range(5):
+            backend.set(f"goals:{user_id}", "v", b"[]", ttl=60)
+
+        backend.clear()
+        assert list(server.store) == [b"other-app:key"]
+        assert server.scans >= 3
+
+    def test_unavailable_server_is_a_miss(self):
+        """Testa que falhas de conexão contam como miss e não propagam."""
+        cache = ResponseCache(RedisCacheBackend("redis://127.0.0.1:1/0", timeout=0.1), ttl=60)
+        assert cache.get("goals", 1, "0") is None
+        cache.set("goals", 1, "0", b"[]")
+        assert cache.stats()["resources"]["goals"]["errors"] == 2
+
+    def test_clear_with_unavailable_server(self):
+        """Testa que clear não propaga falhas de conexão e zera as estatísticas."""
+        cache = ResponseCache(RedisCacheBackend("redis://127.0.0.1:1/0", timeout=0.1), ttl=60)
+        cache.get("goals", 1, "0")
+        cache.clear()
+        assert cache.stats()["resources"] == {"*": {"hits": 0, "misses": 0, "errors": 1, "hit_ratio": 0.0}}
+
+
+class TestServiceCaching:
+    """Testes do cache aplicado às leituras de categorias, metas e balance."""
+
+    def test_categories_served_from_cache(self, test_category, auth_headers, query_log):
+        """Testa que a segunda listagem não consulta a tabela de categorias."""
+        first = client.get("/categories/", headers=auth_headers).json()
+
+        query_log.clear()
+        second = client.get("/categories/", headers=auth_headers).json()
+        assert second == first
+        assert not any("FROM categories" in statement for statement in query_log)
+
+    def test_write_invalidates_cache(self, test_category, auth_headers):
+        """Testa que criar uma categoria invalida a listagem em cache."""
+        assert len(client.get("/categories/", headers=auth_headers).json()) == 1
+
+        client.post("/categories/", json={
+            "name": "Salary",
+            "category_type": "income",
+            "color": "#4CAF50"
+        }, headers=auth_headers)
+
+        assert len(client.get("/categories/", headers=auth_headers).json()) == 2
+
+    def test_filters_are_cached_separately(self, test_category, auth_headers):
+        """Testa que cada filtro por tipo tem sua própria entrada."""
+        assert len(client.get("/categories/?category_type=income", headers=auth_headers).json()) == 0
+        assert len(client.get("/categories/", headers=auth_headers).json()) == 1
+
+    def test_goals_cache_invalidated_by_add_amount(self, test_user, auth_headers):
+        """Testa que adicionar valor à meta invalida a listagem em cache."""
+        goal_id = client.post("/goals/", json={
+            "user_id": test_user["id"],
+            "name": "Vacation",
+            "target_amount": 1000.0,
+            "color": "#2196F3"
+        }, headers=auth_headers).json()["id"]
+        client.get(f"/goals/user/{test_user['id']}", headers=auth_headers)
+
+        client.patch(f"/goals/{goal_id}/add-amount", json={"amount": 250.0}, headers=auth_headers)
+
+        goals = client.get(f"/goals/user/{test_user['id']}", headers=auth_headers).json()
+        assert goals[0]["current_amount"] == 250.0
+        assert goals[0]["percent_complete"] == 25.0
+
+    def test_hit_ratio_exposed(self, test_user, test_category, auth_headers, monkeypatch):
+        """Testa a exposição do hit ratio no endpoint administrativo."""
+        monkeypatch.setenv("ADMIN_TOKEN", "admin-secret")
+        client.get("/categories/", headers=auth_headers)
+        client.get("/categories/", headers=auth_headers)
+
+        response = client.get("/admin/cache", headers={"X-Admin-Token": "admin-secret"})
+        assert response.status_code == 200
+        categories = response.json()["resources"]["categories"]
+        assert categories["hits"] == 1
+        assert categories["misses"] == 1
+        assert categories["hit_ratio"] == 0.5
+
+    def test_cache_stats_require_admin_token(self, monkeypatch):
+        """Testa que as estatísticas exigem o token de admin."""
+        monkeypatch.setenv("ADMIN_TOKEN", "admin-secret")
+        response = client.get("/admin/cache", headers={"X-Admin-Token": "wrong"})
+        assert response.status_code == 403
@@ -1,5 +1,13 @@
 """Testes para rotas de categorias."""
-from tests.conftest import client
+import threading
+from datetime import datetime, timezone
+
+from config import settings
+from models.categories import CategoryClosure
+from models.users import User
+from services.category_tree_service import CategoryTreeService
+from services.resource_versions_service import CATEGORIES, ResourceVersionService
+from tests.conftest import client, TestingSessionLocal
 
 
 class TestCategoryCreation:
@@ -143,6 +151,13 @@ class TestCategoryRetrieval:
         assert len(data) == 1
         assert data[0]["category_type"] == "income"
 
+    def test_list_query_budget(self, test_category, auth_headers, assert_max_queries):
+        """Testa o número de statements da listagem, sem e com cache."""
+        with assert_max_queries(3):
+            client.get("/categories/", headers=auth_headers)
+        with assert_max_queries(2):
+            client.get("/categories/", headers=auth_headers)
+
 
 class TestCategoryUpdate:
     """Testes para atualização de categorias."""
@@ -175,6 +190,19 @@ class TestCategoryUpdate:
         assert data["name"] == "Groceries"
         assert data["color"] == "#FF9800"
 
+    def test_update_category_duplicate_name(self, test_category, auth_headers):
+        """Testa erro ao renomear para um nome já usado."""
+        other = client.post(
+            "/categories/",
+            json={"name": "Salary", "category_type": "income", "color": "#4CAF50"},
+            headers=auth_headers
+        ).json()
+
+        response = client.put(f"/categories/{other['id']}", json={"name": "Food"}, headers=auth_headers)
+        assert response.status_code == 400
+        assert response.json()["detail"] == "Category with this name already exists"
+        assert client.get(f"/categories/{other['id']}", headers=auth_headers).json()["name"] == "Salary"
+
     def test_update_category_not_found(self, auth_headers):
         """Testa erro ao atualizar categoria inexistente."""
         response = client.put(
@@ -346,3 +374,358 @@ class TestCategoryUserIsolation:
         )
         assert response2.status_code == 201
         assert response2.json()["name"] == "Food"
+
+
+class TestCategoryBulkCreation:
+    """Testes para criação de categorias em lote."""
+
+    def test_bulk_create_success(self, auth_headers, query_log):
+        """Testa criação em lote sem SELECT de verificação de nome."""
+        response = client.post("/categories/bulk", json={"categories": [
+            {"name": "Food", "category_type": "expense", "color": "#FF5722"},
+            {"name": "Transport", "category_type": "expense", "color": "#3F51B5"},
+            {"name": "Salary", "category_type": "income", "color": "#4CAF50"},
+        ]}, headers=auth_headers)
+
+        assert response.status_code == 201
+        assert [category["name"] for category in response.json()] == ["Food", "Transport", "Salary"]
+        assert not any(
+            statement.startswith("SELECT") and "FROM categories" in statement
+            for statement in query_log
+        )
+        assert len(client.get("/categories/", headers=auth_headers).json()) == 3
+
+    def test_bulk_create_is_all_or_nothing(self, test_category, auth_headers):
+        """Testa que um nome já existente cancela o lote inteiro."""
+        response = client.post("/categories/bulk", json={"categories": [
+            {"name": "Transport", "category_type": "expense", "color": "#3F51B5"},
+            {"name": "Food", "category_type": "expense", "color": "#FF5722"},
+        ]}, headers=auth_headers)
+
+        assert response.status_code == 400
+        assert response.json()["detail"] == "Category with this name already exists"
+        assert len(client.get("/categories/", headers=auth_headers).json()) == 1
+
+    def test_bulk_create_duplicate_names_in_request(self, auth_headers):
+        """Testa erro quando o próprio lote repete um nome."""
+        response = client.post("/categories/bulk", json={"categories": [
+            {"name": "Food", "category_type": "expense", "color": "#FF5722"},
+            {"name": "Food", "category_type": "expense", "color": "#FF9800"},
+        ]}, headers=auth_headers)
+        assert response.status_code == 400
+
+
+def _create_category(auth_headers, name, parent_id=None, category_type="expense"):
+    return client.post(
+        "/categories/",
+        json={"name": name, "category_type": category_type, "color": "#FF5722", "parent_id": parent_id},
+        headers=auth_headers
+    ).json()
+
+
+def _spend(auth_headers, category_id, amount, date="2024-01-10T12:00:00Z"):
+    client.post("/transactions/", json={
+        "description": "Spend",
+        "amount": amount,
+        "transaction_type": "expense",
+        "category_id": category_id,
+        "date": date
+    }, headers=auth_headers)
+
+
+class TestCategoryHierarchy:
+    """Testes para subcategorias, árvore e rollups."""
+
+    def test_tree(self, auth_headers):
+        """Testa a listagem em árvore."""
+        food = _create_category(auth_headers, "Food")
+        _create_category(auth_headers, "Restaurants", food["id"])
+        _create_category(auth_headers, "Groceries", food["id"])
+        _create_category(auth_headers, "Transport")
+
+        response = client.get("/categories/tree", headers=auth_headers)
+        assert response.status_code == 200
+        tree = {node["name"]: node for node in response.json()}
+        assert set(tree) == {"Food", "Transport"}
+        assert [child["name"] for child in tree["Food"]["children"]] == ["Groceries", "Restaurants"]
+
+    def test_rollup_includes_whole_subtree(self, auth_headers, query_log):
+        """Testa que o rollup soma todos os descendentes com uma única agregação."""
+        food = _create_category(auth_headers, "Food")
+        restaurants = _create_category(auth_headers, "Restaurants", food["id"])
+        fast_food = _create_category(auth_headers, "Fast Food", restaurants["id"])
+        groceries = _create_category(auth_headers, "Groceries", food["id"])
+        _spend(auth_headers, food["id"], 5.0)
+        _spend(auth_headers, restaurants["id"], 20.0)
+        _spend(auth_headers, fast_food["id"], 10.0)
+        _spend(auth_headers, groceries["id"], 50.0, date="2024-02-10T12:00:00Z")
+
+        query_log.clear()
+        response = client.get(f"/categories/{food['id']}/rollup", headers=auth_headers)
+        data = response.json()
+        assert data["total_expenses"] == 85.0
+        assert data["transaction_count"] == 4
+        children = {child["name"]: child for child in data["children"]}
+        assert children["Restaurants"]["total_expenses"] == 30.0
+        assert children["Groceries"]["total_expenses"] == 50.0
+        assert sum("JOIN transactions" in statement for statement in query_log) == 1
+
+        january = client.get(
+            f"/categories/{food['id']}/rollup?start=2024-01-01T00:00:00&end=2024-02-01T00:00:00",
+            headers=auth_headers
+        ).json()
+        assert january["total_expenses"] == 35.0
+
+    def test_move_subtree(self, auth_headers):
+        """Testa mover uma subárvore para outro pai."""
+        food = _create_category(auth_headers, "Food")
+        leisure = _create_category(auth_headers, "Leisure")
+        restaurants = _create_category(auth_headers, "Restaurants", food["id"])
+        fast_food = _create_category(auth_headers, "Fast Food", restaurants["id"])
+        _spend(auth_headers, fast_food["id"], 10.0)
+
+        response = client.put(f"/categories/{restaurants['id']}", json={"parent_id": leisure["id"]}, headers=auth_headers)
+        assert response.status_code == 200
+        assert response.json()["parent_id"] == leisure["id"]
+
+        assert client.get(f"/categories/{food['id']}/rollup", headers=auth_headers).json()["total_expenses"] == 0.0
+        assert client.get(f"/categories/{leisure['id']}/rollup", headers=auth_headers).json()["total_expenses"] == 10.0
+
+        client.put(f"/categories/{restaurants['id']}", json={"parent_id": None}, headers=auth_headers)
+        assert client.get(f"/categories/{leisure['id']}/rollup", headers=auth_headers).json()["total_expenses"] == 0.0
+
+    def test_move_does_not_select_from_delete_target(self, auth_headers, query_log):
+        """Testa que o DELETE da closure table não tem subconsulta na própria tabela (erro 1093 no MySQL)."""
+        food = _create_category(auth_headers, "Food")
+        leisure = _create_category(auth_headers, "Leisure")
+        restaurants = _create_category(auth_headers, "Restaurants", food["id"])
+        _create_category(auth_headers, "Fast Food", restaurants["id"])
+
+        query_log.clear()
+        client.put(f"/categories/{restaurants['id']}", json={"parent_id": leisure["id"]}, headers=auth_headers)
+        client.delete(f"/categories/{leisure['id']}", headers=auth_headers)
+
+        deletes = [statement for statement in query_log if statement.startswith("DELETE FROM category_closure")]
+        assert len(deletes) == 2
+        for statement in deletes:
+            assert "SELECT" not in statement
+
+    def test_cycles_are_rejected(self, auth_headers):
+        """Testa que uma categoria não pode ser movida para dentro da própria subárvore."""
+        food = _create_category(auth_headers, "Food")
+        restaurants = _create_category(auth_headers, "Restaurants", food["id"])
+
+        for parent_id in (food["id"], restaurants["id"]):
+            response = client.put(f"/categories/{food['id']}", json={"parent_id": parent_id}, headers=auth_headers)
+            assert response.status_code == 400
+
+    def test_invalid_parent(self, auth_headers):
+        """Testa erro com categoria pai inexistente."""
+        response = client.post(
+            "/categories/",
+            json={"name": "Orphan", "category_type": "expense", "color": "#FF5722", "parent_id": 999},
+            headers=auth_headers
+        )
+        assert response.status_code == 400
+        assert response.json()["detail"] == "Parent category not found"
+
+    def test_delete_moves_children_up(self, auth_headers):
+        """Testa que as subcategorias de uma categoria removida sobem um nível."""
+        food = _create_category(auth_headers, "Food")
+        restaurants = _create_category(auth_headers, "Restaurants", food["id"])
+        fast_food = _create_category(auth_headers, "Fast Food", restaurants["id"])
+        _spend(auth_headers, fast_food["id"], 10.0)
+
+        client.delete(f"/categories/{restaurants['id']}", headers=auth_headers)
+
+        assert client.get(f"/categories/{fast_food['id']}", headers=auth_headers).json()["parent_id"] == food["id"]
+        rollup = client.get(f"/categories/{food['id']}/rollup", headers=auth_headers).json()
+        assert rollup["total_expenses"] == 10.0
+        assert [child["name"] for child in rollup["children"]] == ["Fast Food"]
+
+    def test_rebuild_closure(self, test_user, auth_headers):
+        """Testa a reconstrução da closure table a partir de parent_id."""
+        food = _create_category(auth_headers, "Food")
+        restaurants = _create_category(auth_headers, "Restaurants", food["id"])
+        _spend(auth_headers, restaurants["id"], 10.0)
+
+        db = TestingSessionLocal()
+        try:
+            db.query(CategoryClosure).delete()
+            CategoryTreeService(db).rebuild(test_user["id"])
+            db.commit()
+            assert db.query(CategoryClosure).count() == 3
+        finally:
+            db.close()
+
+        assert client.get(f"/categories/{food['id']}/rollup", headers=auth_headers).json()["total_expenses"] == 10.0
+
+    def test_rebuild_closure_endpoint(self, auth_headers, monkeypatch):
+        """Testa a reconstrução administrativa para categorias sem linhas na closure table."""
+        monkeypatch.setenv("ADMIN_TOKEN", "admin-secret")
+        food = _create_category(auth_headers, "Food")
+        restaurants = _create_category(auth_headers, "Restaurants", food["id"])
+        _spend(auth_headers, restaurants["id"], 10.0)
+
+        db = TestingSessionLocal()
+        try:
+            db.query(CategoryClosure).delete()
+            db.commit()
+        finally:
+            db.close()
+        assert client.get(f"/categories/{food['id']}/rollup", headers=auth_headers).json()["total_expenses"] == 0.0
+
+        assert client.post("/admin/categories/rebuild-closure", headers={"X-Admin-Token": "wrong"}).status_code == 403
+        response = client.post("/admin/categories/rebuild-closure", headers={"X-Admin-Token": "admin-secret"})
+        assert response.status_code == 200
+        assert response.json() == {"users": 1}
+        assert client.get(f"/categories/{food['id']}/rollup", headers=auth_headers).json()["total_expenses"] == 10.0
+
+
+class TestCategoryMerge:
+    """Testes para mesclagem de categorias."""
+
+    def test_merge_moves_transactions(self, auth_headers, monkeypatch):
+        """Testa que todas as transações são movidas, em lotes."""
+        monkeypatch.setattr(settings, "CATEGORY_MERGE_CHUNK_SIZE", 2)
+        food = _create_category(auth_headers, "Food")
+        meals = _create_category(auth_headers, "Meals")
+        snacks = _create_category(auth_headers, "Snacks", meals["id"])
+        for amount in (1.0, 2.0, 3.0, 4.0, 5.0):
+            _spend(auth_headers, meals["id"], amount)
+
+        response = client.post(f"/categories/{meals['id']}/merge", json={"target_category_id": food["id"]}, headers=auth_headers)
+        assert response.status_code == 200
+        assert response.json() == {
+            "source_category_id": meals["id"],
+            "target_category_id": food["id"],
+            "moved_transactions": 5
+        }
+
+        assert client.get(f"/categories/{meals['id']}", headers=auth_headers).json()["deleted_at"] is not None
+        assert client.get(f"/categories/{snacks['id']}", headers=auth_headers).json()["parent_id"] == food["id"]
+        assert client.get(f"/categories/{food['id']}/rollup", headers=auth_headers).json()["total_expenses"] == 15.0
+
+    def test_merge_deleted_category(self, auth_headers):
+        """Testa reatribuir transações de uma categoria já removida."""
+        food = _create_category(auth_headers, "Food")
+        old = _create_category(auth_headers, "Old")
+        _spend(auth_headers, old["id"], 7.0)
+        client.delete(f"/categories/{old['id']}", headers=auth_headers)
+
+        response = client.post(f"/categories/{old['id']}/merge", json={"target_category_id": food["id"]}, headers=auth_headers)
+        assert response.json()["moved_transactions"] == 1
+
+    def test_merge_invalidates_cached_dashboard(self, auth_headers):
+        """Testa que o resumo por categoria em cache é invalidado."""
+        food = _create_category(auth_headers, "Food")
+        meals = _create_category(auth_headers, "Meals")
+        client.post("/transactions/", json={
+            "description": "Lunch",
+            "amount": 10.0,
+            "transaction_type": "expense",
+            "category_id": meals["id"],
+            "date": datetime.now(timezone.utc).isoformat()
+        }, headers=auth_headers)
+        client.get("/dashboard/", headers=auth_headers)
+
+        client.post(f"/categories/{meals['id']}/merge", json={"target_category_id": food["id"]}, headers=auth_headers)
+
+        breakdown = client.get("/dashboard/", headers=auth_headers).json()["category_breakdown"]
+        assert [item["category_name"] for item in breakdown] == ["Food"]
+
+    def test_merge_validations(self, auth_headers):
+        """Testa as validações de origem e destino."""
+        food = _create_category(auth_headers, "Food")
+        restaurants = _create_category(auth_headers, "Restaurants", food["id"])
+        salary = _create_category(auth_headers, "Salary", category_type="income")
+
+        cases = [
+            (food["id"], food["id"], 400),
+            (food["id"], restaurants["id"], 400),
+            (food["id"], salary["id"], 400),
+            (food["id"], 999, 404),
+            (999, food["id"], 404),
+        ]
+        for source_id, target_id, status_code in cases:
+            response = client.post(f"/categories/{source_id}/merge", json={"target_category_id": target_id}, headers=auth_headers)
+            assert response.status_code == status_code
+
+
+class TestCategoryConditionalGet:
+    """Testes para GET condicional (ETag) da listagem de categorias."""
+
+    def test_list_returns_etag(self, test_category, auth_headers):
+        """Testa que a listagem retorna uma ETag fraca."""
+        response = client.get("/categories/", headers=auth_headers)
+        assert response.status_code == 200
+        assert response.headers["ETag"].startswith("W/")
+
+    def test_not_modified_without_touching_categories(self, test_category, auth_headers, query_log):
+        """Testa 304 sem consultar a tabela de categorias."""
+        etag = client.get("/categories/", headers=auth_headers).headers["ETag"]
+
+        query_log.clear()
+        response = client.get("/categories/", headers={**auth_headers, "If-None-Match": etag})
+        assert response.status_code == 304
+        assert response.content == b""
+        assert response.headers["ETag"] == etag
+        # Apenas a busca do usuário autenticado e a leitura do contador
+        assert len(query_log) == 2
+        assert not any("FROM categories" in statement for statement in query_log)
+
+    def test_etag_changes_after_write(self, test_category, auth_headers):
+        """Testa que uma escrita invalida a ETag anterior."""
+        etag = client.get("/categories/", headers=auth_headers).headers["ETag"]
+
+        client.put(f"/categories/{test_category['id']}", json={"color": "#000000"}, headers=auth_headers)
+
+        response = client.get("/categories/", headers={**auth_headers, "If-None-Match": etag})
+        assert response.status_code == 200
+        assert response.headers["ETag"] != etag
+        assert response.json()[0]["color"] == "#000000"
+
+
+class TestResourceVersionBump:
+    """Testes do incremento atômico das versões (ETag/cache)."""
+
+    def _create_user(self, session_factory):
+        with session_factory() as db:
+            user = User(email="versions@example.com", first_name="Version", last_name="Bump", hashed_password="x")
+            db.add(user)
+            db.commit()
+            return user.id
+
+    def test_bump_twice_before_flush(self, file_session_factory):
+        """Testa duas escritas na mesma sessão (autoflush=False) antes do commit."""
+        user_id = self._create_user(file_session_factory)
+        with file_session_factory() as db:
+            ResourceVersionService(db).bump(user_id, CATEGORIES)
+            ResourceVersionService(db).bump(user_id, CATEGORIES)
+            db.commit()
+            assert ResourceVersionService(db).get_version(user_id, CATEGORIES) == 2
+
+    def test_concurrent_first_writes(self, file_session_factory, threads=8):
+        """Testa que primeiras escritas concorrentes não colidem na chave primária."""
+        user_id = self._create_user(file_session_factory)
+        errors = []
+        barrier = threading.Barrier(threads)
+
+        def bump():
+            barrier.wait()
+            with file_session_factory() as db:
+                try:
+                    ResourceVersionService(db).bump(user_id, CATEGORIES)
+                    db.commit()
+                except Exception as exc:
+                    errors.append(exc)
+
+        workers = [threading.Thread(target=bump) for _ in range(threads)]
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+
+        assert errors == []
+        with file_session_factory() as db:
+            assert ResourceVersionService(db).get_version(user_id, CATEGORIES) == threads
@@ -0,0 +1,117 @@
+"""Testes para o middleware de compressão de respostas."""
+import gzip
+
+from fastapi import FastAPI
+from fastapi.responses import PlainTextResponse, Response, StreamingResponse
+from fastapi.testclient import TestClient
+
+from tests.conftest import client
+from utils.compression import CompressionMiddleware, negotiate_encoding
+
+
+def _build_app(**options) -> TestClient:
+    """App mínimo com o middleware, para cobrir tipos de resposta específicos."""
+    app = FastAPI()
+    app.add_middleware(CompressionMiddleware, **options)
+    payload = b'{"items": [' + b",".join(b'{"id": %d}' % i for i in range(500)) + b"]}"
+
+    @app.get("/json")
+    async def json_payload():
+        return Response(payload, media_type="application/json")
+
+    @app.get("/small")
+    async def small_payload():
+        return Response(b'{"ok": true}', media_type="application/json")
+
+    @app.get("/zip")
+    async def zip_stream():
+        return StreamingResponse(iter([b"PK\x03\x04" + b"\x00" * 4096]), media_type="application/zip")
+
+    @app.get("/csv")
+    async def csv_stream():
+        return StreamingResponse((b"id,amount\n%d,10.0\n" % i for i in range(500)), media_type="text/csv")
+
+    @app.get("/html")
+    async def html_payload():
+        return PlainTextResponse("x" * 1500, media_type="text/html")
+
+    return TestClient(app)
+
+
+class TestEncodingNegotiation:
+    """Testes para a negociação via Accept-Encoding."""
+
+    def test_prefers_highest_quality(self):
+        """Testa a escolha pelo maior q-value."""
+        assert negotiate_encoding("gzip;q=0.5, br;q=1.0", ["br", "gzip"]) == "br"
+        assert negotiate_encoding("gzip;q=0.5, br;q=1.0", ["gzip"]) == "gzip"
+
+    def test_server_preference_breaks_ties(self):
+        """Testa que empates seguem a preferência do servidor."""
+        assert negotiate_encoding("gzip, br", ["br", "gzip"]) == "br"
+
+    def test_refused_and_missing_encodings(self):
+        """Testa q=0, wildcard e header vazio."""
+        assert negotiate_encoding("gzip;q=0", ["gzip"]) is None
+        assert negotiate_encoding("*", ["gzip"]) == "gzip"
+        assert negotiate_encoding("", ["gzip"]) is None
+
+
+class TestCompressionMiddleware:
+    """Testes para o comportamento do middleware."""
+
+    def test_compresses_large_json(self):
+        """Testa compressão gzip de JSON acima do limite."""
+        test_client = _build_app(minimum_size=1024)
+        response = test_client.get("/json", headers={"Accept-Encoding": "gzip"})
+        assert response.headers["content-encoding"] == "gzip"
+        assert "Accept-Encoding" in response.headers["vary"]
+        assert int(response.headers["content-length"]) < len(response.content)
+
+    def test_skips_small_responses(self):
+        """Testa que respostas abaixo do limite não são comprimidas."""
+        test_client = _build_app(minimum_size=1024)
+        response = test_client.get("/small", headers={"Accept-Encoding": "gzip"})
+        assert "content-encoding" not in response.headers
+
+    def test_identity_when_client_does_not_accept(self):
+        """Testa resposta sem compressão quando o cliente não aceita gzip."""
+        test_client = _build_app(minimum_size=1024)
+        response = test_client.get("/json", headers={"Accept-Encoding": "identity"})
+        assert "content-encoding" not in response.headers
+        assert response.json()["items"][0] == {"id": 0}
+
+    def test_binary_streams_are_excluded(self):
+        """Testa que streams binários (zip) passam intactos."""
+        test_client = _build_app(minimum_size=10)
+        response = test_client.get("/zip", headers={"Accept-Encoding": "gzip"})
+        assert "content-encoding" not in response.headers
+        assert response.content.startswith(b"PK")
+
+    def test_streamed_text_is_compressed_incrementally(self):
+        """Testa compressão incremental de respostas em streaming compressíveis."""
+        test_client = _build_app(minimum_size=10)
+        with test_client.stream("GET", "/csv", headers={"Accept-Encoding": "gzip"}) as response:
+            raw = b"".join(response.iter_raw())
+        assert response.headers["content-encoding"] == "gzip"
+        assert gzip.decompress(raw).startswith(b"id,amount\n0,10.0\n")
+
+    def test_content_aware_thresholds(self):
+        """Testa limites diferentes por tipo de conteúdo."""
+        test_client = _build_app(thresholds={"application/json": 100, "text/html": 4096})
+        assert test_client.get("/json", headers={"Accept-Encoding": "gzip"}).headers["content-encoding"] == "gzip"
+        assert "content-encoding" not in test_client.get("/html", headers={"Accept-Encoding": "gzip"}).headers
+
+    def test_api_list_endpoint_is_compressed(self, auth_headers):
+        """Testa a compressão aplicada às rotas da API."""
+        for i in range(30):
+            client.post("/categories/", json={
+                "name": f"Category {i}",
+                "category_type": "expense",
+                "color": "#FF5722"
+            }, headers=auth_headers)
+
+        response = client.get("/categories/", headers={**auth_headers, "Accept-Encoding": "gzip"})
+        assert response.status_code == 200
+        assert response.headers["content-encoding"] == "gzip"
+        assert len(response.json()) == 30
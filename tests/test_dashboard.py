@@ -0,0 +1,185 @@
+"""Testes para o endpoint agregado do dashboard."""
+import json
+import threading
+from datetime import datetime, timezone
+
+import pytest
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+
+from config import Base, settings
+from models.categories import Category
+from models.transactions import Transaction
+from models.users import User
+from services.dashboard_service import DashboardService
+from tests.conftest import client
+from utils.cache import response_cache
+from utils.metrics import RequestDbStats, current_db_stats
+from utils.tracing import Span, Trace, current_span
+
+
+def _create_transaction(category_id, auth_headers, amount, transaction_type="expense", description="Lunch"):
+    return client.post("/transactions/", json={
+        "description": description,
+        "amount": amount,
+        "transaction_type": transaction_type,
+        "category_id": category_id,
+        "date": datetime.now(timezone.utc).isoformat()
+    }, headers=auth_headers).json()
+
+
+class TestDashboard:
+    """Testes para GET /dashboard."""
+
+    def test_returns_all_sections(self, test_user, test_category, auth_headers):
+        """Testa que o dashboard agrega balance, metas, categorias e transações."""
+        _create_transaction(test_category["id"], auth_headers, 30.0)
+        _create_transaction(test_category["id"], auth_headers, 20.0, description="Dinner")
+        client.post("/goals/", json={
+            "user_id": test_user["id"],
+            "name": "Vacation",
+            "target_amount": 1000.0,
+            "current_amount": 100.0,
+            "color": "#2196F3"
+        }, headers=auth_headers)
+
+        response = client.get("/dashboard/?recent=1", headers=auth_headers)
+        assert response.status_code == 200
+        data = response.json()
+        assert data["balance"]["total_expenses"] == 50.0
+        assert data["goals"][0]["percent_complete"] == 10.0
+        assert [category["name"] for category in data["categories"]] == ["Food"]
+        assert len(data["recent_transactions"]) == 1
+        assert data["category_breakdown"] == [{
+            "category_id": test_category["id"],
+            "category_name": "Food",
+            "transaction_type": "expense",
+            "total": 50.0,
+            "count": 2
+        }]
+        assert data["month"] == datetime.now(timezone.utc).strftime("%Y-%m")
+
+    def test_new_user_has_no_balance(self, test_user, auth_headers):
+        """Testa o dashboard de um usuário sem transações."""
+        data = client.get("/dashboard/", headers=auth_headers).json()
+        assert data["balance"] is None
+        assert data["recent_transactions"] == []
+
+    def test_served_from_cache_until_next_write(self, test_category, auth_headers, query_log):
+        """Testa que o agregado é cacheado e invalidado por uma nova transação."""
+        _create_transaction(test_category["id"], auth_headers, 30.0)
+        first = client.get("/dashboard/", headers=auth_headers).json()
+
+        query_log.clear()
+        assert client.get("/dashboard/", headers=auth_headers).json() == first
+        assert not any("FROM transactions" in statement for statement in query_log)
+
+        _create_transaction(test_category["id"], auth_headers, 5.0)
+        data = client.get("/dashboard/", headers=auth_headers).json()
+        assert data["balance"]["total_expenses"] == 35.0
+        assert len(data["recent_transactions"]) == 2
+
+    def test_query_budget(self, test_user, test_category, auth_headers, assert_max_queries):
+        """Testa o número de statements do agregado, sem e com cache."""
+        for amount in (10.0, 20.0, 30.0):
+            _create_transaction(test_category["id"], auth_headers, amount)
+        with assert_max_queries(7):
+            client.get("/dashboard/", headers=auth_headers)
+        with assert_max_queries(2):
+            client.get("/dashboard/", headers=auth_headers)
+
+    def test_conditional_get(self, test_category, auth_headers):
+        """Testa o 304 quando nada mudou."""
+        etag = client.get("/dashboard/", headers=auth_headers).headers["ETag"]
+        response = client.get("/dashboard/", headers={**auth_headers, "If-None-Match": etag})
+        assert response.status_code == 304
+
+
+@pytest.fixture
+def file_dashboard(tmp_path, monkeypatch):
+    """Banco SQLite em arquivo (QueuePool), com um usuário, uma categoria e duas transações."""
+    engine = create_engine(f"sqlite:///{tmp_path / 'dashboard.db'}", connect_args={"check_same_thread": False})
+    Base.metadata.create_all(bind=engine)
+    Session = sessionmaker(bind=engine, autoflush=False)
+
+    with Session() as db:
+        user = User(email="dash@example.com", first_name="Dash", last_name="Board", hashed_password="x")
+        db.add(user)
+        db.flush()
+        category = Category(user_id=user.id, name="Food", category_type="expense", color="#FF5722")
+        db.add(category)
+        db.flush()
+        for amount in (10.0, 20.0):
+            db.add(Transaction(
+                user_id=user.id, description="Meal", amount=amount, transaction_type="expense",
+                category_id=category.id, date=datetime.now(timezone.utc)
+            ))
+        db.commit()
+        user_id = user.id
+
+    monkeypatch.setattr(settings, "DASHBOARD_MAX_WORKERS", 4)
+    response_cache.clear()
+    yield engine, Session, user_id
+    engine.dispose()
+
+
+class TestDashboardConcurrency:
+    """Testa as consultas paralelas em um banco com pool de conexões."""
+
+    def test_parallel_matches_sequential(self, file_dashboard, monkeypatch):
+        """Testa que o resultado paralelo é igual ao sequencial e usa o pool de threads."""
+        engine, Session, user_id = file_dashboard
+        threads = set()
+        event.listen(engine, "before_cursor_execute", lambda *args: threads.add(threading.current_thread().name))
+
+        monkeypatch.setattr(settings, "DASHBOARD_MAX_WORKERS", 1)
+        with Session() as db:
+            sequential = json.loads(DashboardService(db).get_dashboard_json(user_id))
+
+        response_cache.clear()
+        threads.clear()
+        monkeypatch.setattr(settings, "DASHBOARD_MAX_WORKERS", 4)
+        with Session() as db:
+            parallel = json.loads(DashboardService(db).get_dashboard_json(user_id))
+
+        assert parallel == sequential
+        assert parallel["category_breakdown"][0]["total"] == 30.0
+        assert any(name.startswith("dashboard") for name in threads)
+
+    def test_worker_queries_count_for_the_request(self, file_dashboard):
+        """Testa que as consultas das threads do pool entram nas estatísticas da requisição."""
+        engine, Session, user_id = file_dashboard
+        executed = []
+        event.listen(engine, "after_cursor_execute", lambda *args: executed.append(threading.current_thread().name))
+
+        stats = RequestDbStats()
+        token = current_db_stats.set(stats)
+        try:
+            with Session() as db:
+                DashboardService(db).get_dashboard_json(user_id)
+        finally:
+            current_db_stats.reset(token)
+
+        assert any(name.startswith("dashboard") for name in executed)
+        assert stats.queries == len(executed)
+        assert stats.seconds > 0
+
+    def test_worker_spans_join_the_request_trace(self, file_dashboard):
+        """Testa que os spans de service e SQL das threads do pool ficam no trace da requisição."""
+        engine, Session, user_id = file_dashboard
+        trace = Trace("b" * 32, True)
+        root = Span(trace, "GET /dashboard/")
+        token = current_span.set(root)
+        try:
+            with Session() as db:
+                DashboardService(db).get_dashboard_json(user_id)
+        finally:
+            current_span.reset(token)
+
+        names = {span.name for span in trace.spans}
+        for service in ("GoalsService.get_user_goals", "CategoriesService.get_all_categories", "TransactionsService.get_recent_transactions"):
+            assert service in names
+        by_id = {span.span_id: span for span in trace.spans}
+        goals_span = next(span for span in trace.spans if span.name == "GoalsService.get_user_goals")
+        assert any(span.attributes.get("code.layer") == "sql" and span.parent_id == goals_span.span_id for span in trace.spans)
+        assert by_id[goals_span.parent_id].name == "DashboardService.get_dashboard_json"
@@ -0,0 +1,136 @@
+"""Testes para os fieldsets esparsos (?fields=)."""
+from datetime import datetime
+
+import pytest
+
+from models.goals import Goal, GoalContribution
+from tests.conftest import client, TestingSessionLocal
+
+
+@pytest.fixture
+def test_transaction(test_category, auth_headers):
+    """Cria uma transação de teste."""
+    response = client.post("/transactions/", json={
+        "description": "Groceries",
+        "amount": 42.5,
+        "transaction_type": "expense",
+        "category_id": test_category["id"],
+        "date": "2024-01-10T12:00:00Z"
+    }, headers=auth_headers)
+    return response.json()
+
+
+def _select_statements(query_log, table):
+    return [statement for statement in query_log if statement.startswith("SELECT") and f"FROM {table}" in statement]
+
+
+class TestTransactionFieldsets:
+    """Testes de fieldsets em transações."""
+
+    def test_list_returns_only_requested_fields(self, test_transaction, auth_headers, query_log):
+        """Testa que a listagem retorna e seleciona apenas os campos pedidos."""
+        response = client.get("/transactions/?fields=id,description,amount,date", headers=auth_headers)
+        assert response.status_code == 200
+        data = response.json()
+        assert data["total"] == 1
+        assert data["items"] == [{
+            "id": test_transaction["id"],
+            "description": "Groceries",
+            "amount": 42.5,
+            "date": "2024-01-10T12:00:00"
+        }]
+
+        select = _select_statements(query_log, "transactions")[-1]
+        assert "transactions.description" in select
+        assert "transactions.created_at" not in select
+        assert "transactions.updated_at" not in select
+
+    def test_get_returns_only_requested_fields(self, test_transaction, auth_headers):
+        """Testa o fieldset na busca por ID."""
+        response = client.get(f"/transactions/{test_transaction['id']}?fields=amount", headers=auth_headers)
+        assert response.status_code == 200
+        assert response.json() == {"amount": 42.5}
+
+    def test_get_missing_transaction_with_fields(self, auth_headers):
+        """Testa que o 404 é preservado com fieldset."""
+        response = client.get("/transactions/999?fields=id", headers=auth_headers)
+        assert response.status_code == 404
+
+    def test_unknown_field_is_rejected(self, auth_headers):
+        """Testa que campos desconhecidos retornam 400."""
+        response = client.get("/transactions/?fields=id,password", headers=auth_headers)
+        assert response.status_code == 400
+        assert response.json()["detail"] == "Unknown fields: password"
+
+
+class TestCategoryFieldsets:
+    """Testes de fieldsets em categorias."""
+
+    def test_list_returns_only_requested_fields(self, test_category, auth_headers):
+        """Testa a listagem de categorias com fieldset."""
+        response = client.get("/categories/?fields=id,name", headers=auth_headers)
+        assert response.status_code == 200
+        assert response.json() == [{"id": test_category["id"], "name": test_category["name"]}]
+        assert "ETag" in response.headers
+
+    def test_fieldsets_are_cached_separately(self, test_category, auth_headers):
+        """Testa que o cache não mistura respostas completas e reduzidas."""
+        full = client.get("/categories/", headers=auth_headers).json()
+        sparse = client.get("/categories/?fields=name", headers=auth_headers).json()
+        assert sparse == [{"name": test_category["name"]}]
+        assert client.get("/categories/", headers=auth_headers).json() == full
+
+    def test_get_returns_only_requested_fields(self, test_category, auth_headers):
+        """Testa o fieldset na busca de categoria por ID."""
+        response = client.get(f"/categories/{test_category['id']}?fields=color", headers=auth_headers)
+        assert response.json() == {"color": test_category["color"]}
+
+
+class TestGoalFieldsets:
+    """Testes de fieldsets em metas."""
+
+    def test_computed_field_can_be_requested(self, test_user, auth_headers):
+        """Testa que campos calculados são suportados no fieldset."""
+        goal = client.post("/goals/", json={
+            "user_id": test_user["id"],
+            "name": "Vacation",
+            "target_amount": 1000.0,
+            "current_amount": 250.0,
+            "color": "#2196F3"
+        }, headers=auth_headers).json()
+
+        response = client.get(f"/goals/user/{test_user['id']}?fields=name,percent_complete", headers=auth_headers)
+        assert response.json() == [{"name": "Vacation", "percent_complete": 25.0}]
+
+        response = client.get(f"/goals/{goal['id']}?fields=id,current_amount", headers=auth_headers)
+        assert response.json() == {"id": goal["id"], "current_amount": 250.0}
+
+    def test_projection_can_be_requested(self, test_user, auth_headers):
+        """Testa o fieldset com a projeção de conclusão, que não é coluna da tabela."""
+        goal = client.post("/goals/", json={
+            "user_id": test_user["id"],
+            "name": "Vacation",
+            "target_amount": 1000.0,
+            "color": "#2196F3"
+        }, headers=auth_headers).json()
+        db = TestingSessionLocal()
+        try:
+            for day, balance in (("2024-01-01", 100.0), ("2024-01-02", 200.0)):
+                db.add(GoalContribution(
+                    goal_id=goal["id"], user_id=test_user["id"], amount=100.0,
+                    balance_after=balance, created_at=datetime.fromisoformat(f"{day}T10:00:00")
+                ))
+            db.query(Goal).filter(Goal.id == goal["id"]).update({Goal.current_amount: 200.0})
+            db.commit()
+        finally:
+            db.close()
+
+        response = client.get(f"/goals/user/{test_user['id']}?fields=projected_completion_date", headers=auth_headers)
+        assert response.status_code == 200
+        assert response.json() == [{"projected_completion_date": "2024-01-10"}]
+
+        response = client.get(f"/goals/user/{test_user['id']}?fields=name,projected_completion_date", headers=auth_headers)
+        assert response.json() == [{"name": "Vacation", "projected_completion_date": "2024-01-10"}]
+
+        response = client.get(f"/goals/{goal['id']}?fields=projected_completion_date", headers=auth_headers)
+        assert response.json() == {"projected_completion_date": "2024-01-10"}
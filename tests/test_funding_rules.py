@@ -0,0 +1,154 @@
+"""Testes para as regras de financiamento automático de metas."""
+import pytest
+
+from tests.conftest import client
+
+
+@pytest.fixture
+def income_category(auth_headers):
+    """Cria uma categoria de receita de teste."""
+    response = client.post("/categories/", json={
+        "name": "Salary",
+        "category_type": "income",
+        "color": "#4CAF50"
+    }, headers=auth_headers)
+    return response.json()
+
+
+@pytest.fixture
+def test_goal(test_user, auth_headers):
+    """Cria uma meta de teste."""
+    response = client.post("/goals/", json={
+        "user_id": test_user["id"],
+        "name": "Vacation",
+        "target_amount": 1000.0,
+        "current_amount": 0.0,
+        "color": "#2196F3"
+    }, headers=auth_headers)
+    return response.json()
+
+
+def _income(category_id, amount):
+    return {
+        "description": "Paycheck",
+        "amount": amount,
+        "transaction_type": "income",
+        "category_id": category_id,
+        "date": "2024-01-10T12:00:00Z"
+    }
+
+
+def _goal_amount(goal_id, auth_headers):
+    return client.get(f"/goals/{goal_id}", headers=auth_headers).json()["current_amount"]
+
+
+class TestFundingRuleCrud:
+    """Testes de criação, listagem e remoção de regras."""
+
+    def test_create_list_and_delete(self, test_goal, auth_headers):
+        """Testa o ciclo de vida de uma regra."""
+        response = client.post("/funding-rules/", json={"goal_id": test_goal["id"], "percentage": 10}, headers=auth_headers)
+        assert response.status_code == 201
+        rule = response.json()
+        assert rule["percentage"] == 10.0
+        assert rule["category_id"] is None
+
+        assert client.get("/funding-rules/", headers=auth_headers).json() == [rule]
+
+        assert client.delete(f"/funding-rules/{rule['id']}", headers=auth_headers).status_code == 204
+        assert client.get("/funding-rules/", headers=auth_headers).json() == []
+        assert client.delete(f"/funding-rules/{rule['id']}", headers=auth_headers).status_code == 404
+
+    def test_invalid_percentage(self, test_goal, auth_headers):
+        """Testa que a porcentagem deve estar entre 0 (exclusivo) e 100."""
+        for percentage in (0, 150):
+            response = client.post("/funding-rules/", json={"goal_id": test_goal["id"], "percentage": percentage}, headers=auth_headers)
+            assert response.status_code == 422
+
+    def test_unknown_goal(self, auth_headers):
+        """Testa regra para meta inexistente."""
+        response = client.post("/funding-rules/", json={"goal_id": 999, "percentage": 10}, headers=auth_headers)
+        assert response.status_code == 404
+
+    def test_expense_category_is_rejected(self, test_goal, test_category, auth_headers):
+        """Testa que regras só aceitam categorias de receita."""
+        response = client.post("/funding-rules/", json={
+            "goal_id": test_goal["id"],
+            "category_id": test_category["id"],
+            "percentage": 10
+        }, headers=auth_headers)
+        assert response.status_code == 400
+
+
+class TestFundingRuleEvaluation:
+    """Testes da aplicação das regras nas receitas."""
+
+    def test_income_funds_goal(self, test_goal, income_category, test_category, auth_headers):
+        """Testa que receitas financiam a meta e despesas não."""
+        client.post("/funding-rules/", json={"goal_id": test_goal["id"], "percentage": 10}, headers=auth_headers)
+
+        client.post("/transactions/", json=_income(income_category["id"], 500.0), headers=auth_headers)
+        assert _goal_amount(test_goal["id"], auth_headers) == 50.0
+
+        client.post("/transactions/", json={**_income(test_category["id"], 200.0), "transaction_type": "expense"}, headers=auth_headers)
+        assert _goal_amount(test_goal["id"], auth_headers) == 50.0
+
+        progress = client.get(f"/goals/{test_goal['id']}/progress", headers=auth_headers).json()
+        assert progress["points"][-1]["contributed"] == 50.0
+
+    def test_category_scoped_rule(self, test_goal, income_category, auth_headers):
+        """Testa que regras com categoria só valem para receitas dessa categoria."""
+        other = client.post("/categories/", json={"name": "Bonus", "category_type": "income", "color": "#8BC34A"}, headers=auth_headers).json()
+        client.post("/funding-rules/", json={
+            "goal_id": test_goal["id"],
+            "category_id": income_category["id"],
+            "percentage": 20
+        }, headers=auth_headers)
+
+        client.post("/transactions/", json=_income(other["id"], 100.0), headers=auth_headers)
+        client.post("/transactions/", json=_income(income_category["id"], 100.0), headers=auth_headers)
+        assert _goal_amount(test_goal["id"], auth_headers) == 20.0
+
+    def test_bulk_import_aggregates_per_goal(self, test_user, test_goal, income_category, auth_headers, query_log):
+        """Testa que um lote gera um único UPDATE por meta."""
+        client.post("/funding-rules/", json={"goal_id": test_goal["id"], "percentage": 10}, headers=auth_headers)
+
+        query_log.clear()
+        response = client.post("/transactions/bulk", json={"transactions": [
+            _income(income_category["id"], amount) for amount in (100.0, 200.0, 300.0)
+        ]}, headers=auth_headers)
+        assert response.status_code == 201
+        assert [transaction["amount"] for transaction in response.json()] == [100.0, 200.0, 300.0]
+
+        assert len([statement for statement in query_log if statement.startswith("UPDATE goals")]) == 1
+        assert len([statement for statement in query_log if statement.startswith("INSERT INTO goal_contributions")]) == 1
+        assert _goal_amount(test_goal["id"], auth_headers) == 60.0
+
+        balance = client.get(f"/balances/{test_user['id']}", headers=auth_headers).json()
+        assert balance["total_income"] == 600.0
+
+    def test_rules_are_cached(self, test_goal, income_category, auth_headers, query_log):
+        """Testa que as regras não são relidas do banco a cada receita."""
+        client.post("/funding-rules/", json={"goal_id": test_goal["id"], "percentage": 10}, headers=auth_headers)
+        client.post("/transactions/", json=_income(income_category["id"], 100.0), headers=auth_headers)
+
+        query_log.clear()
+        client.post("/transactions/", json=_income(income_category["id"], 100.0), headers=auth_headers)
+        assert not any("FROM goal_funding_rules" in statement for statement in query_log)
+        assert _goal_amount(test_goal["id"], auth_headers) == 20.0
+
+    def test_completed_goal_is_skipped(self, test_user, income_category, auth_headers):
+        """Testa que metas concluídas não recebem novas contribuições."""
+        goal = client.post("/goals/", json={
+            "user_id": test_user["id"],
+            "name": "Laptop",
+            "target_amount": 100.0,
+            "current_amount": 100.0,
+            "color": "#2196F3"
+        }, headers=auth_headers).json()
+        client.post("/funding-rules/", json={"goal_id": goal["id"], "percentage": 50}, headers=auth_headers)
+
+        client.post("/transactions/", json=_income(income_category["id"], 100.0), headers=auth_headers)
+        progress = client.get(f"/goals/{goal['id']}/progress", headers=auth_headers).json()
+        assert progress["points"] == []
+        assert progress["current_amount"] == 100.0
@@ -1,5 +1,13 @@
 """Testes para rotas de metas (goals)."""
-from tests.conftest import client, test_user
+import threading
+from datetime import date, datetime
+
+import pytest
+
+from models.goals import Goal, GoalContribution, GoalProgressPoint
+from models.users import User
+from services.goals_service import GoalsService, project_completion
+from tests.conftest import client, test_user, TestingSessionLocal
 
 
 class TestGoalCreation:
@@ -123,6 +131,76 @@ class TestGoalRetrieval:
         assert len(data) == 0
 
 
+class TestGoalListing:
+    """Testes de ordenação, filtros e paginação das metas pelo banco."""
+
+    @pytest.fixture
+    def goals(self, test_user, auth_headers):
+        """Cria metas com progressos diferentes (10%, 90%, 50% e 100%)."""
+        amounts = {"Car": (10000.0, 1000.0), "Phone": (1000.0, 900.0), "Trip": (4000.0, 2000.0), "Laptop": (500.0, 500.0)}
+        for name, (target, current) in amounts.items():
+            client.post("/goals/", json={
+                "user_id": test_user["id"],
+                "name": name,
+                "target_amount": target,
+                "current_amount": current,
+                "color": "#2196F3"
+            }, headers=auth_headers)
+
+    def _names(self, test_user, auth_headers, params):
+        response = client.get(f"/goals/user/{test_user['id']}?{params}", headers=auth_headers)
+        assert response.status_code == 200
+        return [goal["name"] for goal in response.json()]
+
+    def test_sort_by_percent_complete(self, goals, test_user, auth_headers, query_log):
+        """Testa a ordenação por progresso, feita pelo banco."""
+        names = self._names(test_user, auth_headers, "sort_by=percent_complete&order=desc")
+        assert names == ["Laptop", "Phone", "Trip", "Car"]
+        assert any("ORDER BY goals.progress DESC" in statement for statement in query_log)
+
+    def test_sort_by_remaining_amount(self, goals, test_user, auth_headers):
+        """Testa a ordenação pelo valor que falta."""
+        assert self._names(test_user, auth_headers, "sort_by=remaining_amount") == ["Laptop", "Phone", "Trip", "Car"]
+
+    def test_near_complete_filter(self, goals, test_user, auth_headers):
+        """Testa o filtro de metas quase concluídas."""
+        names = self._names(test_user, auth_headers, "min_percent_complete=50&sort_by=percent_complete")
+        assert names == ["Trip", "Phone", "Laptop"]
+        assert self._names(test_user, auth_headers, "max_remaining_amount=100") == ["Phone", "Laptop"]
+
+    def test_pagination(self, goals, test_user, auth_headers):
+        """Testa skip/limit sobre a ordenação."""
+        assert self._names(test_user, auth_headers, "sort_by=name&limit=2") == ["Car", "Laptop"]
+        assert self._names(test_user, auth_headers, "sort_by=name&skip=2&limit=2") == ["Phone", "Trip"]
+
+    def test_progress_follows_updates(self, test_user, auth_headers):
+        """Testa que a coluna gerada acompanha as contribuições."""
+        goal = client.post("/goals/", json={
+            "user_id": test_user["id"],
+            "name": "Bike",
+            "target_amount": 100.0,
+            "current_amount": 0.0,
+            "color": "#2196F3"
+        }, headers=auth_headers).json()
+        assert self._names(test_user, auth_headers, "min_percent_complete=60") == []
+
+        client.patch(f"/goals/{goal['id']}/add-amount", json={"amount": 75.0}, headers=auth_headers)
+        assert self._names(test_user, auth_headers, "min_percent_complete=60") == ["Bike"]
+
+    def test_query_budget(self, goals, test_user, auth_headers, assert_max_queries):
+        """Testa que a listagem não cresce com o número de metas (projeções em uma consulta)."""
+        with assert_max_queries(4):
+            client.get(f"/goals/user/{test_user['id']}?sort_by=percent_complete", headers=auth_headers)
+        # Do cache: autenticação e versão
+        with assert_max_queries(2):
+            client.get(f"/goals/user/{test_user['id']}?sort_by=percent_complete", headers=auth_headers)
+
+    def test_invalid_sort_field(self, test_user, auth_headers):
+        """Testa que campos de ordenação desconhecidos são rejeitados."""
+        response = client.get(f"/goals/user/{test_user['id']}?sort_by=color", headers=auth_headers)
+        assert response.status_code == 422
+
+
 class TestGoalUpdate:
     """Testes para atualização de metas."""
 
@@ -312,3 +390,214 @@ class TestGoalAddAmount:
         )
         assert response.status_code == 404
         assert response.json()["detail"] == "Goal not found"
+
+    def test_add_invalid_amount_goal_not_found(self, auth_headers):
+        """Testa que a meta inexistente é verificada antes do valor."""
+        response = client.patch(
+            "/goals/99999/add-amount",
+            json={"amount": -50.0},
+            headers=auth_headers
+        )
+        assert response.status_code == 404
+        assert response.json()["detail"] == "Goal not found"
+
+    def test_add_amount_single_statement(self, test_user, auth_headers, query_log):
+        """Testa que a contribuição não lê a meta antes nem depois do UPDATE."""
+        goal_id = client.post("/goals/", json={
+            "user_id": test_user["id"],
+            "name": "Vacation",
+            "target_amount": 1000.0,
+            "color": "#2196F3"
+        }, headers=auth_headers).json()["id"]
+
+        query_log.clear()
+        response = client.patch(f"/goals/{goal_id}/add-amount", json={"amount": 100.0}, headers=auth_headers)
+        assert response.json()["current_amount"] == 100.0
+        goal_statements = [statement for statement in query_log if "goals" in statement]
+        assert len(goal_statements) == 1
+        assert goal_statements[0].startswith("UPDATE goals")
+
+
+class TestGoalProgress:
+    """Testes para o histórico de contribuições e a projeção de conclusão."""
+
+    def _create_goal(self, test_user, auth_headers, target_amount=1000.0):
+        return client.post("/goals/", json={
+            "user_id": test_user["id"],
+            "name": "Vacation",
+            "target_amount": target_amount,
+            "color": "#2196F3"
+        }, headers=auth_headers).json()
+
+    def _backfill(self, goal, contributions):
+        """Insere contribuições em dias passados diretamente no histórico."""
+        db = TestingSessionLocal()
+        try:
+            balance = 0.0
+            for day, amount in contributions:
+                balance += amount
+                db.add(GoalContribution(
+                    goal_id=goal["id"], user_id=goal["user_id"], amount=amount,
+                    balance_after=balance, created_at=datetime.fromisoformat(day)
+                ))
+            db.query(Goal).filter(Goal.id == goal["id"]).update({Goal.current_amount: balance})
+            db.commit()
+        finally:
+            db.close()
+
+    def test_contributions_are_recorded(self, test_user, auth_headers):
+        """Testa que cada contribuição gera um ponto na série diária."""
+        goal = self._create_goal(test_user, auth_headers)
+        client.patch(f"/goals/{goal['id']}/add-amount", json={"amount": 100.0}, headers=auth_headers)
+        client.patch(f"/goals/{goal['id']}/add-amount", json={"amount": 50.0}, headers=auth_headers)
+
+        response = client.get(f"/goals/{goal['id']}/progress", headers=auth_headers)
+        assert response.status_code == 200
+        data = response.json()
+        assert len(data["points"]) == 1
+        assert data["points"][0]["contributed"] == 150.0
+        assert data["points"][0]["balance"] == 150.0
+        assert data["projected_completion_date"] is None
+
+    def test_projection_from_history(self, test_user, auth_headers):
+        """Testa a série diária e a projeção a partir de vários dias de histórico."""
+        goal = self._create_goal(test_user, auth_headers)
+        self._backfill(goal, [
+            ("2024-01-01T10:00:00", 100.0),
+            ("2024-01-02T10:00:00", 100.0),
+            ("2024-01-03T09:00:00", 60.0),
+            ("2024-01-03T18:00:00", 40.0),
+            ("2024-01-04T10:00:00", 100.0),
+        ])
+
+        data = client.get(f"/goals/{goal['id']}/progress", headers=auth_headers).json()
+        assert [point["balance"] for point in data["points"]] == [100.0, 200.0, 300.0, 400.0]
+        assert data["daily_rate"] == 100.0
+        assert data["projected_completion_date"] == "2024-01-10"
+
+        goals = client.get(f"/goals/user/{test_user['id']}", headers=auth_headers).json()
+        assert goals[0]["projected_completion_date"] == "2024-01-10"
+
+    def test_manual_adjustment_lowers_daily_balance(self, test_user, auth_headers):
+        """Testa que o saldo do dia é o da última linha, inclusive após reduzir current_amount."""
+        goal = self._create_goal(test_user, auth_headers)
+        client.patch(f"/goals/{goal['id']}/add-amount", json={"amount": 300.0}, headers=auth_headers)
+        client.put(f"/goals/{goal['id']}", json={"current_amount": 120.0}, headers=auth_headers)
+
+        data = client.get(f"/goals/{goal['id']}/progress", headers=auth_headers).json()
+        assert data["current_amount"] == 120.0
+        assert data["points"] == [{"date": data["points"][0]["date"], "contributed": 120.0, "balance": 120.0}]
+
+        db = TestingSessionLocal()
+        try:
+            adjustment = db.query(GoalContribution).filter(GoalContribution.goal_id == goal["id"]).order_by(GoalContribution.id.desc()).first()
+            assert (adjustment.amount, adjustment.balance_after) == (-180.0, 120.0)
+        finally:
+            db.close()
+
+    def test_progress_cached_until_next_contribution(self, test_user, auth_headers, query_log):
+        """Testa que a série é servida do cache até a próxima contribuição."""
+        goal = self._create_goal(test_user, auth_headers)
+        client.patch(f"/goals/{goal['id']}/add-amount", json={"amount": 100.0}, headers=auth_headers)
+        client.get(f"/goals/{goal['id']}/progress", headers=auth_headers)
+
+        query_log.clear()
+        client.get(f"/goals/{goal['id']}/progress", headers=auth_headers)
+        assert not any("FROM goal_contributions" in statement for statement in query_log)
+
+        client.patch(f"/goals/{goal['id']}/add-amount", json={"amount": 25.0}, headers=auth_headers)
+        data = client.get(f"/goals/{goal['id']}/progress", headers=auth_headers).json()
+        assert data["current_amount"] == 125.0
+
+    def test_project_completion_edge_cases(self):
+        """Testa os casos sem projeção possível."""
+        flat = [
+            GoalProgressPoint(date=date(2024, 1, 1), contributed=10.0, balance=10.0),
+            GoalProgressPoint(date=date(2024, 1, 5), contributed=0.0, balance=10.0),
+        ]
+        assert project_completion(flat, 100.0, 10.0) == (0.0, None)
+        assert project_completion(flat[:1], 100.0, 10.0) == (None, None)
+        assert project_completion(flat, 10.0, 10.0)[1] is None
+
+
+class TestGoalConcurrentContributions:
+    """Testes de contribuições concorrentes na mesma meta."""
+
+    def _hammer(self, session_factory, target_amount, threads=8, contributions=25):
+        with session_factory() as db:
+            user = User(email="goals@example.com", first_name="Goal", last_name="Saver", hashed_password="x")
+            db.add(user)
+            db.flush()
+            goal = Goal(user_id=user.id, name="Fund", target_amount=target_amount, current_amount=0.0, color="#4CAF50")
+            db.add(goal)
+            db.commit()
+            goal_id = goal.id
+
+        errors = []
+        barrier = threading.Barrier(threads)
+
+        def contribute():
+            barrier.wait()
+            for _ in range(contributions):
+                with session_factory() as db:
+                    try:
+                        GoalsService(db).add_amount_to_goal(goal_id, 1.0)
+                    except Exception as exc:
+                        errors.append(exc)
+
+        workers = [threading.Thread(target=contribute) for _ in range(threads)]
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+
+        with session_factory() as db:
+            return db.query(Goal.current_amount).filter(Goal.id == goal_id).scalar(), errors
+
+    def test_no_lost_updates(self, file_session_factory):
+        """Testa que nenhuma contribuição concorrente se perde."""
+        total, errors = self._hammer(file_session_factory, target_amount=10000.0)
+        assert errors == []
+        assert total == 200.0
+
+    def test_concurrent_contributions_respect_target(self, file_session_factory):
+        """Testa que o limite do target vale mesmo sob concorrência."""
+        total, errors = self._hammer(file_session_factory, target_amount=50.0)
+        assert errors == []
+        assert total == 50.0
+
+
+class TestGoalConditionalGet:
+    """Testes para GET condicional (ETag) da listagem de metas."""
+
+    def test_not_modified_without_touching_goals(self, test_user, auth_headers, query_log):
+        """Testa 304 sem consultar a tabela de metas."""
+        client.post("/goals/", json={
+            "user_id": test_user["id"],
+            "name": "Emergency Fund",
+            "target_amount": 10000.0,
+            "color": "#4CAF50"
+        }, headers=auth_headers)
+        etag = client.get(f"/goals/user/{test_user['id']}", headers=auth_headers).headers["ETag"]
+
+        query_log.clear()
+        response = client.get(f"/goals/user/{test_user['id']}", headers={**auth_headers, "If-None-Match": etag})
+        assert response.status_code == 304
+        assert len(query_log) == 2
+        assert not any("FROM goals" in statement for statement in query_log)
+
+    def test_etag_changes_after_add_amount(self, test_user, auth_headers):
+        """Testa que adicionar valor à meta invalida a ETag."""
+        goal_id = client.post("/goals/", json={
+            "user_id": test_user["id"],
+            "name": "Vacation",
+            "target_amount": 5000.0,
+            "color": "#2196F3"
+        }, headers=auth_headers).json()["id"]
+        etag = client.get(f"/goals/user/{test_user['id']}", headers=auth_headers).headers["ETag"]
+
+        client.patch(f"/goals/{goal_id}/add-amount", json={"amount": 100.0}, headers=auth_headers)
+
+        response = client.get(f"/goals/user/{test_user['id']}", headers={**auth_headers, "If-None-Match": etag})
+        assert response.status_code == 200
+        assert response.json()[0]["current_amount"] == 100.0
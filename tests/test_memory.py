@@ -0,0 +1,110 @@
+"""Testes para a instrumentação de memória (tracemalloc)."""
+import asyncio
+
+import httpx
+import pytest
+
+from tests.conftest import client
+from utils.memory import MemoryPeakMiddleware, MemoryTracker, memory_tracker
+
+
+ADMIN_HEADERS = {"X-Admin-Token": "admin-secret"}
+
+# Mantido vivo entre o snapshot e o diff
+_retained = []
+
+
+@pytest.fixture(autouse=True)
+def admin_token(monkeypatch):
+    """Configura o token de admin e garante o tracemalloc desligado ao final."""
+    monkeypatch.setenv("ADMIN_TOKEN", "admin-secret")
+    yield
+    memory_tracker.stop()
+    memory_tracker.reset_requests()
+    _retained.clear()
+
+
+class TestMemoryEndpoints:
+    """Testes para /admin/memory."""
+
+    def test_requires_admin_token(self):
+        """Testa que a instrumentação exige o token de admin."""
+        assert client.get("/admin/memory", headers={"X-Admin-Token": "wrong"}).status_code == 403
+
+    def test_status_without_tracing(self):
+        """Testa o status com o tracemalloc desligado."""
+        data = client.get("/admin/memory", headers=ADMIN_HEADERS).json()
+        assert data["tracing"] is False
+        assert data["rss_bytes"] > 0
+        assert client.get("/admin/memory/top", headers=ADMIN_HEADERS).status_code == 400
+
+    def test_top_and_diff(self):
+        """Testa o top de alocações e o diff contra o snapshot de referência."""
+        assert client.post("/admin/memory/tracemalloc/start?frames=5", headers=ADMIN_HEADERS).json()["tracing"] is True
+        assert client.get("/admin/memory/diff", headers=ADMIN_HEADERS).status_code == 400
+
+        assert client.post("/admin/memory/snapshot", headers=ADMIN_HEADERS).status_code == 200
+        _retained.extend(bytearray(1024) for _ in range(2000))
+
+        diff = client.get("/admin/memory/diff?limit=5", headers=ADMIN_HEADERS).json()
+        assert any("test_memory.py" in entry["site"] and entry["size_diff_bytes"] >= 2000 * 1024 for entry in diff)
+
+        top = client.get("/admin/memory/top?group_by=filename", headers=ADMIN_HEADERS).json()
+        assert top and {"site", "size_bytes", "count"} <= set(top[0])
+
+        assert client.post("/admin/memory/tracemalloc/stop", headers=ADMIN_HEADERS).json()["tracing"] is False
+
+
+class TestRequestPeak:
+    """Testes do pico de alocação por requisição."""
+
+    def test_peak_per_tracked_route(self, test_category, auth_headers):
+        """Testa o header X-Memory-Peak e o acumulado por rota."""
+        client.post("/admin/memory/tracemalloc/start", headers=ADMIN_HEADERS)
+        response = client.get("/transactions/", headers=auth_headers)
+        assert int(response.headers["X-Memory-Peak"]) > 0
+
+        assert "X-Memory-Peak" not in client.get("/goals/999", headers=auth_headers).headers
+
+        requests = client.get("/admin/memory", headers=ADMIN_HEADERS).json()["requests"]
+        assert requests["GET /transactions/"]["count"] == 1
+        assert requests["GET /transactions/"]["max_peak_bytes"] > 0
+
+    def test_no_header_without_tracing(self, test_category, auth_headers):
+        """Testa que nada é medido com o tracemalloc desligado."""
+        assert "X-Memory-Peak" not in client.get("/transactions/", headers=auth_headers).headers
+
+    def test_overlapping_requests_are_not_measured(self):
+        """Testa que requisições medidas simultâneas não publicam um pico zerado pela outra."""
+        tracker = MemoryTracker()
+        started = asyncio.Event()
+        release = asyncio.Event()
+
+        async def app(scope, receive, send):
+            if scope["path"] == "/slow":
+                started.set()
+                await release.wait()
+            await send({"type": "http.response.start", "status": 200, "headers": []})
+            await send({"type": "http.response.body", "body": b"{}"})
+
+        async def scenario():
+            transport = httpx.ASGITransport(app=MemoryPeakMiddleware(app, tracker, ("/",)))
+            async with httpx.AsyncClient(transport=transport, base_url="http://test") as http:
+                slow = asyncio.create_task(http.get("/slow"))
+                await started.wait()
+                fast = await http.get("/fast")
+                release.set()
+                return await slow, fast, await http.get("/fast")
+
+        tracker.start(1)
+        try:
+            slow, fast, alone = asyncio.run(scenario())
+        finally:
+            tracker.stop()
+
+        assert "X-Memory-Peak" not in slow.headers
+        assert "X-Memory-Peak" not in fast.headers
+        assert int(alone.headers["X-Memory-Peak"]) >= 0
+        requests = tracker.status()["requests"]
+        assert requests["GET unmatched"]["overlapped"] == 2
+        assert requests["GET unmatched"]["count"] == 1
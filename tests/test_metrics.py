@@ -0,0 +1,112 @@
+"""Testes para as métricas no formato Prometheus."""
+import json
+import os
+
+import pytest
+
+from tests.conftest import client
+from utils.metrics import LATENCY_BUCKETS, QUERY_COUNT_BUCKETS, MetricsRegistry, RequestDbStats, metrics
+
+
+ADMIN_HEADERS = {"X-Admin-Token": "admin-secret"}
+
+
+@pytest.fixture(autouse=True)
+def admin_token(monkeypatch):
+    """Configura o token de admin e zera as métricas do processo."""
+    monkeypatch.setenv("ADMIN_TOKEN", "admin-secret")
+    metrics.reset()
+
+
+def _value(text, sample):
+    for line in text.splitlines():
+        if line.startswith(sample + " "):
+            return float(line.rsplit(" ", 1)[1])
+    return None
+
+
+class TestMetricsEndpoint:
+    """Testes para GET /metrics."""
+
+    def test_requires_admin_token(self):
+        """Testa que as métricas exigem o token de admin."""
+        assert client.get("/metrics", headers={"X-Admin-Token": "wrong"}).status_code == 403
+
+    def test_request_and_db_metrics(self, test_user, auth_headers):
+        """Testa contadores e histogramas por rota e do banco."""
+        goal = client.post("/goals/", json={
+            "user_id": test_user["id"],
+            "name": "Vacation",
+            "target_amount": 1000.0,
+            "color": "#2196F3"
+        }, headers=auth_headers).json()
+        client.get(f"/goals/{goal['id']}", headers=auth_headers)
+        client.get("/goals/999", headers=auth_headers)
+
+        response = client.get("/metrics", headers=ADMIN_HEADERS)
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+        text = response.text
+
+        # A rota é identificada pelo template, não pelo caminho
+        assert _value(text, 'http_requests_total{method="GET",route="/goals/{goal_id}",status="200"}') == 1
+        assert _value(text, 'http_requests_total{method="GET",route="/goals/{goal_id}",status="404"}') == 1
+        assert _value(text, 'http_request_duration_seconds_count{method="GET",route="/goals/{goal_id}"}') == 2
+        assert _value(text, 'http_request_duration_seconds_bucket{method="GET",route="/goals/{goal_id}",le="+Inf"}') == 2
+        assert _value(text, "db_queries_total") > 0
+        assert _value(text, "db_queries_per_request_count") >= 3
+        assert _value(text, "db_queries_per_request_sum") > 0
+        assert _value(text, "app_workers") == 1
+
+    def test_unmatched_routes_share_a_label(self, auth_headers):
+        """Testa que caminhos inexistentes não criam uma série por URL."""
+        client.get("/does-not-exist/1")
+        client.get("/does-not-exist/2")
+        text = client.get("/metrics", headers=ADMIN_HEADERS).text
+        assert _value(text, 'http_requests_total{method="GET",route="unmatched",status="404"}') == 2
+
+    def test_cache_hit_ratio(self, test_category, auth_headers):
+        """Testa a exposição do hit ratio do cache por recurso."""
+        client.get("/categories/", headers=auth_headers)
+        client.get("/categories/", headers=auth_headers)
+        text = client.get("/metrics", headers=ADMIN_HEADERS).text
+        assert _value(text, 'cache_hits_total{resource="categories"}') >= 1
+        assert 'cache_hit_ratio{resource="categories"}' in text
+
+
+class TestMultiWorkerAggregation:
+    """Testa a soma dos snapshots gravados pelos workers."""
+
+    def _snapshot(self, pid, requests, in_flight):
+        return {
+            "pid": pid,
+            "requests": {"GET\t/goals/{goal_id}\t200": requests},
+            "latency": {"GET\t/goals/{goal_id}": {"buckets": [requests] * len(LATENCY_BUCKETS), "sum": 0.01 * requests, "count": requests}},
+            "in_flight": in_flight,
+            "db_queries": {"buckets": [0] * len(QUERY_COUNT_BUCKETS), "sum": 0, "count": 0},
+            "db_time": {"buckets": [0] * len(LATENCY_BUCKETS), "sum": 0.0, "count": 0},
+            "db_queries_total": requests * 2,
+            "db_seconds_total": 0.0,
+            "pool": {"checkedout": 1},
+            "cache": {},
+        }
+
+    def test_snapshots_are_summed(self, tmp_path):
+        """Testa que contadores somam todos os workers e gauges só os vivos."""
+        registry = MetricsRegistry(str(tmp_path))
+        registry.request_started()
+        registry.request_finished("GET", "/goals/{goal_id}", 200, 0.02, RequestDbStats())
+        registry.request_started()
+        registry.maybe_flush(force=True)
+        assert os.path.exists(tmp_path / f"metrics-{os.getpid()}.json")
+
+        # Um worker vivo (o processo pai) e um já encerrado
+        (tmp_path / "metrics-live.json").write_text(json.dumps(self._snapshot(os.getppid(), 3, 2)))
+        (tmp_path / "metrics-dead.json").write_text(json.dumps(self._snapshot(2 ** 30, 5, 7)))
+
+        text = registry.render()
+        assert _value(text, 'http_requests_total{method="GET",route="/goals/{goal_id}",status="200"}') == 9
+        assert _value(text, 'http_request_duration_seconds_count{method="GET",route="/goals/{goal_id}"}') == 9
+        assert _value(text, "db_queries_total") == 16
+        assert _value(text, "http_requests_in_flight") == 3
+        assert _value(text, "app_workers") == 2
@@ -0,0 +1,102 @@
+"""Testes para o profiler por amostragem."""
+import threading
+import time
+
+import pytest
+
+from tests.conftest import client
+from utils.profiler import PeriodicProfiler, ProfileStore, SamplingProfiler, profile_store, render_collapsed
+
+
+ADMIN_HEADERS = {"X-Admin-Token": "admin-secret"}
+
+
+@pytest.fixture(autouse=True)
+def admin_token(monkeypatch):
+    """Configura o token de admin e limpa os perfis guardados."""
+    monkeypatch.setenv("ADMIN_TOKEN", "admin-secret")
+    profile_store.clear()
+
+
+def _busy_work(seconds: float) -> int:
+    deadline = time.perf_counter() + seconds
+    total = 0
+    while time.perf_counter() < deadline:
+        total += sum(range(100))
+    return total
+
+
+class TestSamplingProfiler:
+    """Testes da amostragem e do formato colapsado."""
+
+    def test_collects_collapsed_stacks(self):
+        """Testa que as pilhas da thread amostrada aparecem no formato colapsado."""
+        profiler = SamplingProfiler(0.001, {threading.get_ident()}).start()
+        _busy_work(0.1)
+        samples = profiler.stop()
+
+        assert profiler.sample_count > 0
+        lines = render_collapsed(samples).splitlines()
+        assert any(line.split(" ")[0].endswith("tests.test_profiler:_busy_work") for line in lines)
+        stack, count = lines[0].rsplit(" ", 1)
+        assert ";" in stack and int(count) >= 1
+
+    def test_named_worker_threads_are_sampled(self):
+        """Testa que threads de pools pelo prefixo do nome entram na amostragem."""
+        done = threading.Event()
+        worker = threading.Thread(target=lambda: (_busy_work(0.1), done.set()), name="dashboard_0")
+        profiler = SamplingProfiler(0.001, {threading.get_ident()}, ("dashboard",)).start()
+        worker.start()
+        done.wait()
+        worker.join()
+        samples = profiler.stop()
+
+        assert any(stack.endswith("tests.test_profiler:_busy_work") for stack in samples)
+
+    def test_periodic_mode_stores_one_profile_per_window(self):
+        """Testa que o modo periódico guarda as janelas no store."""
+        store = ProfileStore()
+        profiler = PeriodicProfiler(store, interval=0.001, window=0.05)
+        profiler.start()
+        _busy_work(0.2)
+        profiler.stop()
+
+        profiles = store.list()
+        assert len(profiles) >= 2
+        assert {profile["kind"] for profile in profiles} == {"periodic"}
+        assert sum(profile["samples"] for profile in profiles) > 0
+
+
+class TestRequestProfiling:
+    """Testes do header X-Profile e de /admin/profiles."""
+
+    def test_profiles_a_single_request(self, test_category, auth_headers):
+        """Testa que a requisição com o header é perfilada e o perfil fica disponível."""
+        response = client.get("/categories/", headers={**auth_headers, "X-Profile": "admin-secret"})
+        assert response.status_code == 200
+        profile_id = response.headers["X-Profile-Id"]
+
+        [profile] = client.get("/admin/profiles", headers=ADMIN_HEADERS).json()
+        assert profile["id"] == profile_id
+        assert profile["kind"] == "request"
+        assert profile["label"] == "GET /categories/"
+
+        collapsed = client.get(f"/admin/profiles/{profile_id}", headers=ADMIN_HEADERS)
+        assert collapsed.status_code == 200
+        assert collapsed.headers["content-type"].startswith("text/plain")
+
+    def test_requests_without_header_are_not_profiled(self, test_category, auth_headers):
+        """Testa que requisições comuns não são perfiladas."""
+        response = client.get("/categories/", headers=auth_headers)
+        assert "X-Profile-Id" not in response.headers
+        assert client.get("/admin/profiles", headers=ADMIN_HEADERS).json() == []
+
+    def test_invalid_token_is_rejected(self, auth_headers):
+        """Testa que o header exige o token de admin."""
+        response = client.get("/categories/", headers={**auth_headers, "X-Profile": "wrong"})
+        assert response.status_code == 403
+        assert response.json()["detail"] == "Invalid admin token"
+
+    def test_unknown_profile(self):
+        """Testa o 404 para um perfil inexistente."""
+        assert client.get("/admin/profiles/missing", headers=ADMIN_HEADERS).status_code == 404
@@ -0,0 +1,59 @@
+"""Testes para a contagem de consultas por requisição (modo debug) e o alerta de N+1."""
+import logging
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import text
+
+from tests.conftest import client, engine
+from utils.query_budget import QueryDebugMiddleware
+
+
+def _repeating_app(times: int) -> FastAPI:
+    app = FastAPI()
+    app.add_middleware(QueryDebugMiddleware, repeat_threshold=3)
+
+    @app.get("/items/{item_id}")
+    def read_items(item_id: int):
+        with engine.connect() as connection:
+            for index in range(times):
+                connection.execute(text("SELECT :value"), {"value": index})
+        return {"ok": True}
+
+    return app
+
+
+class TestQueryDebugHeaders:
+    """Testes dos headers X-DB-Queries e X-DB-Time."""
+
+    def test_headers_in_debug_mode(self, test_category, auth_headers):
+        """Testa que as respostas trazem a contagem e o tempo das consultas."""
+        response = client.get("/categories/", headers=auth_headers)
+        assert int(response.headers["X-DB-Queries"]) >= 2
+        assert float(response.headers["X-DB-Time"]) >= 0.0
+
+    def test_counts_only_the_current_request(self, test_category, auth_headers):
+        """Testa que a contagem é por requisição, não acumulada."""
+        first = client.get("/categories/", headers=auth_headers).headers["X-DB-Queries"]
+        second = client.get("/categories/", headers=auth_headers).headers["X-DB-Queries"]
+        assert int(second) <= int(first)
+
+
+class TestNPlusOneDetection:
+    """Testes do aviso de statements repetidos."""
+
+    def test_repeated_statement_is_logged(self, caplog):
+        """Testa o aviso quando o mesmo statement se repete na requisição."""
+        with caplog.at_level(logging.WARNING, logger="utils.query_budget"):
+            response = TestClient(_repeating_app(times=4)).get("/items/1")
+        assert response.headers["X-DB-Queries"] == "4"
+        assert len(caplog.records) == 1
+        message = caplog.records[0].getMessage()
+        assert "GET /items/{item_id}" in message
+        assert "4 vezes" in message
+
+    def test_below_threshold_is_silent(self, caplog):
+        """Testa que poucas repetições não geram aviso."""
+        with caplog.at_level(logging.WARNING, logger="utils.query_budget"):
+            TestClient(_repeating_app(times=2)).get("/items/1")
+        assert caplog.records == []
@@ -0,0 +1,68 @@
+"""Testes para o caminho rápido de serialização JSON das listagens."""
+import pytest
+
+from config import settings
+from tests.conftest import client
+
+
+@pytest.fixture
+def fast_json(monkeypatch):
+    """Ativa o caminho rápido de serialização."""
+    monkeypatch.setattr(settings, "FAST_JSON_RESPONSES", True)
+
+
+def _get_both(monkeypatch, url, headers):
+    """Faz a mesma requisição pelo caminho padrão e pelo rápido."""
+    monkeypatch.setattr(settings, "FAST_JSON_RESPONSES", False)
+    standard = client.get(url, headers=headers)
+    monkeypatch.setattr(settings, "FAST_JSON_RESPONSES", True)
+    fast = client.get(url, headers=headers)
+    return standard, fast
+
+
+class TestFastJsonPath:
+    """Testa que o caminho rápido produz o mesmo conteúdo do padrão."""
+
+    def test_categories_match_standard_path(self, test_category, auth_headers, monkeypatch):
+        """Testa a listagem de categorias nos dois caminhos."""
+        standard, fast = _get_both(monkeypatch, "/categories/", auth_headers)
+        assert fast.status_code == 200
+        assert fast.headers["content-type"] == "application/json"
+        assert fast.json() == standard.json()
+        assert fast.headers["ETag"] == standard.headers["ETag"]
+
+    def test_goals_match_standard_path(self, test_user, auth_headers, monkeypatch):
+        """Testa a listagem de metas (incluindo campos calculados) nos dois caminhos."""
+        client.post("/goals/", json={
+            "user_id": test_user["id"],
+            "name": "Vacation",
+            "target_amount": 5000.0,
+            "current_amount": 1000.0,
+            "color": "#2196F3"
+        }, headers=auth_headers)
+
+        standard, fast = _get_both(monkeypatch, f"/goals/user/{test_user['id']}", auth_headers)
+        assert fast.json() == standard.json()
+        assert fast.json()[0]["percent_complete"] == 20.0
+
+    def test_transactions_page_matches_standard_path(self, test_user, test_category, auth_headers, monkeypatch):
+        """Testa a página de transações nos dois caminhos."""
+        for i in range(3):
+            client.post("/transactions/", json={
+                "description": f"Transaction {i}",
+                "amount": 10.0 * (i + 1),
+                "transaction_type": "expense",
+                "category_id": test_category["id"],
+                "date": f"2024-01-{10+i:02d}T12:00:00Z"
+            }, headers=auth_headers)
+
+        standard, fast = _get_both(monkeypatch, "/transactions/?page=1&limit=2", auth_headers)
+        assert fast.json() == standard.json()
+        assert fast.json()["total"] == 3
+        assert len(fast.json()["items"]) == 2
+
+    def test_fast_path_keeps_conditional_get(self, test_category, auth_headers, fast_json):
+        """Testa que o caminho rápido continua respondendo 304."""
+        etag = client.get("/categories/", headers=auth_headers).headers["ETag"]
+        response = client.get("/categories/", headers={**auth_headers, "If-None-Match": etag})
+        assert response.status_code == 304
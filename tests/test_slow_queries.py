@@ -0,0 +1,96 @@
+"""Testes para o log de consultas lentas e o EXPLAIN automático."""
+import pytest
+from sqlalchemy import create_engine, text
+
+from config import Base, settings
+from tests.conftest import client
+from utils.slow_queries import normalize_sql, parameters_shape, slow_query_log
+
+
+ADMIN_HEADERS = {"X-Admin-Token": "admin-secret"}
+
+
+@pytest.fixture(autouse=True)
+def slow_queries(monkeypatch):
+    """Considera qualquer consulta lenta e limpa o log (EXPLAIN só onde o teste pede)."""
+    monkeypatch.setenv("ADMIN_TOKEN", "admin-secret")
+    monkeypatch.setattr(settings, "SLOW_QUERY_THRESHOLD_MS", 0.000001)
+    monkeypatch.setattr(slow_query_log, "explain", False)
+    slow_query_log.clear()
+    yield
+    slow_query_log.clear()
+
+
+class TestNormalization:
+    """Testes da normalização do SQL e do formato dos parâmetros."""
+
+    def test_literals_and_in_lists_are_collapsed(self):
+        """Testa que variações da mesma consulta geram o mesmo texto."""
+        first = normalize_sql("SELECT * FROM transactions\n WHERE user_id = 1 AND description = 'a' AND id IN (?, ?)")
+        second = normalize_sql("SELECT * FROM transactions WHERE user_id = 42 AND description = 'it''s' AND id IN (?, ?, ?)")
+        assert first == second == "SELECT * FROM transactions WHERE user_id = ? AND description = ? AND id IN (...)"
+
+    def test_parameters_shape_has_no_values(self):
+        """Testa que apenas os tipos dos parâmetros são registrados."""
+        assert parameters_shape((1, "secret@example.com", 2.5)) == "(int, str, float)"
+        assert parameters_shape({"user_id": 1}) == "{user_id: int}"
+        assert parameters_shape([(1, "a"), (2, "b")], executemany=True) == "2 x (int, str)"
+
+
+class TestSlowQueryLog:
+    """Testes da captura das consultas lentas."""
+
+    def test_explain_is_captured_on_a_side_connection(self, tmp_path, monkeypatch):
+        """Testa que o plano de execução é capturado para a consulta lenta."""
+        engine = create_engine(f"sqlite:///{tmp_path / 'slow.db'}")
+        Base.metadata.create_all(bind=engine)
+        slow_query_log.clear()
+        monkeypatch.setattr(slow_query_log, "explain", True)
+        with engine.connect() as connection:
+            connection.execute(text("SELECT id FROM transactions WHERE description = :description"), {"description": "Lunch"})
+            connection.execute(text("SELECT id FROM transactions WHERE description = :description"), {"description": "Dinner"})
+        slow_query_log.wait()
+
+        [entry] = slow_query_log.top()
+        assert entry["sql"] == "SELECT id FROM transactions WHERE description = ?"
+        assert entry["count"] == 2
+        assert entry["routes"] == {"background": 2}
+        assert entry["parameters"] == "(str)"
+        assert any("SCAN transactions" in line for line in entry["explain"])
+        engine.dispose()
+
+    def test_below_threshold_is_ignored(self, monkeypatch, test_category, auth_headers):
+        """Testa que consultas rápidas não entram no log."""
+        monkeypatch.setattr(settings, "SLOW_QUERY_THRESHOLD_MS", 10_000)
+        slow_query_log.clear()
+        client.get("/categories/", headers=auth_headers)
+        assert slow_query_log.top() == []
+
+
+class TestSlowQueriesEndpoint:
+    """Testes para GET e DELETE /admin/slow-queries."""
+
+    def test_requires_admin_token(self):
+        """Testa que o log exige o token de admin."""
+        assert client.get("/admin/slow-queries", headers={"X-Admin-Token": "wrong"}).status_code == 403
+
+    def test_top_queries_with_routes(self, test_category, auth_headers):
+        """Testa o top-N com a rota de origem de cada consulta."""
+        client.get("/transactions/", headers=auth_headers)
+        client.get("/transactions/", headers=auth_headers)
+
+        response = client.get("/admin/slow-queries?sort_by=count&limit=50", headers=ADMIN_HEADERS)
+        assert response.status_code == 200
+        entries = response.json()
+        counts = [entry["count"] for entry in entries]
+        assert counts == sorted(counts, reverse=True)
+
+        listing = [entry for entry in entries if entry["sql"].startswith("SELECT transactions.id") and "LIMIT" in entry["sql"]]
+        assert listing[0]["routes"] == {"GET /transactions/": 2}
+        assert listing[0]["mean_ms"] > 0
+
+        assert len(client.get("/admin/slow-queries?limit=1", headers=ADMIN_HEADERS).json()) == 1
+        assert client.get("/admin/slow-queries?sort_by=name", headers=ADMIN_HEADERS).status_code == 422
+
+        assert client.delete("/admin/slow-queries", headers=ADMIN_HEADERS).status_code == 204
+        assert client.get("/admin/slow-queries", headers=ADMIN_HEADERS).json() == []
@@ -0,0 +1,69 @@
+"""Testes de tempo de importação e inicialização dos workers."""
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+from sqlalchemy import create_engine
+
+from config import warm_up_pool
+
+
+ROOT_DIR = Path(__file__).resolve().parent.parent
+
+# Orçamento de importação a frio do app (em ms); pode ser ajustado no CI
+IMPORT_TIME_BUDGET_MS = float(os.getenv("IMPORT_TIME_BUDGET_MS", 1500))
+
+
+def _import_main_with_importtime() -> dict:
+    """Importa `main` em um processo novo com `-X importtime` e retorna {módulo: tempo cumulativo em µs}."""
+    env = dict(os.environ, TESTING="true", DEBUG="true", PYTHONDONTWRITEBYTECODE="1")
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import main"],
+        cwd=ROOT_DIR,
+        env=env,
+        capture_output=True,
+        text=True,
+        timeout=60,
+    )
+    assert result.returncode == 0, result.stderr
+
+    timings = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = line.split("|")
+        if cumulative.strip().isdigit():
+            timings[name.strip()] = int(cumulative)
+    return timings
+
+
+class TestImportTime:
+    """Testes de regressão do tempo de importação."""
+
+    def test_cold_import_within_budget(self):
+        """Testa que a importação a frio do app cabe no orçamento."""
+        timings = _import_main_with_importtime()
+        assert "main" in timings
+        assert timings["main"] / 1000 < IMPORT_TIME_BUDGET_MS
+
+    def test_rarely_used_modules_are_lazy(self):
+        """Testa que módulos pesados e raramente usados não são importados no boot."""
+        timings = _import_main_with_importtime()
+        assert "bcrypt" not in timings
+        assert "jwt" not in timings
+        assert "uvicorn" not in timings
+
+
+class TestPoolWarmUp:
+    """Testes para o aquecimento do pool de conexões."""
+
+    def test_warm_up_opens_connections(self, tmp_path):
+        """Testa que o aquecimento deixa N conexões abertas no pool."""
+        engine = create_engine(f"sqlite:///{tmp_path / 'warmup.db'}", pool_size=3, max_overflow=0)
+        try:
+            assert warm_up_pool(engine, 3) == 3
+            assert engine.pool.checkedin() == 3
+            assert engine.pool.checkedout() == 0
+        finally:
+            engine.dispose()
@@ -0,0 +1,128 @@
+"""Testes para o tracing (spans por camada e propagação W3C traceparent)."""
+import json
+import threading
+
+import pytest
+
+from tests.conftest import client
+from utils.tracing import FileExporter, Span, Trace, Tracer, parse_traceparent, tracer
+
+
+TRACE_ID = "4bf92f3577b34da6a3ce929d0e0e4736"
+PARENT_ID = "00f067aa0ba902b7"
+
+
+@pytest.fixture
+def spans_file(tmp_path, monkeypatch):
+    """Liga o tracing exportando para um arquivo temporário."""
+    path = tmp_path / "traces.jsonl"
+    monkeypatch.setattr(tracer, "exporter", FileExporter(str(path)))
+    monkeypatch.setattr(tracer, "sample_rate", 1.0)
+    yield path
+    tracer.stop()
+
+
+def _spans(path):
+    # Parar o listener exporta o que está na fila antes da leitura
+    tracer.stop()
+    if not path.exists():
+        return []
+    return [json.loads(line) for line in path.read_text().splitlines()]
+
+
+def _attribute(span, key):
+    for attribute in span["attributes"]:
+        if attribute["key"] == key:
+            return next(iter(attribute["value"].values()))
+    return None
+
+
+class TestTraceparent:
+    """Testes da leitura do header traceparent."""
+
+    def test_parse_valid_header(self):
+        """Testa um traceparent válido, amostrado e não amostrado."""
+        assert parse_traceparent(f"00-{TRACE_ID}-{PARENT_ID}-01") == (TRACE_ID, PARENT_ID, True)
+        assert parse_traceparent(f"00-{TRACE_ID}-{PARENT_ID}-00") == (TRACE_ID, PARENT_ID, False)
+
+    def test_invalid_headers_are_ignored(self):
+        """Testa que headers malformados ou com ids zerados são ignorados."""
+        assert parse_traceparent(None) is None
+        assert parse_traceparent("garbage") is None
+        assert parse_traceparent(f"00-{'0' * 32}-{PARENT_ID}-01") is None
+        assert parse_traceparent(f"ff-{TRACE_ID}-{PARENT_ID}-01") is None
+
+
+class TestExport:
+    """Testes da exportação dos traces."""
+
+    def test_export_runs_off_the_calling_thread(self):
+        """Testa que finish_trace só enfileira e a escrita acontece na thread do listener."""
+        threads = []
+
+        class RecordingExporter:
+            def export(self, spans):
+                threads.append((threading.get_ident(), len(spans)))
+
+        local = Tracer(RecordingExporter())
+        trace = Trace("a" * 32, True)
+        Span(trace, "GET /").end()
+        local.finish_trace(trace)
+        local.stop()
+
+        [(thread_id, count)] = threads
+        assert thread_id != threading.get_ident()
+        assert count == 1
+
+
+class TestRequestTracing:
+    """Testes dos spans gerados por uma requisição."""
+
+    def test_nested_spans_for_each_layer(self, test_category, auth_headers, spans_file):
+        """Testa a árvore rota → controller → service → SQL continuando o trace recebido."""
+        response = client.get("/transactions/", headers={**auth_headers, "traceparent": f"00-{TRACE_ID}-{PARENT_ID}-01"})
+        assert response.status_code == 200
+
+        spans = _spans(spans_file)
+        assert {span["traceId"] for span in spans} == {TRACE_ID}
+        by_id = {span["spanId"]: span for span in spans}
+
+        [root] = [span for span in spans if _attribute(span, "code.layer") == "route"]
+        assert root["name"] == "GET /transactions/"
+        assert root["parentSpanId"] == PARENT_ID
+        assert _attribute(root, "http.status_code") == "200"
+        assert response.headers["traceparent"] == f"00-{TRACE_ID}-{root['spanId']}-01"
+
+        sql = next(span for span in spans if _attribute(span, "code.layer") == "sql" and "FROM transactions" in _attribute(span, "db.statement"))
+        chain = []
+        span = sql
+        while span["spanId"] != root["spanId"]:
+            chain.append(_attribute(span, "code.layer"))
+            span = by_id[span["parentSpanId"]]
+        assert chain[0] == "sql"
+        assert chain[-1] == "controller"
+        assert "service" in chain
+
+    def test_new_trace_is_generated(self, test_category, auth_headers, spans_file):
+        """Testa que uma requisição sem traceparent inicia um trace novo."""
+        response = client.get("/categories/", headers=auth_headers)
+        trace_id, span_id, sampled = parse_traceparent(response.headers["traceparent"])
+        assert sampled
+        assert trace_id != TRACE_ID
+        assert span_id in {span["spanId"] for span in _spans(spans_file)}
+
+    def test_sample_rate_and_parent_decision(self, monkeypatch, test_category, auth_headers, spans_file):
+        """Testa que a taxa vale para traces novos e o traceparent recebido decide a amostragem."""
+        monkeypatch.setattr(tracer, "sample_rate", 0.0)
+
+        response = client.get("/categories/", headers=auth_headers)
+        assert response.headers["traceparent"].endswith("-00")
+        assert _spans(spans_file) == []
+
+        client.get("/categories/", headers={**auth_headers, "traceparent": f"00-{TRACE_ID}-{PARENT_ID}-01"})
+        assert {span["traceId"] for span in _spans(spans_file)} == {TRACE_ID}
+
+    def test_disabled_without_exporter(self, test_category, auth_headers):
+        """Testa que, sem exporter, nada é propagado nem exportado."""
+        response = client.get("/categories/", headers={**auth_headers, "traceparent": f"00-{TRACE_ID}-{PARENT_ID}-01"})
+        assert "traceparent" not in response.headers
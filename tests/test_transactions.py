@@ -299,3 +299,62 @@ class TestBalanceUpdates:
         balance_data = balance_response.json()
         assert balance_data["total_expenses"] == 0.0
         assert balance_data["current_balance"] == 0.0
+
+
+class TestBalanceConditionalGet:
+    """Testes para GET condicional (ETag) do balance."""
+
+    def test_balance_not_modified_until_next_transaction(self, test_user, test_category, auth_headers, query_log):
+        """Testa 304 no balance e nova ETag após uma transação."""
+        transaction = {
+            "description": "Salary",
+            "amount": 5000.00,
+            "transaction_type": "income",
+            "category_id": test_category["id"],
+            "date": "2024-01-01T00:00:00Z"
+        }
+        client.post("/transactions/", json=transaction, headers=auth_headers)
+        etag = client.get(f"/balances/{test_user['id']}", headers=auth_headers).headers["ETag"]
+
+        query_log.clear()
+        response = client.get(f"/balances/{test_user['id']}", headers={**auth_headers, "If-None-Match": etag})
+        assert response.status_code == 304
+        assert len(query_log) == 2
+        assert not any("FROM balances" in statement for statement in query_log)
+
+        client.post("/transactions/", json=transaction, headers=auth_headers)
+        response = client.get(f"/balances/{test_user['id']}", headers={**auth_headers, "If-None-Match": etag})
+        assert response.status_code == 200
+        assert response.json()["total_income"] == 10000.00
+
+
+class TestTransactionQueryBudget:
+    """Limites de statements por endpoint (pegam regressões como N+1)."""
+
+    def _payload(self, category_id, transaction_type="expense"):
+        return {
+            "description": "Lunch",
+            "amount": 25.0,
+            "transaction_type": transaction_type,
+            "category_id": category_id,
+            "date": "2024-01-15T10:30:00Z"
+        }
+
+    def test_write_paths(self, test_user, test_category, auth_headers, assert_max_queries):
+        """Testa criação, atualização e remoção dentro do orçamento de statements."""
+        client.post("/transactions/", json=self._payload(test_category["id"]), headers=auth_headers)
+
+        # Autenticação, INSERT, balance (SELECT + agregado + UPDATE) e versão
+        with assert_max_queries(6):
+            transaction = client.post("/transactions/", json=self._payload(test_category["id"]), headers=auth_headers).json()
+        with assert_max_queries(7):
+            client.put(f"/transactions/{transaction['id']}", json={"amount": 30.0}, headers=auth_headers)
+        with assert_max_queries(7):
+            client.delete(f"/transactions/{transaction['id']}", headers=auth_headers)
+
+    def test_list(self, test_user, test_category, auth_headers, assert_max_queries):
+        """Testa a listagem paginada."""
+        for _ in range(5):
+            client.post("/transactions/", json=self._payload(test_category["id"]), headers=auth_headers)
+        with assert_max_queries(3):
+            client.get("/transactions/", headers=auth_headers)
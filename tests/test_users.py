@@ -1,5 +1,18 @@
 """Testes para rotas de usuários."""
-from tests.conftest import client
+import csv
+import io
+import json
+import zipfile
+
+from config import settings
+from models.categories import Category, CategoryClosure
+from models.purge_jobs import PurgeJob
+from models.transactions import Transaction
+from models.users import User
+from services.export_service import ExportService
+from services.purge_service import PurgeService
+from services.uers_service import UserService
+from tests.conftest import client, TestingSessionLocal
 
 
 class TestUserCreation:
@@ -26,6 +39,29 @@ class TestUserCreation:
         assert "created_at" in data
         assert "hashed_password" not in data  # Não deve retornar senha
 
+    def test_create_user_with_default_categories(self):
+        """Testa o seed das categorias padrão no cadastro."""
+        from services.categories_service import DEFAULT_CATEGORIES
+
+        client.post(
+            "/users/",
+            json={
+                "email": "test@example.com",
+                "first_name": "John",
+                "last_name": "Doe",
+                "password": "SecurePass123!",
+                "confirm_password": "SecurePass123!",
+                "seed_default_categories": True
+            }
+        )
+        token = client.post(
+            "/auth/login",
+            data={"username": "test@example.com", "password": "SecurePass123!"}
+        ).json()["access_token"]
+
+        response = client.get("/categories/", headers={"Authorization": f"Bearer {token}"})
+        assert {category["name"] for category in response.json()} == {category.name for category in DEFAULT_CATEGORIES}
+
     def test_create_user_password_mismatch(self):
         """Testa erro quando senhas não conferem."""
         response = client.post(
@@ -171,9 +207,10 @@ class TestUserDeletion:
         """Testa deleção de usuário com sucesso."""
         user_id = test_user["id"]
         
-        # Deleta usuário
+        # Deleta usuário (a remoção dos dados roda em segundo plano)
         delete_response = client.delete(f"/users/{user_id}", headers=auth_headers)
-        assert delete_response.status_code == 204
+        assert delete_response.status_code == 202
+        assert delete_response.json()["status"] == "pending"
 
     def test_delete_nonexistent_user(self, auth_headers):
         """Testa erro ao deletar usuário inexistente."""
@@ -187,7 +224,7 @@ class TestUserDeletion:
         
         # Primeira deleção
         delete_response1 = client.delete(f"/users/{user_id}", headers=auth_headers)
-        assert delete_response1.status_code == 204
+        assert delete_response1.status_code == 202
         
         # Segunda deleção - agora retorna 401 porque o usuário deletado não pode usar o token
         delete_response2 = client.delete(f"/users/{user_id}", headers=auth_headers)
@@ -289,3 +326,128 @@ class TestHealthEndpoints:
         # Para testes, o endpoint de health requer admin token
         # Como não configuramos ADMIN_TOKEN nos testes, esperamos 422 ou 403
         assert response.status_code in [200, 403, 422]
+
+
+class TestUserPurge:
+    """Testes para a remoção da conta em segundo plano."""
+
+    def _populate(self, test_user, auth_headers):
+        parent = client.post("/categories/", json={"name": "Home", "category_type": "expense", "color": "#795548"}, headers=auth_headers).json()
+        child = client.post("/categories/", json={
+            "name": "Rent", "category_type": "expense", "color": "#795548", "parent_id": parent["id"]
+        }, headers=auth_headers).json()
+        client.post("/transactions/bulk", json={"transactions": [{
+            "description": f"Rent {index}",
+            "amount": 10.0,
+            "transaction_type": "expense",
+            "category_id": child["id"],
+            "date": "2024-01-10T12:00:00Z"
+        } for index in range(5)]}, headers=auth_headers)
+        client.post("/goals/", json={
+            "user_id": test_user["id"],
+            "name": "Vacation",
+            "target_amount": 1000.0,
+            "color": "#2196F3"
+        }, headers=auth_headers)
+
+    def test_purge_removes_all_user_data(self, test_user, auth_headers, monkeypatch):
+        """Testa que o job remove todos os dados em lotes e registra o progresso."""
+        monkeypatch.setenv("ADMIN_TOKEN", "admin-secret")
+        monkeypatch.setattr(settings, "PURGE_CHUNK_SIZE", 2)
+        self._populate(test_user, auth_headers)
+
+        job = client.delete(f"/users/{test_user['id']}", headers=auth_headers).json()
+
+        response = client.get(f"/admin/purge-jobs/{job['id']}", headers={"X-Admin-Token": "admin-secret"})
+        assert response.status_code == 200
+        finished = response.json()
+        assert finished["status"] == "completed"
+        assert finished["finished_at"] is not None
+        # 5 transações, 1 meta, 2 categorias, 1 balance, versões e o usuário
+        assert finished["deleted_rows"] >= 10
+
+        with TestingSessionLocal() as db:
+            assert db.query(User).filter(User.id == test_user["id"]).count() == 0
+            assert db.query(Transaction).count() == 0
+            assert db.query(Category).count() == 0
+            assert db.query(CategoryClosure).count() == 0
+
+    def test_purge_deletes_in_chunks(self, test_user, auth_headers, monkeypatch, query_log):
+        """Testa que as transações são removidas em vários DELETEs limitados."""
+        monkeypatch.setattr(settings, "PURGE_CHUNK_SIZE", 2)
+        self._populate(test_user, auth_headers)
+
+        query_log.clear()
+        client.delete(f"/users/{test_user['id']}", headers=auth_headers)
+        deletes = [statement for statement in query_log if statement.startswith("DELETE FROM transactions")]
+        assert len(deletes) == 3
+
+    def test_account_is_disabled_before_purge(self, test_user, auth_headers):
+        """Testa que a conta é desativada já na requisição, antes do job rodar."""
+        with TestingSessionLocal() as db:
+            job = UserService(db).delete_user(test_user["id"])
+            assert job.status == "pending"
+            assert db.query(User).filter(User.id == test_user["id"]).first().deleted_at is not None
+
+            PurgeService(db).run(job.id)
+            assert db.query(PurgeJob).filter(PurgeJob.id == job.id).first().status == "completed"
+
+    def test_unknown_purge_job(self, monkeypatch):
+        """Testa 404 para job inexistente."""
+        monkeypatch.setenv("ADMIN_TOKEN", "admin-secret")
+        response = client.get("/admin/purge-jobs/999", headers={"X-Admin-Token": "admin-secret"})
+        assert response.status_code == 404
+
+
+class TestUserExport:
+    """Testes para a exportação da conta em ZIP."""
+
+    def _add_transactions(self, category_id, auth_headers, count):
+        client.post("/transactions/bulk", json={"transactions": [{
+            "description": f"Lunch {index}",
+            "amount": 10.0 + index,
+            "transaction_type": "expense",
+            "category_id": category_id,
+            "date": "2024-01-10T12:00:00Z"
+        } for index in range(count)]}, headers=auth_headers)
+
+    def test_export_contains_all_members(self, test_user, test_category, auth_headers):
+        """Testa o conteúdo do arquivo exportado."""
+        self._add_transactions(test_category["id"], auth_headers, 3)
+
+        response = client.get("/users/me/export", headers=auth_headers)
+        assert response.status_code == 200
+        assert response.headers["content-type"] == "application/zip"
+        assert "attachment" in response.headers["content-disposition"]
+
+        archive = zipfile.ZipFile(io.BytesIO(response.content))
+        assert archive.testzip() is None
+        assert set(archive.namelist()) == {
+            "user.json", "balance.json", "categories.csv", "goals.csv",
+            "goal_contributions.csv", "funding_rules.csv", "transactions.csv"
+        }
+        assert json.loads(archive.read("user.json"))["email"] == test_user["email"]
+        assert json.loads(archive.read("balance.json"))["total_expenses"] == 33.0
+
+        rows = list(csv.DictReader(io.StringIO(archive.read("transactions.csv").decode())))
+        assert [row["description"] for row in rows] == ["Lunch 0", "Lunch 1", "Lunch 2"]
+        assert rows[0]["date"] == "2024-01-10T12:00:00"
+        categories = list(csv.DictReader(io.StringIO(archive.read("categories.csv").decode())))
+        assert categories[0]["name"] == "Food"
+
+    def test_export_is_streamed_in_chunks(self, test_user, test_category, auth_headers, monkeypatch):
+        """Testa que o ZIP é gerado aos pedaços, um por lote do cursor."""
+        monkeypatch.setattr(settings, "EXPORT_CHUNK_SIZE", 2)
+        self._add_transactions(test_category["id"], auth_headers, 6)
+
+        with TestingSessionLocal() as db:
+            chunks = list(ExportService(db).iter_zip(test_user["id"]))
+
+        # 3 lotes de transações, além dos demais membros e do diretório central
+        assert len([chunk for chunk in chunks if chunk]) > 5
+        archive = zipfile.ZipFile(io.BytesIO(b"".join(chunks)))
+        assert len(archive.read("transactions.csv").decode().splitlines()) == 7
+
+    def test_export_requires_auth(self):
+        """Testa que a exportação exige autenticação."""
+        assert client.get("/users/me/export").status_code == 401
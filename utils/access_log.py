@@ -0,0 +1,115 @@
+"""Access log estruturado em JSON, escrito por uma thread própria (QueueHandler/QueueListener)."""
+import json
+import logging
+import queue
+import random
+import sys
+import time
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
+from typing import Optional
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from utils.metrics import RequestDbStats, current_db_stats
+from utils.tracing import current_span
+
+
+logger = logging.getLogger("access")
+
+
+class JsonFormatter(logging.Formatter):
+    """Formata o registro do access log (record.access) como uma linha JSON."""
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {"timestamp": datetime.fromtimestamp(record.created, timezone.utc).isoformat()}
+        entry.update(getattr(record, "access", None) or {"message": record.getMessage()})
+        return json.dumps(entry, separators=(",", ":"), default=str)
+
+
+def setup_access_log(path: str = "") -> QueueListener:
+    """
+    Liga o logger `access` a uma fila: a requisição só enfileira o registro e
+    a escrita (em `path`, ou stdout se vazio) acontece na thread do
+    QueueListener, nunca no event loop. Retorna o listener já iniciado.
+    """
+    handler = logging.FileHandler(path) if path else logging.StreamHandler(sys.stdout)
+    handler.setFormatter(JsonFormatter())
+
+    records: queue.SimpleQueue = queue.SimpleQueue()
+    for existing in list(logger.handlers):
+        logger.removeHandler(existing)
+    logger.addHandler(QueueHandler(records))
+    logger.setLevel(logging.INFO)
+    logger.propagate = False
+
+    listener = QueueListener(records, handler, respect_handler_level=False)
+    listener.start()
+    return listener
+
+
+class AccessLogMiddleware:
+    """
+    Middleware ASGI que registra uma linha por requisição: método, rota
+    (template), status, latência, tempo e quantidade de consultas ao banco,
+    bytes enviados, usuário e trace.
+
+    Respostas 2xx das rotas em `sampled_routes` (todas, se vazio) são
+    registradas com probabilidade `sample_rate`, informada na própria linha
+    para que as contagens possam ser reponderadas; erros sempre entram.
+    """
+    def __init__(self, app: ASGIApp, sample_rate: float = 1.0, sampled_routes: Optional[set[str]] = None):
+        self.app = app
+        self.sample_rate = sample_rate
+        self.sampled_routes = sampled_routes or set()
+
+    def _sample_rate(self, route: str, status: int) -> float:
+        if 200 <= status < 300 and (not self.sampled_routes or route in self.sampled_routes):
+            return self.sample_rate
+        return 1.0
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = current_db_stats.get()
+        token = None
+        if stats is None:
+            stats = RequestDbStats()
+            token = current_db_stats.set(stats)
+
+        status = 500
+        sent = 0
+        start = time.perf_counter()
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status, sent
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            elif message["type"] == "http.response.body":
+                sent += len(message.get("body", b""))
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            latency = time.perf_counter() - start
+            if token is not None:
+                current_db_stats.reset(token)
+
+            route = getattr(scope.get("route"), "path", "unmatched")
+            rate = self._sample_rate(route, status)
+            if rate >= 1.0 or random.random() < rate:
+                span = current_span.get()
+                logger.info("access", extra={"access": {
+                    "method": scope["method"],
+                    "route": route,
+                    "path": scope["path"],
+                    "status": status,
+                    "latency_ms": round(latency * 1000, 3),
+                    "db_queries": stats.queries,
+                    "db_time_ms": round(stats.seconds * 1000, 3),
+                    "bytes": sent,
+                    "user_id": scope.get("state", {}).get("user_id"),
+                    "client": (scope.get("client") or (None,))[0],
+                    "trace_id": span.trace.trace_id if span is not None else None,
+                    "sample_rate": rate,
+                }})
@@ -0,0 +1,272 @@
+"""Cache de respostas por usuário com backends plugáveis (memória LRU ou Redis)."""
+import socket
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Optional
+from urllib.parse import urlparse
+from config import settings
+
+
+class CacheBackend(ABC):
+    """
+    Interface dos backends. Cada chave agrupa as variantes (campos) de um
+    recurso de um usuário, para que a invalidação seja uma única remoção.
+    """
+    @abstractmethod
+    def get(self, key: str, field: str) -> Optional[bytes]:
+        ...
+
+    @abstractmethod
+    def set(self, key: str, field: str, value: bytes, ttl: int) -> None:
+        ...
+
+    @abstractmethod
+    def delete(self, key: str) -> None:
+        ...
+
+    @abstractmethod
+    def clear(self) -> None:
+        ...
+
+
+class MemoryCacheBackend(CacheBackend):
+    """
+    Backend LRU em memória do processo, limitado por número de chaves.
+    """
+    def __init__(self, max_entries: int = 10000):
+        self.max_entries = max_entries
+        self._entries: OrderedDict[str, tuple[float, dict[str, bytes]]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str, field: str) -> Optional[bytes]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, fields = entry
+            if expires_at < time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return fields.get(field)
+
+    def set(self, key: str, field: str, value: bytes, ttl: int) -> None:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] < time.monotonic():
+                entry = (time.monotonic() + ttl, {})
+                self._entries[key] = entry
+            entry[1][field] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+class RedisError(Exception):
+    """Erro retornado pelo servidor Redis."""
+
+
+class RedisCacheBackend(CacheBackend):
+    """
+    Backend que fala o protocolo do Redis (RESP) diretamente via socket.
+    Cada chave é um hash (HSET/HGET) com expiração, compartilhado entre os workers.
+    """
+    SCAN_COUNT = 500
+
+    def __init__(self, url: str, key_prefix: str = "expense-tracker:", timeout: float = 0.5):
+        parsed = urlparse(url)
+        self.host = parsed.hostname or "localhost"
+        self.port = parsed.port or 6379
+        self.password = parsed.password
+        self.db = int(parsed.path.lstrip("/") or 0)
+        self.key_prefix = key_prefix
+        self.timeout = timeout
+        self._socket = None
+        self._reader = None
+        self._lock = threading.Lock()
+
+    def _connect(self) -> None:
+        self._socket = socket.create_connection((self.host, self.port), timeout=self.timeout)
+        self._reader = self._socket.makefile("rb")
+        if self.password:
+            self._send("AUTH", self.password)
+        if self.db:
+            self._send("SELECT", self.db)
+
+    def _disconnect(self) -> None:
+        if self._socket is not None:
+            try:
+                self._reader.close()
+                self._socket.close()
+            except OSError:
+                pass
+        self._socket = None
+        self._reader = None
+
+    def _send(self, *args):
+        parts = [f"*{len(args)}\r\n".encode()]
+        for arg in args:
+            data = arg if isinstance(arg, bytes) else str(arg).encode()
+            parts.append(f"${len(data)}\r\n".encode() + data + b"\r\n")
+        self._socket.sendall(b"".join(parts))
+        return self._read_reply()
+
+    def _read_reply(self):
+        line = self._reader.readline()
+        if not line:
+            raise ConnectionError("Connection closed by Redis server")
+        prefix, payload = line[:1], line[1:-2]
+        if prefix == b"+":
+            return payload.decode()
+        if prefix == b"-":
+            raise RedisError(payload.decode())
+        if prefix == b":":
+            return int(payload)
+        if prefix == b"$":
+            length = int(payload)
+            if length == -1:
+                return None
+            data = self._reader.read(length + 2)
+            return data[:-2]
+        if prefix == b"*":
+            length = int(payload)
+            if length == -1:
+                return None
+            return [self._read_reply() for _ in range(length)]
+        raise RedisError(f"Unexpected reply: {line!r}")
+
+    def execute(self, *args):
+        """Executa um comando, reconectando uma vez se a conexão caiu."""
+        with self._lock:
+            for attempt in range(2):
+                try:
+                    if self._socket is None:
+                        self._connect()
+                    return self._send(*args)
+                except (OSError, ConnectionError):
+                    self._disconnect()
+                    if attempt:
+                        raise
+
+    def get(self, key: str, field: str) -> Optional[bytes]:
+        return self.execute("HGET", self.key_prefix + key, field)
+
+    def set(self, key: str, field: str, value: bytes, ttl: int) -> None:
+        key = self.key_prefix + key
+        self.execute("HSET", key, field, value)
+        self.execute("EXPIRE", key, ttl)
+
+    def delete(self, key: str) -> None:
+        self.execute("DEL", self.key_prefix + key)
+
+    def clear(self) -> None:
+        """
+        Remove as chaves do prefixo em páginas de SCAN_COUNT, com SCAN em vez
+        de KEYS, que bloquearia o Redis percorrendo o keyspace inteiro.
+        """
+        cursor = b"0"
+        while True:
+            cursor, keys = self.execute("SCAN", cursor, "MATCH", self.key_prefix + "*", "COUNT", self.SCAN_COUNT)
+            if keys:
+                self.execute("DEL", *keys)
+            if cursor == b"0":
+                return
+
+
+class ResponseCache:
+    """
+    Cache de leituras por usuário. As chaves são `recurso:user_id` e as
+    variantes (versão do recurso, filtros) são campos dentro da chave.
+
+    Falhas do backend nunca derrubam a requisição: contam como miss.
+    """
+    def __init__(self, backend: Optional[CacheBackend], ttl: int = 300):
+        self.backend = backend
+        self.ttl = ttl
+        self._stats: dict[str, dict[str, int]] = {}
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        return self.backend is not None
+
+    def _count(self, resource: str, outcome: str) -> None:
+        with self._lock:
+            counters = self._stats.setdefault(resource, {"hits": 0, "misses": 0, "errors": 0})
+            counters[outcome] += 1
+
+    def get(self, resource: str, user_id: int, variant: str) -> Optional[bytes]:
+        """Recupera uma variante do cache (None em caso de miss)."""
+        if not self.enabled:
+            return None
+        try:
+            value = self.backend.get(f"{resource}:{user_id}", variant)
+        except Exception:
+            self._count(resource, "errors")
+            value = None
+        self._count(resource, "hits" if value is not None else "misses")
+        return value
+
+    def set(self, resource: str, user_id: int, variant: str, value: bytes) -> None:
+        """Armazena uma variante no cache."""
+        if not self.enabled:
+            return
+        try:
+            self.backend.set(f"{resource}:{user_id}", variant, value, self.ttl)
+        except Exception:
+            self._count(resource, "errors")
+
+    def invalidate(self, resource: str, user_id: int) -> None:
+        """Remove todas as variantes de um recurso do usuário."""
+        if not self.enabled:
+            return
+        try:
+            self.backend.delete(f"{resource}:{user_id}")
+        except Exception:
+            self._count(resource, "errors")
+
+    def clear(self) -> None:
+        """Limpa o cache e as estatísticas."""
+        with self._lock:
+            self._stats.clear()
+        if not self.enabled:
+            return
+        try:
+            self.backend.clear()
+        except Exception:
+            # Zerado antes para que a falha continue visível em stats()
+            self._count("*", "errors")
+
+    def stats(self) -> dict:
+        """Retorna hits, misses, erros e hit ratio por recurso."""
+        with self._lock:
+            stats = {resource: dict(counters) for resource, counters in self._stats.items()}
+        for counters in stats.values():
+            lookups = counters["hits"] + counters["misses"]
+            counters["hit_ratio"] = round(counters["hits"] / lookups, 4) if lookups else 0.0
+        return {
+            "backend": type(self.backend).__name__ if self.backend else None,
+            "resources": stats,
+        }
+
+
+def build_backend() -> Optional[CacheBackend]:
+    """Cria o backend configurado em CACHE_BACKEND ('memory', 'redis' ou 'none')."""
+    if settings.CACHE_BACKEND == "memory":
+        return MemoryCacheBackend(max_entries=settings.CACHE_MAX_ENTRIES)
+    if settings.CACHE_BACKEND == "redis":
+        return RedisCacheBackend(settings.REDIS_URL)
+    return None
+
+
+response_cache = ResponseCache(build_backend(), ttl=settings.CACHE_TTL_SECONDS)
@@ -0,0 +1,216 @@
+"""Middleware de compressão de respostas (gzip e, se instalados, brotli/zstd)."""
+import zlib
+from typing import Optional
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+try:
+    import brotli
+except ImportError:  # dependência opcional
+    brotli = None
+
+try:
+    import zstandard
+except ImportError:  # dependência opcional
+    zstandard = None
+
+
+# Tipos que nunca são comprimidos: binários já comprimidos e streams de eventos
+DEFAULT_EXCLUDED_CONTENT_TYPES = (
+    "text/event-stream",
+    "application/zip",
+    "application/gzip",
+    "application/octet-stream",
+    "image/",
+    "audio/",
+    "video/",
+)
+
+
+def default_thresholds(minimum_size: int) -> dict[str, int]:
+    """
+    Tamanho mínimo (bytes) por tipo de conteúdo. Tipos fora do mapa não são
+    comprimidos. JSON e CSV compactam muito bem; HTML/texto curto quase nada.
+    """
+    return {
+        "application/json": minimum_size,
+        "text/csv": minimum_size,
+        "application/xml": minimum_size,
+        "text/": minimum_size * 2,
+    }
+
+
+class StreamCompressor:
+    """Compressor incremental para um encoding."""
+
+    def __init__(self, encoding: str, level: int):
+        self.encoding = encoding
+        if encoding == "gzip":
+            self._compressor = zlib.compressobj(level, zlib.DEFLATED, 31)
+        elif encoding == "br":
+            self._compressor = brotli.Compressor(quality=min(level, 11))
+        elif encoding == "zstd":
+            self._compressor = zstandard.ZstdCompressor(level=level).compressobj()
+
+    def compress(self, data: bytes) -> bytes:
+        if self.encoding == "br":
+            return self._compressor.process(data)
+        return self._compressor.compress(data)
+
+    def flush(self) -> bytes:
+        if self.encoding == "br":
+            return self._compressor.finish()
+        return self._compressor.flush()
+
+
+def available_encodings() -> list[str]:
+    """Encodings suportados, em ordem de preferência do servidor."""
+    encodings = []
+    if zstandard is not None:
+        encodings.append("zstd")
+    if brotli is not None:
+        encodings.append("br")
+    encodings.append("gzip")
+    return encodings
+
+
+def negotiate_encoding(accept_encoding: str, supported: list[str]) -> Optional[str]:
+    """
+    Escolhe o encoding pelo header Accept-Encoding (com q-values). Em empate,
+    vale a ordem de preferência do servidor. Retorna None para identity.
+    """
+    accepted = {}
+    for item in accept_encoding.split(","):
+        name, _, params = item.strip().partition(";")
+        name = name.strip().lower()
+        if not name:
+            continue
+        quality = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                quality = float(params[2:])
+            except ValueError:
+                quality = 0.0
+        accepted[name] = quality
+
+    best, best_quality = None, 0.0
+    for encoding in supported:
+        quality = accepted.get(encoding, accepted.get("*", 0.0))
+        if quality > best_quality:
+            best, best_quality = encoding, quality
+    return best
+
+
+class CompressionMiddleware:
+    """
+    Comprime respostas conforme Accept-Encoding, respeitando um tamanho mínimo
+    por tipo de conteúdo. Respostas com Content-Encoding já definido ou de tipos
+    excluídos (binários, streams já comprimidos) passam intactas. Respostas em
+    streaming de tipos compressíveis são comprimidas incrementalmente.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        minimum_size: int = 1024,
+        level: int = 6,
+        thresholds: Optional[dict[str, int]] = None,
+        excluded_content_types: tuple = DEFAULT_EXCLUDED_CONTENT_TYPES,
+    ) -> None:
+        self.app = app
+        self.level = level
+        self.thresholds = thresholds if thresholds is not None else default_thresholds(minimum_size)
+        self.excluded_content_types = excluded_content_types
+        self.supported = available_encodings()
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        encoding = negotiate_encoding(Headers(scope=scope).get("accept-encoding", ""), self.supported)
+        responder = _CompressionResponder(self, encoding, send)
+        await self.app(scope, receive, responder.send)
+
+    def threshold_for(self, content_type: str) -> Optional[int]:
+        """Tamanho mínimo para o tipo (None se o tipo não deve ser comprimido)."""
+        content_type = content_type.split(";")[0].strip().lower()
+        if not content_type or content_type.startswith(self.excluded_content_types):
+            return None
+        best_prefix = None
+        for prefix in self.thresholds:
+            if content_type.startswith(prefix) and (best_prefix is None or len(prefix) > len(best_prefix)):
+                best_prefix = prefix
+        return self.thresholds[best_prefix] if best_prefix is not None else None
+
+
+class _CompressionResponder:
+    """Estado de compressão de uma única resposta."""
+
+    def __init__(self, middleware: CompressionMiddleware, encoding: Optional[str], send: Send):
+        self.middleware = middleware
+        self.encoding = encoding
+        self._send = send
+        self.initial_message: Message = {}
+        self.threshold: Optional[int] = None
+        self.compressor: Optional[StreamCompressor] = None
+        self.passthrough = False
+        self.started = False
+
+    async def send(self, message: Message) -> None:
+        if message["type"] == "http.response.start":
+            self.initial_message = message
+            headers = Headers(raw=message["headers"])
+            self.threshold = self.middleware.threshold_for(headers.get("content-type", ""))
+            self.passthrough = self.threshold is None or "content-encoding" in headers
+            return
+
+        if message["type"] != "http.response.body":
+            await self._send(message)
+            return
+
+        if self.passthrough:
+            await self._start()
+            await self._send(message)
+            return
+
+        body = message.get("body", b"")
+        more_body = message.get("more_body", False)
+
+        if not self.started:
+            if not more_body and len(body) < self.threshold:
+                # Resposta pequena: comprimir não compensa
+                await self._start()
+                await self._send(message)
+                return
+
+            headers = MutableHeaders(raw=self.initial_message["headers"])
+            headers.add_vary_header("Accept-Encoding")
+            if self.encoding is None:
+                self.passthrough = True
+                await self._start()
+                await self._send(message)
+                return
+
+            self.compressor = StreamCompressor(self.encoding, self.middleware.level)
+            headers["Content-Encoding"] = self.encoding
+            if more_body:
+                del headers["Content-Length"]
+            else:
+                body = self.compressor.compress(body) + self.compressor.flush()
+                headers["Content-Length"] = str(len(body))
+                await self._start()
+                await self._send({"type": "http.response.body", "body": body})
+                return
+            await self._start()
+
+        chunk = self.compressor.compress(body)
+        if not more_body:
+            chunk += self.compressor.flush()
+        await self._send({"type": "http.response.body", "body": chunk, "more_body": more_body})
+
+    async def _start(self) -> None:
+        if not self.started:
+            self.started = True
+            await self._send(self.initial_message)
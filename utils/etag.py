@@ -0,0 +1,29 @@
+"""Utilitários para ETags fracas e GET condicional."""
+from typing import Optional
+from fastapi.responses import Response
+
+
+def build_etag(resource: str, user_id: int, version: int | str) -> str:
+    """Monta uma ETag fraca a partir do contador de alterações do usuário."""
+    return f'W/"{resource}-{user_id}-{version}"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """
+    Verifica se o header If-None-Match contém a ETag (comparação fraca, RFC 9110).
+    """
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+
+    def _opaque(tag: str) -> str:
+        tag = tag.strip()
+        return tag[2:] if tag.startswith("W/") else tag
+
+    return any(_opaque(candidate) == _opaque(etag) for candidate in if_none_match.split(","))
+
+
+def not_modified(etag: str) -> Response:
+    """Resposta 304 sem corpo."""
+    return Response(status_code=304, headers={"ETag": etag})
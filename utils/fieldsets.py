@@ -0,0 +1,90 @@
+"""Fieldsets esparsos (?fields=): seleção de colunas e schema de saída reduzido."""
+from functools import lru_cache
+from typing import Optional
+from fastapi import HTTPException
+from pydantic import BaseModel, ConfigDict, TypeAdapter, create_model
+
+
+class Fieldset:
+    """
+    Subconjunto de campos de um schema de saída. Sabe quais colunas do model
+    ORM selecionar e valida as linhas contra um schema com apenas esses campos.
+
+    Campos calculados (computed_field) podem ser pedidos: nesse caso todas as
+    colunas do schema são carregadas para calculá-los. Campos do schema sem
+    coluna no model (`derived`, preenchidos pelo service, como a projeção das
+    metas) também carregam todas as colunas; o service monta o schema completo
+    e o reduz com `validate_models`.
+    """
+    def __init__(self, model, schema: type[BaseModel], fields: tuple[str, ...]):
+        self.fields = fields
+        self.computed = [name for name in fields if name in schema.model_computed_fields]
+        self.derived = [name for name in fields if name in schema.model_fields and not hasattr(model, name)]
+        self.schema = schema
+
+        needed = list(schema.model_fields) if self.computed or self.derived else list(fields)
+        self.columns = [getattr(model, name) for name in needed if hasattr(model, name)]
+
+        definitions = {}
+        for name in fields:
+            if name in schema.model_fields:
+                field = schema.model_fields[name]
+                definitions[name] = (field.annotation, field)
+            else:
+                definitions[name] = (schema.model_computed_fields[name].return_type, ...)
+        partial = create_model(
+            f"{schema.__name__}Partial",
+            __config__=ConfigDict(from_attributes=True),
+            **definitions
+        )
+        self._adapter = TypeAdapter(list[partial])
+
+    def validate(self, rows) -> list[BaseModel]:
+        """Valida linhas (Row) selecionadas com `columns` contra o schema reduzido."""
+        if not self.computed and not self.derived:
+            return self._adapter.validate_python(rows, from_attributes=True)
+
+        items = []
+        for row in rows:
+            values = row._asdict()
+            full = self.schema.model_construct(**values)
+            items.append({name: values[name] if name in values else getattr(full, name) for name in self.fields})
+        return self._adapter.validate_python(items)
+
+    def validate_models(self, items: list[BaseModel]) -> list[BaseModel]:
+        """Reduz objetos do schema completo (já montados pelo service) aos campos pedidos."""
+        return self._adapter.validate_python(items, from_attributes=True)
+
+    def dump_json(self, rows) -> bytes:
+        """Valida as linhas e serializa direto para JSON."""
+        return self._adapter.dump_json(self.validate(rows))
+
+    @property
+    def cache_variant(self) -> str:
+        """Identificador do fieldset para compor a variante do cache."""
+        return ",".join(self.fields)
+
+
+@lru_cache(maxsize=256)
+def _build_fieldset(model, schema: type[BaseModel], fields: tuple[str, ...]) -> Fieldset:
+    return Fieldset(model, schema, fields)
+
+
+def parse_fieldset(fields: Optional[str], model, schema: type[BaseModel]) -> Optional[Fieldset]:
+    """
+    Converte o parâmetro `fields` (lista separada por vírgulas) em um Fieldset.
+    Retorna None quando o parâmetro não foi enviado.
+
+    Raises:
+        HTTPException: 400 se algum campo não existir no schema
+    """
+    if not fields:
+        return None
+
+    requested = tuple(dict.fromkeys(name.strip() for name in fields.split(",") if name.strip()))
+    allowed = set(schema.model_fields) | set(schema.model_computed_fields)
+    unknown = [name for name in requested if name not in allowed]
+    if unknown or not requested:
+        raise HTTPException(status_code=400, detail=f"Unknown fields: {', '.join(unknown) or fields}")
+
+    return _build_fieldset(model, schema, requested)
@@ -0,0 +1,198 @@
+"""Instrumentação de memória: tracemalloc sob demanda, top de alocações, diffs e pico por requisição."""
+import resource
+import threading
+import time
+import tracemalloc
+from typing import Optional
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+
+# Frames do próprio tracemalloc e do import de módulos só poluem o top de alocações
+_IGNORED_FILES = (tracemalloc.__file__, "<frozen importlib._bootstrap>", "<frozen importlib._bootstrap_external>")
+
+
+def rss_bytes() -> Optional[int]:
+    """RSS atual do processo (Linux), ou o pico se /proc não estiver disponível."""
+    try:
+        with open("/proc/self/statm") as file:
+            return int(file.read().split()[1]) * resource.getpagesize()
+    except (OSError, IndexError, ValueError):
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+def _filtered(snapshot: tracemalloc.Snapshot) -> tracemalloc.Snapshot:
+    return snapshot.filter_traces([tracemalloc.Filter(False, path) for path in _IGNORED_FILES])
+
+
+def _site(statistic, group_by: str) -> str:
+    if group_by == "traceback":
+        return " <- ".join(f"{frame.filename}:{frame.lineno}" for frame in statistic.traceback)
+    frame = statistic.traceback[0]
+    return frame.filename if group_by == "filename" else f"{frame.filename}:{frame.lineno}"
+
+
+class MemoryTracker:
+    """
+    Controla o tracemalloc do worker e guarda um snapshot de referência para
+    diffs. Também acumula o pico de alocação por rota medido pelo
+    MemoryPeakMiddleware.
+
+    Com o tracemalloc ligado, cada alocação custa mais (algo como 2x a 4x de
+    overhead de CPU e memória para os tracebacks), por isso ele fica
+    desligado por padrão e é ligado pela API administrativa.
+    """
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._baseline: Optional[tracemalloc.Snapshot] = None
+        self._baseline_taken_at: Optional[float] = None
+        self._requests: dict[str, dict] = {}
+
+    @staticmethod
+    def is_tracing() -> bool:
+        return tracemalloc.is_tracing()
+
+    def start(self, frames: int) -> None:
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(frames)
+
+    def stop(self) -> None:
+        """Desliga o tracemalloc e descarta o snapshot de referência (que guarda os traces)."""
+        tracemalloc.stop()
+        with self._lock:
+            self._baseline = None
+            self._baseline_taken_at = None
+
+    def status(self) -> dict:
+        current, peak = tracemalloc.get_traced_memory()
+        with self._lock:
+            requests = {route: dict(stats) for route, stats in self._requests.items()}
+            baseline_taken_at = self._baseline_taken_at
+        return {
+            "tracing": tracemalloc.is_tracing(),
+            "frames": tracemalloc.get_traceback_limit(),
+            "rss_bytes": rss_bytes(),
+            "traced_current_bytes": current,
+            "traced_peak_bytes": peak,
+            "baseline_taken_at": baseline_taken_at,
+            "requests": requests,
+        }
+
+    def top(self, limit: int = 20, group_by: str = "lineno") -> list[dict]:
+        """Maiores locais de alocação ainda vivos."""
+        statistics = _filtered(tracemalloc.take_snapshot()).statistics(group_by)
+        return [
+            {"site": _site(statistic, group_by), "size_bytes": statistic.size, "count": statistic.count}
+            for statistic in statistics[:limit]
+        ]
+
+    def take_baseline(self) -> float:
+        """Guarda um snapshot como referência para o próximo diff."""
+        snapshot = _filtered(tracemalloc.take_snapshot())
+        with self._lock:
+            self._baseline = snapshot
+            self._baseline_taken_at = time.time()
+            return self._baseline_taken_at
+
+    def diff(self, limit: int = 20, group_by: str = "lineno") -> Optional[list[dict]]:
+        """
+        Locais que mais cresceram desde o snapshot de referência, ou None se
+        não há referência.
+        """
+        with self._lock:
+            baseline = self._baseline
+        if baseline is None:
+            return None
+        statistics = _filtered(tracemalloc.take_snapshot()).compare_to(baseline, group_by)
+        return [
+            {
+                "site": _site(statistic, group_by),
+                "size_bytes": statistic.size,
+                "size_diff_bytes": statistic.size_diff,
+                "count": statistic.count,
+                "count_diff": statistic.count_diff,
+            }
+            for statistic in statistics[:limit]
+        ]
+
+    def record_request(self, route: str, peak: Optional[int]) -> None:
+        """Acumula o pico de uma requisição; None conta como medição sobreposta (descartada)."""
+        with self._lock:
+            stats = self._requests.setdefault(route, {"count": 0, "overlapped": 0, "max_peak_bytes": 0, "total_peak_bytes": 0, "mean_peak_bytes": 0})
+            if peak is None:
+                stats["overlapped"] += 1
+                return
+            stats["count"] += 1
+            stats["max_peak_bytes"] = max(stats["max_peak_bytes"], peak)
+            stats["total_peak_bytes"] += peak
+            stats["mean_peak_bytes"] = stats["total_peak_bytes"] // stats["count"]
+
+    def reset_requests(self) -> None:
+        with self._lock:
+            self._requests.clear()
+
+
+class _PeakMeasurement:
+    __slots__ = ("baseline", "overlapped")
+
+    def __init__(self, baseline: int):
+        self.baseline = baseline
+        self.overlapped = False
+
+
+class MemoryPeakMiddleware:
+    """
+    Middleware ASGI que, com o tracemalloc ligado, mede o pico de memória
+    alocada durante as requisições cujo caminho começa com um dos `prefixes`
+    e o anexa ao header `X-Memory-Peak` (bytes).
+
+    O pico do tracemalloc é do processo e `reset_peak` zera a medição de
+    todas as requisições em andamento. Por isso o pico só é zerado quando
+    nenhuma outra requisição medida está em andamento; requisições medidas
+    que se sobrepõem são descartadas (sem header, contadas em `overlapped`).
+    Alocações de requisições não medidas ainda entram no pico, então os
+    valores publicados são um limite superior.
+    """
+    def __init__(self, app: ASGIApp, tracker: MemoryTracker, prefixes: tuple[str, ...]):
+        self.app = app
+        self.tracker = tracker
+        self.prefixes = prefixes
+        self._in_flight: set[_PeakMeasurement] = set()
+
+    def _peak(self, measurement: _PeakMeasurement) -> Optional[int]:
+        if measurement.overlapped or not tracemalloc.is_tracing():
+            return None
+        return max(tracemalloc.get_traced_memory()[1] - measurement.baseline, 0)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or not tracemalloc.is_tracing() or not scope["path"].startswith(self.prefixes):
+            await self.app(scope, receive, send)
+            return
+
+        if self._in_flight:
+            measurement = _PeakMeasurement(0)
+            measurement.overlapped = True
+            for other in self._in_flight:
+                other.overlapped = True
+        else:
+            tracemalloc.reset_peak()
+            measurement = _PeakMeasurement(tracemalloc.get_traced_memory()[0])
+        self._in_flight.add(measurement)
+
+        async def send_wrapper(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                peak = self._peak(measurement)
+                if peak is not None:
+                    MutableHeaders(scope=message)["X-Memory-Peak"] = str(peak)
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            self._in_flight.discard(measurement)
+            if tracemalloc.is_tracing():
+                route = getattr(scope.get("route"), "path", "unmatched")
+                self.tracker.record_request(f"{scope['method']} {route}", self._peak(measurement))
+
+
+memory_tracker = MemoryTracker()
@@ -0,0 +1,387 @@
+"""Métricas da aplicação no formato de exposição do Prometheus, agregadas entre os workers."""
+import atexit
+import glob
+import json
+import os
+import threading
+import time
+from collections import Counter
+from contextvars import ContextVar
+from typing import Optional
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+import config
+from config import settings
+from utils.cache import response_cache
+from utils.slow_queries import slow_query_log
+
+
+# Limites (segundos) dos histogramas de latência
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+# Limites do histograma de consultas por requisição
+QUERY_COUNT_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100)
+
+# Intervalo mínimo entre gravações do snapshot do worker em METRICS_DIR
+FLUSH_INTERVAL_SECONDS = 1.0
+
+# Separador das labels nas chaves dos snapshots (JSON só aceita chaves string)
+_KEY_SEPARATOR = "\t"
+
+
+class RequestDbStats:
+    """
+    Consultas ao banco feitas durante uma requisição. `statements` só é
+    preenchido quando alguém pede (QueryDebugMiddleware), para contar
+    statements repetidos.
+    """
+    __slots__ = ("queries", "seconds", "statements", "_lock")
+
+    def __init__(self):
+        self.queries = 0
+        self.seconds = 0.0
+        self.statements: Optional[Counter] = None
+        self._lock = threading.Lock()
+
+    def record(self, statement: str, elapsed: float, executemany: bool) -> None:
+        """Registra uma consulta; pode ser chamado de várias threads (ex.: pool do dashboard)."""
+        with self._lock:
+            self.queries += 1
+            self.seconds += elapsed
+            # Lotes de executemany/insertmanyvalues são uma única operação, não N+1
+            if self.statements is not None and not executemany:
+                self.statements[statement] += 1
+
+
+# Estatísticas da requisição atual; copiado para o threadpool junto com o contexto
+current_db_stats: ContextVar[Optional[RequestDbStats]] = ContextVar("current_db_stats", default=None)
+
+
+def _empty_histogram(buckets: tuple) -> dict:
+    return {"buckets": [0] * len(buckets), "sum": 0.0, "count": 0}
+
+
+def _observe(histogram: dict, buckets: tuple, value: float) -> None:
+    for index, bound in enumerate(buckets):
+        if value <= bound:
+            histogram["buckets"][index] += 1
+    histogram["sum"] += value
+    histogram["count"] += 1
+
+
+class MetricsRegistry:
+    """
+    Contadores, gauges e histogramas do processo.
+
+    Com METRICS_DIR configurado, cada worker grava seu snapshot em
+    `metrics-<pid>.json` (no máximo uma vez por FLUSH_INTERVAL_SECONDS) e o
+    worker que atende /metrics soma os snapshots de todos. Contadores e
+    histogramas de workers encerrados continuam somados (para não voltarem
+    atrás); gauges só contam workers vivos.
+    """
+    def __init__(self, directory: str = ""):
+        self.directory = directory
+        self._lock = threading.Lock()
+        self._last_flush = 0.0
+        self.reset()
+
+    def reset(self) -> None:
+        """Zera todas as métricas do processo."""
+        with self._lock:
+            self._requests: dict[str, int] = {}
+            self._latency: dict[str, dict] = {}
+            self._in_flight = 0
+            self._db_queries = _empty_histogram(QUERY_COUNT_BUCKETS)
+            self._db_time = _empty_histogram(LATENCY_BUCKETS)
+            self._db_queries_total = 0
+            self._db_seconds_total = 0.0
+
+    def request_started(self) -> None:
+        with self._lock:
+            self._in_flight += 1
+
+    def request_finished(self, method: str, route: str, status: int, duration: float, db_stats: Optional[RequestDbStats]) -> None:
+        with self._lock:
+            self._in_flight -= 1
+            key = _KEY_SEPARATOR.join((method, route, str(status)))
+            self._requests[key] = self._requests.get(key, 0) + 1
+            histogram = self._latency.setdefault(_KEY_SEPARATOR.join((method, route)), _empty_histogram(LATENCY_BUCKETS))
+            _observe(histogram, LATENCY_BUCKETS, duration)
+            if db_stats is not None:
+                _observe(self._db_queries, QUERY_COUNT_BUCKETS, db_stats.queries)
+                _observe(self._db_time, LATENCY_BUCKETS, db_stats.seconds)
+        self.maybe_flush()
+
+    def query_executed(self, seconds: float) -> None:
+        with self._lock:
+            self._db_queries_total += 1
+            self._db_seconds_total += seconds
+
+    def snapshot(self) -> dict:
+        """Estado atual do processo, serializável em JSON."""
+        with self._lock:
+            snapshot = {
+                "pid": os.getpid(),
+                "requests": dict(self._requests),
+                "latency": {key: {**value, "buckets": list(value["buckets"])} for key, value in self._latency.items()},
+                "in_flight": self._in_flight,
+                "db_queries": {**self._db_queries, "buckets": list(self._db_queries["buckets"])},
+                "db_time": {**self._db_time, "buckets": list(self._db_time["buckets"])},
+                "db_queries_total": self._db_queries_total,
+                "db_seconds_total": self._db_seconds_total,
+            }
+
+        pool = config.engine.pool if config.engine is not None else None
+        snapshot["pool"] = {
+            name: getattr(pool, name)() for name in ("size", "checkedout", "overflow") if hasattr(pool, name)
+        } if pool is not None else {}
+        snapshot["cache"] = {
+            resource: {name: counters[name] for name in ("hits", "misses", "errors")}
+            for resource, counters in response_cache.stats()["resources"].items()
+        }
+        return snapshot
+
+    def maybe_flush(self, force: bool = False) -> None:
+        """Grava o snapshot do worker em METRICS_DIR (atômico, via rename)."""
+        if not self.directory:
+            return
+        now = time.monotonic()
+        if not force and now - self._last_flush < FLUSH_INTERVAL_SECONDS:
+            return
+        self._last_flush = now
+
+        path = os.path.join(self.directory, f"metrics-{os.getpid()}.json")
+        temporary = f"{path}.tmp"
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            with open(temporary, "w") as file:
+                json.dump(self.snapshot(), file)
+            os.replace(temporary, path)
+        except OSError:
+            # Métricas nunca derrubam a requisição
+            pass
+
+    def collect(self) -> list[dict]:
+        """Snapshots de todos os workers (o do processo atual sempre atualizado)."""
+        own = self.snapshot()
+        if not self.directory:
+            return [own]
+
+        snapshots = [own]
+        for path in glob.glob(os.path.join(self.directory, "metrics-*.json")):
+            try:
+                with open(path) as file:
+                    snapshot = json.load(file)
+            except (OSError, ValueError):
+                continue
+            if snapshot.get("pid") != own["pid"]:
+                snapshots.append(snapshot)
+        return snapshots
+
+    def render(self) -> str:
+        """Texto no formato de exposição do Prometheus (versão 0.0.4)."""
+        return render_snapshots(self.collect())
+
+
+def _pid_alive(pid: int) -> bool:
+    if pid == os.getpid():
+        return True
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def _merge_histograms(target: dict, source: dict) -> None:
+    target["buckets"] = [a + b for a, b in zip(target["buckets"], source["buckets"])]
+    target["sum"] += source["sum"]
+    target["count"] += source["count"]
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(**labels) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in labels.items()) + "}"
+
+
+def _format_bound(bound: float) -> str:
+    return repr(float(bound))
+
+
+def _histogram_lines(name: str, histogram: dict, buckets: tuple, **labels) -> list[str]:
+    lines = []
+    for bound, count in zip(buckets, histogram["buckets"]):
+        lines.append(f"{name}_bucket{_labels(**labels, le=_format_bound(bound))} {count}")
+    lines.append(f"{name}_bucket{_labels(**labels, le='+Inf')} {histogram['count']}")
+    lines.append(f"{name}_sum{_labels(**labels)} {histogram['sum']}")
+    lines.append(f"{name}_count{_labels(**labels)} {histogram['count']}")
+    return lines
+
+
+def render_snapshots(snapshots: list[dict]) -> str:
+    """Soma os snapshots dos workers e gera o texto de exposição."""
+    requests: dict[str, int] = {}
+    latency: dict[str, dict] = {}
+    db_queries = _empty_histogram(QUERY_COUNT_BUCKETS)
+    db_time = _empty_histogram(LATENCY_BUCKETS)
+    db_queries_total = 0
+    db_seconds_total = 0.0
+    cache: dict[str, dict[str, int]] = {}
+    in_flight = 0
+    pool: dict[str, int] = {}
+    live_workers = 0
+
+    for snapshot in snapshots:
+        for key, count in snapshot["requests"].items():
+            requests[key] = requests.get(key, 0) + count
+        for key, histogram in snapshot["latency"].items():
+            _merge_histograms(latency.setdefault(key, _empty_histogram(LATENCY_BUCKETS)), histogram)
+        _merge_histograms(db_queries, snapshot["db_queries"])
+        _merge_histograms(db_time, snapshot["db_time"])
+        db_queries_total += snapshot["db_queries_total"]
+        db_seconds_total += snapshot["db_seconds_total"]
+        for resource, counters in snapshot["cache"].items():
+            totals = cache.setdefault(resource, {"hits": 0, "misses": 0, "errors": 0})
+            for name, value in counters.items():
+                totals[name] += value
+
+        if _pid_alive(snapshot["pid"]):
+            live_workers += 1
+            in_flight += snapshot["in_flight"]
+            for name, value in snapshot["pool"].items():
+                pool[name] = pool.get(name, 0) + value
+
+    lines = [
+        "# HELP app_workers Workers com métricas agregadas nesta resposta.",
+        "# TYPE app_workers gauge",
+        f"app_workers {live_workers}",
+        "# HELP http_requests_total Requisições HTTP atendidas.",
+        "# TYPE http_requests_total counter",
+    ]
+    for key, count in sorted(requests.items()):
+        method, route, status = key.split(_KEY_SEPARATOR)
+        lines.append(f"http_requests_total{_labels(method=method, route=route, status=status)} {count}")
+
+    lines += [
+        "# HELP http_request_duration_seconds Latência das requisições HTTP por rota.",
+        "# TYPE http_request_duration_seconds histogram",
+    ]
+    for key, histogram in sorted(latency.items()):
+        method, route = key.split(_KEY_SEPARATOR)
+        lines += _histogram_lines("http_request_duration_seconds", histogram, LATENCY_BUCKETS, method=method, route=route)
+
+    lines += [
+        "# HELP http_requests_in_flight Requisições em andamento.",
+        "# TYPE http_requests_in_flight gauge",
+        f"http_requests_in_flight {in_flight}",
+        "# HELP db_queries_per_request Consultas ao banco por requisição.",
+        "# TYPE db_queries_per_request histogram",
+        *_histogram_lines("db_queries_per_request", db_queries, QUERY_COUNT_BUCKETS),
+        "# HELP db_time_per_request_seconds Tempo gasto no banco por requisição.",
+        "# TYPE db_time_per_request_seconds histogram",
+        *_histogram_lines("db_time_per_request_seconds", db_time, LATENCY_BUCKETS),
+        "# HELP db_queries_total Consultas executadas no banco.",
+        "# TYPE db_queries_total counter",
+        f"db_queries_total {db_queries_total}",
+        "# HELP db_query_duration_seconds_total Tempo total das consultas ao banco.",
+        "# TYPE db_query_duration_seconds_total counter",
+        f"db_query_duration_seconds_total {db_seconds_total}",
+    ]
+
+    for name, value in sorted(pool.items()):
+        lines += [
+            f"# HELP db_pool_{name} Pool de conexões: {name} (soma dos workers).",
+            f"# TYPE db_pool_{name} gauge",
+            f"db_pool_{name} {value}",
+        ]
+
+    for name in ("hits", "misses", "errors"):
+        lines += [f"# HELP cache_{name}_total Cache de leituras: {name} por recurso.", f"# TYPE cache_{name}_total counter"]
+        lines += [f"cache_{name}_total{_labels(resource=resource)} {counters[name]}" for resource, counters in sorted(cache.items())]
+    lines += ["# HELP cache_hit_ratio Hit ratio do cache de leituras por recurso.", "# TYPE cache_hit_ratio gauge"]
+    for resource, counters in sorted(cache.items()):
+        lookups = counters["hits"] + counters["misses"]
+        lines.append(f"cache_hit_ratio{_labels(resource=resource)} {round(counters['hits'] / lookups, 4) if lookups else 0.0}")
+
+    return "\n".join(lines) + "\n"
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("metrics_query_start", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    starts = conn.info.get("metrics_query_start")
+    if not starts:
+        return
+    elapsed = time.perf_counter() - starts.pop()
+    metrics.query_executed(elapsed)
+    slow_query_log.observe(conn, statement, parameters, executemany, elapsed)
+    stats = current_db_stats.get()
+    if stats is not None:
+        stats.record(statement, elapsed, executemany)
+
+
+def install_db_hooks() -> None:
+    """Registra os eventos de todas as engines (inclusive as criadas depois)."""
+    if not event.contains(Engine, "before_cursor_execute", _before_cursor_execute):
+        event.listen(Engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(Engine, "after_cursor_execute", _after_cursor_execute)
+
+
+class MetricsMiddleware:
+    """
+    Middleware ASGI que mede latência, requisições em andamento e as
+    consultas ao banco de cada requisição. A rota é identificada pelo
+    template (ex.: /goals/{goal_id}) para manter a cardinalidade baixa.
+    """
+    def __init__(self, app: ASGIApp, registry: Optional[MetricsRegistry] = None):
+        self.app = app
+        self.registry = registry or metrics
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status = 500
+        stats = RequestDbStats()
+        token = current_db_stats.set(stats)
+        self.registry.request_started()
+        start = time.perf_counter()
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            route = scope.get("route")
+            self.registry.request_finished(
+                scope["method"],
+                getattr(route, "path", "unmatched"),
+                status,
+                time.perf_counter() - start,
+                stats
+            )
+            current_db_stats.reset(token)
+
+
+def _build_registry() -> MetricsRegistry:
+    registry = MetricsRegistry(settings.METRICS_DIR)
+    if registry.directory:
+        atexit.register(registry.maybe_flush, True)
+    return registry
+
+
+metrics = _build_registry()
@@ -4,14 +4,17 @@ from config import settings
 import os
 
 
+def is_admin_token(token: str) -> bool:
+    """Indica se o valor informado é o token de admin."""
+    return token == os.getenv("ADMIN_TOKEN", settings.JWT_SECRET_KEY)
+
+
 def verify_admin_token(x_admin_token: str = Header(...)):
     """
     Verifica se o token de admin está correto.
     Use esta dependência apenas para rotas administrativas (/health, /config, /docs).
     """
-    admin_token = os.getenv("ADMIN_TOKEN", settings.JWT_SECRET_KEY)
-    
-    if x_admin_token != admin_token:
+    if not is_admin_token(x_admin_token):
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Invalid admin token"
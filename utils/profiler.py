@@ -0,0 +1,238 @@
+"""Profiler por amostragem (stacks colapsadas, compatíveis com flamegraph) por requisição ou do processo inteiro."""
+import sys
+import threading
+import time
+import uuid
+from collections import Counter, OrderedDict
+from typing import Optional
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.responses import JSONResponse
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from config import settings
+from utils.permissions import is_admin_token
+
+
+# Frames-folha de threads paradas esperando trabalho; amostras delas são descartadas
+IDLE_FRAMES = {
+    "selectors:EpollSelector.select",
+    "selectors:KqueueSelector.select",
+    "selectors:PollSelector.select",
+    "selectors:SelectSelector.select",
+    "threading:Condition.wait",
+    "threading:Event.wait",
+    "queue:Queue.get",
+    "concurrent.futures.thread:_worker",
+}
+
+
+def _frame_name(frame) -> str:
+    code = frame.f_code
+    return f"{frame.f_globals.get('__name__', '?')}:{getattr(code, 'co_qualname', code.co_name)}"
+
+
+def collapse_stack(frame) -> Optional[str]:
+    """
+    Converte a pilha de um frame no formato colapsado (`raiz;...;folha`), ou
+    None se a thread está ociosa.
+    """
+    names = []
+    while frame is not None:
+        names.append(_frame_name(frame).replace(";", ":"))
+        frame = frame.f_back
+    if not names or names[0] in IDLE_FRAMES:
+        return None
+    return ";".join(reversed(names))
+
+
+def render_collapsed(samples: Counter) -> str:
+    """Uma linha `stack contagem` por pilha, pronta para flamegraph.pl/speedscope."""
+    return "".join(f"{stack} {count}\n" for stack, count in samples.most_common())
+
+
+class SamplingProfiler:
+    """
+    Amostra as pilhas das threads em `thread_ids` (todas, exceto a própria,
+    se None) a cada `interval` segundos, em uma thread daemon. Threads cujo
+    nome começa com um dos `thread_names` (ex.: pools de workers criados
+    depois do início) também entram. Só lê `sys._current_frames()`: não
+    instrumenta chamadas, então o custo no código amostrado fica restrito à
+    disputa pelo GIL a cada amostra.
+    """
+    def __init__(self, interval: float = 0.005, thread_ids: Optional[set[int]] = None, thread_names: tuple[str, ...] = ()):
+        self.interval = interval
+        self.thread_ids = thread_ids
+        self.thread_names = thread_names
+        self.samples: Counter = Counter()
+        self.sample_count = 0
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+
+    def start(self) -> "SamplingProfiler":
+        self._thread = threading.Thread(target=self._run, name="sampling-profiler", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> Counter:
+        """Para a amostragem e retorna as pilhas coletadas."""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+        return self.samples
+
+    def take(self) -> Counter:
+        """Retorna as pilhas coletadas até agora e recomeça a contagem."""
+        with self._lock:
+            samples, self.samples = self.samples, Counter()
+        return samples
+
+    def _run(self) -> None:
+        own = threading.get_ident()
+        while not self._stop.wait(self.interval):
+            frames = sys._current_frames()
+            selected = self._selected_threads()
+            with self._lock:
+                self.sample_count += 1
+                for thread_id, frame in frames.items():
+                    if thread_id == own or (selected is not None and thread_id not in selected):
+                        continue
+                    stack = collapse_stack(frame)
+                    if stack is not None:
+                        self.samples[stack] += 1
+
+    def _selected_threads(self) -> Optional[set[int]]:
+        if self.thread_ids is None:
+            return None
+        if not self.thread_names:
+            return self.thread_ids
+        return self.thread_ids | {
+            thread.ident for thread in threading.enumerate() if thread.name.startswith(self.thread_names)
+        }
+
+
+class ProfileStore:
+    """Últimos `max_entries` perfis coletados (por requisição e periódicos) do worker."""
+    def __init__(self, max_entries: int = 50):
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._profiles: OrderedDict[str, dict] = OrderedDict()
+
+    def add(self, profile_id: str, kind: str, label: str, samples: Counter, started_at: float, duration: float) -> None:
+        with self._lock:
+            self._profiles[profile_id] = {
+                "id": profile_id,
+                "kind": kind,
+                "label": label,
+                "started_at": started_at,
+                "duration_ms": round(duration * 1000, 3),
+                "samples": sum(samples.values()),
+                "collapsed": render_collapsed(samples),
+            }
+            while len(self._profiles) > self.max_entries:
+                self._profiles.popitem(last=False)
+
+    def get(self, profile_id: str) -> Optional[dict]:
+        with self._lock:
+            return self._profiles.get(profile_id)
+
+    def list(self) -> list[dict]:
+        """Metadados dos perfis, do mais recente ao mais antigo (sem as pilhas)."""
+        with self._lock:
+            return [
+                {name: value for name, value in profile.items() if name != "collapsed"}
+                for profile in reversed(self._profiles.values())
+            ]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._profiles.clear()
+
+
+class PeriodicProfiler:
+    """
+    Modo do processo inteiro: amostra todas as threads continuamente e, a
+    cada `window` segundos, guarda a janela como um perfil no `store`.
+    """
+    def __init__(self, store: ProfileStore, interval: float, window: float):
+        self.store = store
+        self.interval = interval
+        self.window = window
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        if self._thread is None:
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="periodic-profiler", daemon=True)
+            self._thread.start()
+
+    def stop(self) -> None:
+        if self._thread is not None:
+            self._stop.set()
+            self._thread.join()
+            self._thread = None
+
+    def _run(self) -> None:
+        sampler = SamplingProfiler(self.interval).start()
+        started_at = time.time()
+        try:
+            while not self._stop.wait(self.window):
+                now = time.time()
+                self.store.add(uuid.uuid4().hex, "periodic", "process", sampler.take(), started_at, now - started_at)
+                started_at = now
+        finally:
+            samples = sampler.stop()
+            self.store.add(uuid.uuid4().hex, "periodic", "process", samples, started_at, time.time() - started_at)
+
+
+class ProfilerMiddleware:
+    """
+    Middleware ASGI que perfila uma única requisição quando ela traz o header
+    `X-Profile` com o token de admin. As rotas são `async`, então a
+    requisição roda na thread do event loop, que é a amostrada, junto com as
+    threads dos pools em `worker_threads` (prefixos de nome), onde parte do
+    trabalho é feita (ex.: as consultas paralelas do dashboard). Outras
+    requisições simultâneas no mesmo loop ou nos mesmos pools também
+    aparecem no perfil.
+
+    O perfil é guardado no `store` e o id vai no header `X-Profile-Id`
+    (GET /admin/profiles/{id} retorna as stacks colapsadas).
+    """
+    def __init__(self, app: ASGIApp, store: ProfileStore, interval: float = 0.005, worker_threads: tuple[str, ...] = ()):
+        self.app = app
+        self.store = store
+        self.interval = interval
+        self.worker_threads = worker_threads
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        token = Headers(scope=scope).get("x-profile") if scope["type"] == "http" else None
+        if token is None:
+            await self.app(scope, receive, send)
+            return
+        if not is_admin_token(token):
+            await JSONResponse({"detail": "Invalid admin token"}, status_code=403)(scope, receive, send)
+            return
+
+        profile_id = uuid.uuid4().hex
+
+        async def send_wrapper(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                MutableHeaders(scope=message)["X-Profile-Id"] = profile_id
+            await send(message)
+
+        profiler = SamplingProfiler(self.interval, {threading.get_ident()}, self.worker_threads).start()
+        started_at, start = time.time(), time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            samples = profiler.stop()
+            route = getattr(scope.get("route"), "path", scope["path"])
+            self.store.add(profile_id, "request", f"{scope['method']} {route}", samples, started_at, time.perf_counter() - start)
+
+
+profile_store = ProfileStore(settings.PROFILE_STORE_SIZE)
+periodic_profiler = PeriodicProfiler(
+    profile_store,
+    settings.PROFILER_PERIODIC_INTERVAL_MS / 1000,
+    settings.PROFILER_PERIODIC_WINDOW_SECONDS
+)
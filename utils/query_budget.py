@@ -0,0 +1,59 @@
+"""Contagem de consultas por requisição em modo debug: headers X-DB-* e alerta de N+1."""
+import logging
+from collections import Counter
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from utils.metrics import RequestDbStats, current_db_stats
+
+
+logger = logging.getLogger(__name__)
+
+
+def repeated_statements(statements: Counter, threshold: int) -> list[tuple[str, int]]:
+    """Statements idênticos executados pelo menos `threshold` vezes, do mais repetido ao menos."""
+    return [(statement, count) for statement, count in statements.most_common() if count >= threshold]
+
+
+class QueryDebugMiddleware:
+    """
+    Middleware ASGI (apenas em modo debug) que anexa `X-DB-Queries` e
+    `X-DB-Time` (ms) à resposta e registra um aviso quando o mesmo statement
+    se repete muitas vezes na requisição, sinal provável de N+1.
+
+    Usa as estatísticas da requisição já abertas pelo MetricsMiddleware,
+    quando ele está ativo; os eventos do SQLAlchemy vêm de install_db_hooks.
+    """
+    def __init__(self, app: ASGIApp, repeat_threshold: int = 5):
+        self.app = app
+        self.repeat_threshold = repeat_threshold
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = current_db_stats.get()
+        token = None
+        if stats is None:
+            stats = RequestDbStats()
+            token = current_db_stats.set(stats)
+        stats.statements = Counter()
+
+        async def send_wrapper(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                headers = MutableHeaders(scope=message)
+                headers["X-DB-Queries"] = str(stats.queries)
+                headers["X-DB-Time"] = f"{stats.seconds * 1000:.2f}"
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            route = getattr(scope.get("route"), "path", scope["path"])
+            for statement, count in repeated_statements(stats.statements, self.repeat_threshold):
+                logger.warning(
+                    "Possível N+1 em %s %s: statement executado %d vezes: %s",
+                    scope["method"], route, count, " ".join(statement.split())[:300]
+                )
+            if token is not None:
+                current_db_stats.reset(token)
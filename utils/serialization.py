@@ -0,0 +1,20 @@
+"""Caminho rápido de serialização: colunas explícitas e JSON gerado pelo pydantic-core."""
+from typing import Optional
+from fastapi.responses import Response
+from pydantic import BaseModel
+
+
+def columns_for(model, schema: type[BaseModel]) -> list:
+    """
+    Retorna as colunas do model ORM usadas pelo schema de saída, na ordem dos
+    campos, para selecionar apenas o necessário (sem montar objetos ORM).
+    """
+    return [getattr(model, name) for name in schema.model_fields if hasattr(model, name)]
+
+
+def json_response(payload: bytes, headers: Optional[dict] = None, status_code: int = 200) -> Response:
+    """
+    Devolve bytes JSON já serializados, sem revalidação pelo response_model
+    nem codificação pelo encoder JSON da stdlib.
+    """
+    return Response(content=payload, status_code=status_code, media_type="application/json", headers=headers)
@@ -0,0 +1,197 @@
+"""Log de consultas lentas, agrupadas por SQL normalizado, com EXPLAIN capturado em segundo plano."""
+import logging
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextvars import ContextVar
+from typing import Optional
+from starlette.types import ASGIApp, Receive, Scope, Send
+from config import settings
+
+
+logger = logging.getLogger(__name__)
+
+# Prefixo do EXPLAIN por dialeto (só SELECTs são explicados: EXPLAIN não executa a consulta)
+EXPLAIN_PREFIXES = {
+    "sqlite": "EXPLAIN QUERY PLAN ",
+    "mysql": "EXPLAIN ",
+    "postgresql": "EXPLAIN ",
+}
+
+_STRING_LITERAL = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_LITERAL = re.compile(r"(?<![\w.])-?\d+(?:\.\d+)?\b")
+_PLACEHOLDER = re.compile(r"%\(\w+\)s|%s|(?<!:):\w+|\$\d+|\?")
+_PLACEHOLDER_LIST = re.compile(r"\(\s*\?(?:\s*,\s*\?)+\s*\)")
+
+# Requisição atual (o scope do ASGI), para atribuir a consulta lenta à rota
+current_request_scope: ContextVar[Optional[Scope]] = ContextVar("current_request_scope", default=None)
+
+
+def normalize_sql(statement: str) -> str:
+    """
+    Reduz o statement a um formato estável: literais e placeholders viram `?`
+    e listas de IN com tamanhos diferentes viram `(...)`, para que variações
+    da mesma consulta caiam na mesma entrada.
+    """
+    normalized = " ".join(statement.split())
+    normalized = _STRING_LITERAL.sub("?", normalized)
+    normalized = _PLACEHOLDER.sub("?", normalized)
+    normalized = _NUMBER_LITERAL.sub("?", normalized)
+    return _PLACEHOLDER_LIST.sub("(...)", normalized)
+
+
+def parameters_shape(parameters, executemany: bool = False) -> str:
+    """
+    Descreve os parâmetros apenas pelos tipos (os valores podem conter dados
+    pessoais e nunca são guardados), ex.: `(int, str)` ou `50 x (int, float)`.
+    """
+    if executemany:
+        rows = list(parameters or [])
+        return f"{len(rows)} x {parameters_shape(rows[0]) if rows else '()'}"
+    if not parameters:
+        return "()"
+    if isinstance(parameters, dict):
+        return "{" + ", ".join(f"{name}: {type(value).__name__}" for name, value in parameters.items()) + "}"
+    return "(" + ", ".join(type(value).__name__ for value in parameters) + ")"
+
+
+def _route(scope: Optional[Scope]) -> str:
+    if scope is None:
+        return "background"
+    return f"{scope.get('method', '')} {getattr(scope.get('route'), 'path', 'unmatched')}"
+
+
+class SlowQueryLog:
+    """
+    Consultas acima de SLOW_QUERY_THRESHOLD_MS agregadas por SQL normalizado:
+    contagem, tempo total e máximo, rotas de origem, formato dos parâmetros e
+    o plano de execução.
+
+    O EXPLAIN roda uma única vez por consulta, em uma thread própria e em uma
+    conexão separada do pool, para não atrasar a requisição que foi lenta. O
+    log é por processo e limitado a `max_entries` (sai a entrada com menor
+    tempo total).
+    """
+    def __init__(self, max_entries: int = 500, explain: bool = True):
+        self.max_entries = max_entries
+        self.explain = explain
+        self._lock = threading.Lock()
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._entries: dict[str, dict] = {}
+
+    def clear(self) -> None:
+        """Remove todas as entradas."""
+        with self._lock:
+            self._entries.clear()
+
+    def observe(self, connection, statement: str, parameters, executemany: bool, seconds: float) -> None:
+        """Registra a consulta se ela passou do limite configurado."""
+        threshold = settings.SLOW_QUERY_THRESHOLD_MS
+        elapsed_ms = seconds * 1000
+        if threshold <= 0 or elapsed_ms < threshold:
+            return
+        if not connection.get_execution_options().get("slow_query_log", True):
+            return
+
+        normalized = normalize_sql(statement)
+        route = _route(current_request_scope.get())
+        shape = parameters_shape(parameters, executemany)
+        logger.warning("Consulta lenta (%.1f ms) em %s: %s %s", elapsed_ms, route, normalized[:500], shape)
+
+        with self._lock:
+            entry = self._entries.get(normalized)
+            if entry is None:
+                if len(self._entries) >= self.max_entries:
+                    smallest = min(self._entries, key=lambda key: self._entries[key]["total_ms"])
+                    del self._entries[smallest]
+                entry = self._entries[normalized] = {
+                    "sql": normalized,
+                    "count": 0,
+                    "total_ms": 0.0,
+                    "max_ms": 0.0,
+                    "routes": {},
+                    "parameters": shape,
+                    "explain": None,
+                    "last_seen": 0.0,
+                }
+                needs_explain = True
+            else:
+                needs_explain = False
+            entry["count"] += 1
+            entry["total_ms"] += elapsed_ms
+            entry["max_ms"] = max(entry["max_ms"], elapsed_ms)
+            entry["routes"][route] = entry["routes"].get(route, 0) + 1
+            entry["parameters"] = shape
+            entry["last_seen"] = time.time()
+
+        if needs_explain and self.explain and not executemany:
+            self._schedule_explain(connection.engine, normalized, statement, parameters)
+
+    def _schedule_explain(self, engine, key: str, statement: str, parameters) -> None:
+        prefix = EXPLAIN_PREFIXES.get(engine.dialect.name)
+        if prefix is None or not statement.lstrip().upper().startswith(("SELECT", "WITH")):
+            return
+        if isinstance(parameters, dict):
+            parameters = dict(parameters)
+        elif parameters is not None:
+            parameters = tuple(parameters)
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="slow-query-explain")
+        self._executor.submit(self._explain, engine, key, prefix + statement, parameters)
+
+    def _explain(self, engine, key: str, statement: str, parameters) -> None:
+        try:
+            with engine.connect() as connection:
+                rows = connection.execution_options(slow_query_log=False).exec_driver_sql(statement, parameters or ()).all()
+            if engine.dialect.name == "sqlite":
+                plan = [str(row[-1]) for row in rows]
+            else:
+                plan = [" | ".join("" if value is None else str(value) for value in row) for row in rows]
+        except Exception as error:
+            # Um EXPLAIN que falha fica registrado na entrada, sem afetar a aplicação
+            plan = [f"EXPLAIN failed: {error}"]
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                entry["explain"] = plan
+
+    def wait(self) -> None:
+        """Aguarda os EXPLAINs pendentes (usado nos testes e no desligamento)."""
+        if self._executor is not None:
+            self._executor.submit(lambda: None).result()
+
+    def top(self, limit: int = 20, sort_by: str = "total_ms") -> list[dict]:
+        """As `limit` consultas com maior `sort_by` (total_ms, count, max_ms ou mean_ms)."""
+        with self._lock:
+            entries = [
+                {**entry, "routes": dict(entry["routes"]), "mean_ms": entry["total_ms"] / entry["count"]}
+                for entry in self._entries.values()
+            ]
+        entries.sort(key=lambda entry: entry[sort_by], reverse=True)
+        for entry in entries:
+            for name in ("total_ms", "max_ms", "mean_ms"):
+                entry[name] = round(entry[name], 3)
+        return entries[:limit]
+
+
+class SlowQueryMiddleware:
+    """
+    Middleware ASGI que expõe o scope da requisição aos eventos do banco,
+    para que a consulta lenta seja atribuída à rota (ex.: GET /transactions/).
+    """
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        token = current_request_scope.set(scope)
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            current_request_scope.reset(token)
+
+
+slow_query_log = SlowQueryLog(settings.SLOW_QUERY_LOG_SIZE, settings.SLOW_QUERY_EXPLAIN)
@@ -0,0 +1,370 @@
+"""Tracing leve (rota → controller → service → SQL) com propagação W3C traceparent e exportação local."""
+import functools
+import inspect
+import json
+import queue
+import random
+import re
+import secrets
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from logging.handlers import QueueListener
+from typing import Callable, Optional
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from config import settings
+from utils.slow_queries import normalize_sql
+
+
+# traceparent: versão-trace_id-parent_id-flags (https://www.w3.org/TR/trace-context/)
+_TRACEPARENT = re.compile(r"^([0-9a-f]{2})-([0-9a-f]{32})-([0-9a-f]{16})-([0-9a-f]{2})$")
+_SAMPLED_FLAG = 0x01
+
+# Tipos de span do OpenTelemetry (SpanKind), como no OTLP/JSON
+SPAN_KIND_INTERNAL = 1
+SPAN_KIND_SERVER = 2
+SPAN_KIND_CLIENT = 3
+
+
+class Trace:
+    """Trace local: identificação, decisão de amostragem e spans já finalizados."""
+    __slots__ = ("trace_id", "sampled", "tracestate", "spans")
+
+    def __init__(self, trace_id: str, sampled: bool, tracestate: Optional[str] = None):
+        self.trace_id = trace_id
+        self.sampled = sampled
+        self.tracestate = tracestate
+        self.spans: list["Span"] = []
+
+
+class Span:
+    """Um span com os campos do modelo do OpenTelemetry."""
+    __slots__ = ("trace", "name", "kind", "span_id", "parent_id", "start_ns", "end_ns", "attributes", "error")
+
+    def __init__(self, trace: Trace, name: str, kind: int = SPAN_KIND_INTERNAL, parent_id: Optional[str] = None, attributes: Optional[dict] = None):
+        self.trace = trace
+        self.name = name
+        self.kind = kind
+        self.span_id = secrets.token_hex(8)
+        self.parent_id = parent_id
+        self.start_ns = time.time_ns()
+        self.end_ns: Optional[int] = None
+        self.attributes = attributes or {}
+        self.error: Optional[str] = None
+
+    @property
+    def traceparent(self) -> str:
+        return f"00-{self.trace.trace_id}-{self.span_id}-{'01' if self.trace.sampled else '00'}"
+
+    def end(self) -> None:
+        self.end_ns = time.time_ns()
+        self.trace.spans.append(self)
+
+    def to_dict(self) -> dict:
+        """Span no formato do OTLP/JSON (campos em camelCase, tempos em ns)."""
+        span = {
+            "traceId": self.trace.trace_id,
+            "spanId": self.span_id,
+            "name": self.name,
+            "kind": self.kind,
+            "startTimeUnixNano": str(self.start_ns),
+            "endTimeUnixNano": str(self.end_ns),
+            "attributes": [{"key": key, "value": _attribute_value(value)} for key, value in self.attributes.items()],
+            "status": {"code": 2, "message": self.error} if self.error else {"code": 0},
+        }
+        if self.parent_id:
+            span["parentSpanId"] = self.parent_id
+        if self.trace.tracestate:
+            span["traceState"] = self.trace.tracestate
+        return span
+
+
+def _attribute_value(value) -> dict:
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    return {"stringValue": str(value)}
+
+
+def parse_traceparent(value: Optional[str]) -> Optional[tuple[str, str, bool]]:
+    """Retorna (trace_id, parent_id, sampled) de um header traceparent válido, ou None."""
+    match = _TRACEPARENT.match((value or "").strip().lower())
+    if not match:
+        return None
+    version, trace_id, parent_id, flags = match.groups()
+    if version == "ff" or trace_id == "0" * 32 or parent_id == "0" * 16:
+        return None
+    return trace_id, parent_id, bool(int(flags, 16) & _SAMPLED_FLAG)
+
+
+class FileExporter:
+    """Grava os spans de cada trace como linhas JSON (um span por linha) em um arquivo."""
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+
+    def export(self, spans: list[Span]) -> None:
+        lines = "".join(json.dumps(span.to_dict(), separators=(",", ":")) + "\n" for span in spans)
+        with self._lock:
+            with open(self.path, "a") as file:
+                file.write(lines)
+
+
+class StdoutExporter:
+    """Escreve os spans em stdout (um span JSON por linha), para coletores de log."""
+    def __init__(self):
+        self._lock = threading.Lock()
+
+    def export(self, spans: list[Span]) -> None:
+        lines = "".join(json.dumps(span.to_dict(), separators=(",", ":")) + "\n" for span in spans)
+        with self._lock:
+            sys.stdout.write(lines)
+            sys.stdout.flush()
+
+
+class ExportListener(QueueListener):
+    """QueueListener que entrega cada trace da fila (lista de spans) para `export`, na thread do listener."""
+    def __init__(self, records: queue.SimpleQueue, export: Callable[[list[Span]], None]):
+        super().__init__(records)
+        self.export = export
+
+    def handle(self, spans: list[Span]) -> None:
+        try:
+            self.export(spans)
+        except OSError:
+            # Tracing nunca derruba a requisição nem a thread de exportação
+            pass
+
+
+class Tracer:
+    """
+    Cria traces e spans. Sem exporter, o tracing fica desligado e nenhuma
+    camada paga mais do que a leitura de um ContextVar. Com exporter, um
+    trace novo é amostrado com probabilidade `sample_rate`; um trace que
+    chega com traceparent segue a decisão de quem chamou.
+
+    Como no access log, a requisição só enfileira o trace finalizado: a
+    serialização e a escrita acontecem na thread de um ExportListener,
+    nunca no event loop.
+    """
+    def __init__(self, exporter=None, sample_rate: float = 1.0):
+        self.exporter = exporter
+        self.sample_rate = sample_rate
+        self._records: queue.SimpleQueue = queue.SimpleQueue()
+        self._listener: Optional[ExportListener] = None
+        self._lock = threading.Lock()
+
+    def start(self) -> None:
+        """Inicia a thread de exportação (também iniciada no primeiro trace exportado)."""
+        with self._lock:
+            if self._listener is None:
+                self._listener = ExportListener(self._records, self._export)
+                self._listener.start()
+
+    def stop(self) -> None:
+        """Exporta os traces ainda na fila e para a thread de exportação."""
+        with self._lock:
+            listener, self._listener = self._listener, None
+        if listener is not None:
+            listener.stop()
+
+    def _export(self, spans: list[Span]) -> None:
+        if self.exporter is not None:
+            self.exporter.export(spans)
+
+    @property
+    def enabled(self) -> bool:
+        return self.exporter is not None
+
+    def start_trace(self, traceparent: Optional[str] = None, tracestate: Optional[str] = None) -> tuple[Trace, Optional[str]]:
+        """Trace da requisição e o span pai remoto (do traceparent recebido), se houver."""
+        incoming = parse_traceparent(traceparent)
+        if incoming is not None:
+            trace_id, parent_id, sampled = incoming
+            return Trace(trace_id, sampled, tracestate), parent_id
+        return Trace(secrets.token_hex(16), random.random() < self.sample_rate), None
+
+    def finish_trace(self, trace: Trace) -> None:
+        if trace.sampled and trace.spans and self.exporter is not None:
+            if self._listener is None:
+                self.start()
+            self._records.put(trace.spans)
+
+
+# Span ativo (None fora de uma requisição amostrada)
+current_span: ContextVar[Optional[Span]] = ContextVar("current_span", default=None)
+
+
+@contextmanager
+def start_span(name: str, kind: int = SPAN_KIND_INTERNAL, **attributes):
+    """Abre um span filho do span ativo; sem span ativo, não faz nada."""
+    parent = current_span.get()
+    if parent is None:
+        yield None
+        return
+    span = Span(parent.trace, name, kind, parent.span_id, attributes)
+    token = current_span.set(span)
+    try:
+        yield span
+    except BaseException as error:
+        span.error = f"{type(error).__name__}: {error}"
+        raise
+    finally:
+        current_span.reset(token)
+        span.end()
+
+
+def _wrap(function, name: str, layer: str):
+    if inspect.isgeneratorfunction(function) or inspect.isasyncgenfunction(function):
+        # O corpo de um gerador roda depois do retorno; um span aqui mediria só a criação
+        return function
+
+    if inspect.iscoroutinefunction(function):
+        @functools.wraps(function)
+        async def async_wrapper(*args, **kwargs):
+            if current_span.get() is None:
+                return await function(*args, **kwargs)
+            with start_span(name, **{"code.layer": layer, "code.function": name}):
+                return await function(*args, **kwargs)
+        return async_wrapper
+
+    @functools.wraps(function)
+    def wrapper(*args, **kwargs):
+        if current_span.get() is None:
+            return function(*args, **kwargs)
+        with start_span(name, **{"code.layer": layer, "code.function": name}):
+            return function(*args, **kwargs)
+    return wrapper
+
+
+def traced(layer: str):
+    """
+    Decorator de classe: cada método público vira um span
+    `Classe.metodo` com o atributo `code.layer` (controller, service...).
+    """
+    def decorate(cls):
+        for name, attribute in list(vars(cls).items()):
+            if name.startswith("_"):
+                continue
+            span_name = f"{cls.__name__}.{name}"
+            if isinstance(attribute, staticmethod):
+                setattr(cls, name, staticmethod(_wrap(attribute.__func__, span_name, layer)))
+            elif isinstance(attribute, classmethod):
+                setattr(cls, name, classmethod(_wrap(attribute.__func__, span_name, layer)))
+            elif inspect.isfunction(attribute):
+                setattr(cls, name, _wrap(attribute, span_name, layer))
+        return cls
+    return decorate
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    parent = current_span.get()
+    if parent is None:
+        return
+    normalized = normalize_sql(statement)
+    span = Span(parent.trace, f"SQL {normalized.split(' ', 1)[0].upper()}", SPAN_KIND_CLIENT, parent.span_id, {
+        "code.layer": "sql",
+        "db.system": conn.dialect.name,
+        "db.statement": normalized,
+    })
+    conn.info.setdefault("tracing_spans", []).append(span)
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    spans = conn.info.get("tracing_spans")
+    if spans:
+        spans.pop().end()
+
+
+def _handle_error(exception_context):
+    connection = exception_context.connection
+    spans = connection.info.get("tracing_spans") if connection is not None else None
+    if spans:
+        span = spans.pop()
+        span.error = f"{type(exception_context.original_exception).__name__}: {exception_context.original_exception}"
+        span.end()
+
+
+def install_tracing_hooks() -> None:
+    """Registra os spans de SQL em todas as engines (inclusive as criadas depois)."""
+    if not event.contains(Engine, "before_cursor_execute", _before_cursor_execute):
+        event.listen(Engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(Engine, "after_cursor_execute", _after_cursor_execute)
+        event.listen(Engine, "handle_error", _handle_error)
+
+
+class TracingMiddleware:
+    """
+    Middleware ASGI que abre o span da requisição (camada de rota, nomeado
+    pelo template, ex.: GET /goals/{goal_id}), continua o trace do header
+    `traceparent` recebido e devolve o `traceparent` do span no response.
+    Sub-requisições do POST /batch viram spans filhos do batch.
+    """
+    def __init__(self, app: ASGIApp, tracer: Tracer):
+        self.app = app
+        self.tracer = tracer
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or not self.tracer.enabled:
+            await self.app(scope, receive, send)
+            return
+
+        parent = current_span.get()
+        if parent is not None:
+            trace, parent_id, root = parent.trace, parent.span_id, False
+        else:
+            headers = Headers(scope=scope)
+            trace, parent_id = self.tracer.start_trace(headers.get("traceparent"), headers.get("tracestate"))
+            root = True
+
+        span = Span(trace, f"{scope['method']} {scope['path']}", SPAN_KIND_SERVER if root else SPAN_KIND_INTERNAL, parent_id, {
+            "code.layer": "route",
+            "http.method": scope["method"],
+            "http.target": scope["path"],
+        })
+        token = current_span.set(span if trace.sampled else None)
+
+        async def send_wrapper(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                span.attributes["http.status_code"] = message["status"]
+                if message["status"] >= 500:
+                    span.error = f"HTTP {message['status']}"
+                if root:
+                    MutableHeaders(scope=message)["traceparent"] = span.traceparent
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        except BaseException as error:
+            span.error = f"{type(error).__name__}: {error}"
+            raise
+        finally:
+            current_span.reset(token)
+            route = getattr(scope.get("route"), "path", None)
+            if route is not None:
+                span.name = f"{scope['method']} {route}"
+                span.attributes["http.route"] = route
+            span.end()
+            if root:
+                self.tracer.finish_trace(trace)
+
+
+def _build_tracer() -> Tracer:
+    if settings.TRACING_EXPORTER == "stdout":
+        exporter = StdoutExporter()
+    elif settings.TRACING_EXPORTER == "file":
+        exporter = FileExporter(settings.TRACING_FILE)
+    else:
+        exporter = None
+    return Tracer(exporter, settings.TRACING_SAMPLE_RATE)
+
+
+tracer = _build_tracer()
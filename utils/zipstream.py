@@ -0,0 +1,33 @@
+"""Escrita de arquivos ZIP em streaming, sem arquivo temporário nem o arquivo inteiro em memória."""
+import io
+
+
+class ZipStream(io.RawIOBase):
+    """
+    Destino não posicionável para zipfile.ZipFile: guarda apenas os bytes
+    escritos desde o último `drain()`. Sem seek, o zipfile grava cada membro
+    uma única vez, em sequência, com os tamanhos em data descriptors.
+    """
+    def __init__(self):
+        self._buffer = bytearray()
+        self._position = 0
+
+    def writable(self) -> bool:
+        return True
+
+    def seekable(self) -> bool:
+        return False
+
+    def write(self, data) -> int:
+        self._buffer += data
+        self._position += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self._position
+
+    def drain(self) -> bytes:
+        """Retorna e descarta os bytes acumulados."""
+        data = bytes(self._buffer)
+        self._buffer.clear()
+        return data